@@ -78,6 +78,7 @@ from e3nn_jax._src.radial import (
     soft_envelope,
 )
 from e3nn_jax._src.linear import FunctionalLinear
+from e3nn_jax._src.fold import fold_linears, batch_norm_as_linear
 from e3nn_jax._src.tensor_products import (
     tensor_product,
     elementwise_tensor_product,
@@ -92,8 +93,19 @@ from e3nn_jax._src.activation import (
     soft_normalization,  # not in docs
 )
 from e3nn_jax._src.gate import gate
-from e3nn_jax._src.radius_graph import radius_graph
-from e3nn_jax._src.scatter import index_add, scatter_sum, scatter_mean, scatter_max
+from e3nn_jax._src.graph import Graph
+from e3nn_jax._src.radius_graph import radius_graph, edge_vectors
+from e3nn_jax._src.neighbor_list import NeighborList
+from e3nn_jax._src.scatter import (
+    index_add,
+    scatter_sum,
+    scatter_mean,
+    scatter_max,
+    scatter_min,
+    scatter_std,
+    scatter_logsumexp,
+    scatter_softmax,
+)
 from e3nn_jax._src.reduced_tensor_product import (
     reduced_tensor_product_basis,
     reduced_symmetric_tensor_product_basis,
@@ -103,6 +115,9 @@ from e3nn_jax._src.s2grid import (
     s2_irreps,
     to_s2grid,
     to_s2point,
+    S2PointEvaluator,
+    s2_activation,
+    s2_rotate,
     from_s2grid,
     legendre_transform_to_s2grid,
     legendre_transform_from_s2grid,
@@ -111,6 +126,15 @@ from e3nn_jax._src.s2grid import (
     s2_dirac,
     SphericalSignal,
     get_s2fft_grid_resolution,
+    s2grid_cache_info,
+    s2grid_cache_clear,
+)
+from e3nn_jax._src.so3grid import (
+    so3_irreps,
+    to_so3grid,
+    from_so3grid,
+    s2_correlation,
+    SO3Signal,
 )
 from e3nn_jax._src.tensor_product_with_spherical_harmonics import (
     tensor_product_with_spherical_harmonics,
@@ -199,6 +223,8 @@ __all__ = [
     "soft_one_hot_linspace",
     "bessel",
     "FunctionalLinear",  # not in docs
+    "fold_linears",
+    "batch_norm_as_linear",
     "tensor_product",
     "elementwise_tensor_product",
     "tensor_square",
@@ -209,11 +235,18 @@ __all__ = [
     "norm_activation",
     "soft_normalization",
     "gate",
+    "Graph",
     "radius_graph",
+    "edge_vectors",
+    "NeighborList",
     "index_add",
     "scatter_sum",
     "scatter_mean",
     "scatter_max",
+    "scatter_min",
+    "scatter_std",
+    "scatter_logsumexp",
+    "scatter_softmax",
     "poly_envelope",
     "soft_envelope",
     "reduced_tensor_product_basis",
@@ -222,14 +255,24 @@ __all__ = [
     "s2_irreps",
     "to_s2grid",
     "to_s2point",
+    "S2PointEvaluator",
+    "s2_activation",
+    "s2_rotate",
     "from_s2grid",
     "get_s2fft_grid_resolution",
+    "s2grid_cache_info",
+    "s2grid_cache_clear",
     "legendre_transform_from_s2grid",
     "legendre_transform_to_s2grid",
     "betas_to_spherical_signal",
     "m0_values_to_irrepsarray",
     "s2_dirac",
     "SphericalSignal",
+    "so3_irreps",
+    "to_so3grid",
+    "from_so3grid",
+    "s2_correlation",
+    "SO3Signal",
     "tensor_product_with_spherical_harmonics",
     "vmap",
     "flax",
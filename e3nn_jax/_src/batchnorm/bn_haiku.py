@@ -1,4 +1,7 @@
+from typing import Optional
+
 import haiku as hk
+import jax
 import jax.numpy as jnp
 
 import e3nn_jax as e3nn
@@ -62,13 +65,17 @@ class BatchNorm(hk.Module):
         return f"{self.__class__.__name__} ({self.irreps}, eps={self.eps}, momentum={self.momentum})"
 
     def __call__(
-        self, input: e3nn.IrrepsArray, is_training: bool = True
+        self,
+        input: e3nn.IrrepsArray,
+        is_training: bool = True,
+        mask: Optional[jax.Array] = None,
     ) -> e3nn.IrrepsArray:
         r"""Evaluate the batch normalization.
 
         Args:
             input: input tensor of shape ``(batch, [spatial], irreps.dim)``
             is_training: whether to train or evaluate
+            mask: a boolean mask of shape ``(batch,)`` to indicate which inputs are valid
 
         Returns:
             output: normalized tensor of shape ``(batch, [spatial], irreps.dim)``
@@ -76,6 +83,11 @@ class BatchNorm(hk.Module):
         if self.irreps is not None:
             input = input.rechunk(self.irreps)
 
+        if mask is not None and mask.shape != (input.shape[0],):
+            raise ValueError(
+                f"mask must have shape (batch,) but got {mask.shape} instead."
+            )
+
         num_scalar = sum(mul for mul, ir in input.irreps if ir.is_scalar())
         num_features = input.irreps.num_irreps
 
@@ -110,6 +122,7 @@ class BatchNorm(hk.Module):
             use_affine=self.affine,
             momentum=self.momentum,
             epsilon=self.eps,
+            mask=mask,
         )
 
         if is_training and not self.instance:
@@ -8,6 +8,7 @@ __default_conf = {
     "custom_einsum_jvp": False,
     "fused": False,
     "sparse_tp": False,
+    "s2grid_cache_max_bytes": 256 * 2**20,
 }
 
 __conf = __default_conf.copy()
@@ -0,0 +1,209 @@
+from typing import List, Mapping, Optional, Sequence, Tuple, Union
+
+import jax
+import jax.numpy as jnp
+
+import e3nn_jax as e3nn
+from e3nn_jax._src.linear import FunctionalLinear, _parameter_name
+from e3nn_jax._src.utils.dtype import get_pytree_dtype
+
+
+def _weights_list(
+    lin: FunctionalLinear, ws: Union[Sequence[jax.Array], Mapping[str, jax.Array]]
+) -> List[jax.Array]:
+    if isinstance(ws, Mapping):
+        return [ws[_parameter_name(lin, ins)] for ins in lin.instructions]
+    ws = list(ws)
+    if len(ws) != len(lin.instructions):
+        raise ValueError(
+            f"{lin} expects {len(lin.instructions)} weights but got {len(ws)}"
+        )
+    return ws
+
+
+def _bias(lin: FunctionalLinear, ws: List[jax.Array]) -> jax.Array:
+    output = jnp.zeros((lin.irreps_out.dim,), get_pytree_dtype(ws))
+    for ins, w in zip(lin.instructions, ws):
+        if ins.i_in == -1:
+            output = output.at[lin.irreps_out.slices()[ins.i_out]].add(
+                ins.path_weight * w
+            )
+    return output
+
+
+def _from_affine(
+    irreps_in: e3nn.Irreps,
+    irreps_out: e3nn.Irreps,
+    matrix: jax.Array,
+    bias: Optional[jax.Array],
+) -> Tuple[FunctionalLinear, List[jax.Array]]:
+    # with gradient_normalization="element" all the path weights are 1
+    lin = FunctionalLinear(
+        irreps_in,
+        irreps_out,
+        biases=bias is not None,
+        gradient_normalization="element",
+    )
+    ws = []
+    for ins in lin.instructions:
+        if ins.i_in == -1:
+            ws.append(bias[irreps_out.slices()[ins.i_out]])
+        else:
+            mul_in, ir = irreps_in[ins.i_in]
+            mul_out, _ = irreps_out[ins.i_out]
+            block = matrix[irreps_in.slices()[ins.i_in], irreps_out.slices()[ins.i_out]]
+            # the block is ``w \otimes 1``, read ``w`` from the first component
+            ws.append(block.reshape(mul_in, ir.dim, mul_out, ir.dim)[:, 0, :, 0])
+    return lin, ws
+
+
+def fold_linears(
+    *layers: Union[
+        Tuple[FunctionalLinear, Union[Sequence[jax.Array], Mapping[str, jax.Array]]],
+        float,
+        jax.Array,
+    ],
+) -> Tuple[FunctionalLinear, List[jax.Array]]:
+    r"""Fold a chain of linear layers into a single linear layer.
+
+    Consecutive equivariant linear maps compose into one equivariant linear map.
+    This is useful to export a trained model for inference:
+    the chain is replaced by a single `FunctionalLinear` whose weights are precomputed.
+
+    Args:
+        *layers: the layers, applied from left to right. Each layer is either
+
+            - a tuple ``(linear, weights)`` where ``linear`` is a `FunctionalLinear` and ``weights``
+              is the list of its weights or the dictionary of parameters of a ``e3nn.haiku.Linear``
+              or ``e3nn.flax.Linear`` module,
+            - a scalar multiplying the features.
+
+            An eval-mode batch normalization can be included with `batch_norm_as_linear`.
+
+    Returns:
+        ``(linear, weights)``: the folded `FunctionalLinear` and its weights.
+        The folded layer has one path per pair of input and output irreps, its paths have weight 1.
+
+    Example:
+        >>> lin1 = e3nn.FunctionalLinear("4x0e + 2x1o", "8x0e + 8x1o", biases=True)
+        >>> lin2 = e3nn.FunctionalLinear("8x0e + 8x1o", "0e + 1o")
+        >>> ws1 = [jnp.ones(ins.path_shape) for ins in lin1.instructions]
+        >>> ws2 = [jnp.ones(ins.path_shape) for ins in lin2.instructions]
+        >>> lin, ws = e3nn.fold_linears((lin1, ws1), 0.5, (lin2, ws2))
+        >>> lin
+        FunctionalLinear(4x0e+2x1o -> 1x0e+1x1o, 3 instructions, 7 weights)
+        >>> x = e3nn.normal("4x0e + 2x1o", jax.random.PRNGKey(0))
+        >>> jnp.allclose(lin(ws, x).array, lin2(ws2, 0.5 * lin1(ws1, x)).array, atol=1e-5)
+        Array(True, dtype=bool)
+    """
+    irreps_in = None
+    irreps = None
+    matrix = None
+    bias = None
+    scale = 1.0
+
+    for layer in layers:
+        if not isinstance(layer, tuple):
+            if matrix is None:
+                scale = scale * layer
+            else:
+                matrix = matrix * layer
+                bias = None if bias is None else bias * layer
+            continue
+
+        lin, ws = layer
+        if not isinstance(lin, FunctionalLinear):
+            raise TypeError(f"Expected a FunctionalLinear, got {type(lin)}")
+        ws = _weights_list(lin, ws)
+
+        m = lin.matrix(ws)
+        b = _bias(lin, ws) if any(ins.i_in == -1 for ins in lin.instructions) else None
+
+        if matrix is None:
+            irreps_in = lin.irreps_in
+            matrix = scale * m
+            bias = b
+        else:
+            if irreps.simplify() != lin.irreps_in.simplify():
+                # the Linear modules regroup their input
+                if irreps.regroup() != lin.irreps_in.simplify():
+                    raise ValueError(
+                        f"Cannot fold a layer with output {irreps} "
+                        f"into a layer with input {lin.irreps_in}"
+                    )
+                matrix = e3nn.IrrepsArray(irreps, matrix).regroup().array
+                if bias is not None:
+                    bias = e3nn.IrrepsArray(irreps, bias).regroup().array
+
+            matrix = matrix @ m
+            if bias is not None:
+                bias = bias @ m
+                if b is not None:
+                    bias = bias + b
+            else:
+                bias = b
+        irreps = lin.irreps_out
+
+    if matrix is None:
+        raise ValueError("fold_linears needs at least one linear layer")
+
+    return _from_affine(irreps_in, irreps, matrix, bias)
+
+
+def batch_norm_as_linear(
+    irreps: e3nn.Irreps,
+    ra_mean: jax.Array,
+    ra_var: jax.Array,
+    weight: Optional[jax.Array] = None,
+    bias: Optional[jax.Array] = None,
+    epsilon: float = 1e-4,
+) -> Tuple[FunctionalLinear, List[jax.Array]]:
+    r"""Express an eval-mode batch normalization as a linear layer.
+
+    When it uses its running statistics, ``e3nn.haiku.BatchNorm`` and ``e3nn.flax.BatchNorm``
+    are affine maps that can be folded with `fold_linears`.
+
+    Args:
+        irreps: irreps of the input of the batch normalization
+        ra_mean: running mean of the scalars, shape ``(num_scalars,)``
+        ra_var: running variance, shape ``(num_irreps,)``
+        weight: optional affine weights, shape ``(num_irreps,)``
+        bias: optional affine biases, shape ``(num_scalars,)``
+        epsilon: the ``eps`` of the batch normalization
+
+    Returns:
+        ``(linear, weights)``: a `FunctionalLinear` and its weights.
+    """
+    irreps = e3nn.Irreps(irreps)
+
+    ws = []
+    biases = []
+    i_wei = 0  # index for running_var and weight
+    i_rmu = 0  # index for running_mean and bias
+    for mul, ir in irreps:
+        inverse = jax.lax.rsqrt(
+            (1 - epsilon) * ra_var[i_wei : i_wei + mul] + epsilon
+        )  # [mul]
+        if weight is not None:
+            inverse = inverse * weight[i_wei : i_wei + mul]
+        ws.append(jnp.diag(inverse))
+        i_wei += mul
+
+        if ir.is_scalar():
+            b = -ra_mean[i_rmu : i_rmu + mul] * inverse
+            if bias is not None:
+                b = b + bias[i_rmu : i_rmu + mul]
+            biases.append(b)
+            i_rmu += mul
+
+    assert i_wei == len(ra_var)
+    assert i_rmu == len(ra_mean)
+
+    lin = FunctionalLinear(
+        irreps,
+        irreps,
+        instructions=[(i, i) for i in range(len(irreps))],
+        biases=[ir.is_scalar() for _, ir in irreps],
+        gradient_normalization="element",
+    )
+    return lin, ws + biases
@@ -0,0 +1,160 @@
+from typing import Optional, Union
+
+import jax
+import jax.numpy as jnp
+
+import e3nn_jax as e3nn
+
+
+class Graph:
+    r"""Edge list sorted by receiver, with the quantities derived from it.
+
+    Build it once per batch with `Graph.from_edges` (or ``radius_graph(..., return_graph=True)``)
+    and give it as ``dst`` to the scatter functions: the sorting and the degrees are not recomputed by each layer.
+    The scatter functions then reduce over the edges in the order of the graph
+    into ``num_nodes`` segments with a sorted segment reduction.
+
+    The padding edges (receiver out of ``[0, num_nodes)``, for instance ``-1``) are moved to the end,
+    their sender and receiver are set to ``num_nodes`` and they are dropped by the scatter functions.
+
+    Args:
+        senders (`jax.Array`): sender of each edge, shape ``(num_edges,)``
+        receivers (`jax.Array`): receiver of each edge (sorted), shape ``(num_edges,)``
+        offsets (`jax.Array`): the edges received by node ``i`` are ``offsets[i]:offsets[i + 1]``,
+            shape ``(num_nodes + 1,)``
+        degree (`jax.Array`): number of edges received by each node, shape ``(num_nodes,)``
+        perm (`jax.Array`): the edge ``k`` of the graph is the edge ``perm[k]`` of the original edge list
+        inverse_perm (`jax.Array`): inverse of ``perm``
+        num_nodes (int): number of nodes
+
+    Examples:
+        >>> graph = Graph.from_edges(jnp.array([0, 1, 2, 0]), jnp.array([2, 0, 0, -1]), 3)
+        >>> graph.receivers
+        Array([0, 0, 2, 3], dtype=int32)
+        >>> graph.degree
+        Array([2, 0, 1], dtype=int32)
+        >>> e3nn.scatter_sum(graph.sort_edges(jnp.array([1.0, 2.0, 3.0, 4.0])), dst=graph)
+        Array([5., 0., 1.], dtype=float32)
+    """
+
+    def __init__(
+        self,
+        senders: jax.Array,
+        receivers: jax.Array,
+        offsets: jax.Array,
+        degree: jax.Array,
+        perm: jax.Array,
+        inverse_perm: jax.Array,
+        num_nodes: int,
+    ):
+        self.senders = senders
+        self.receivers = receivers
+        self.offsets = offsets
+        self.degree = degree
+        self.perm = perm
+        self.inverse_perm = inverse_perm
+        self.num_nodes = num_nodes
+
+    def __repr__(self):
+        return f"Graph(num_nodes={self.num_nodes}, num_edges={self.num_edges})"
+
+    @staticmethod
+    def from_edges(
+        senders: jax.Array,
+        receivers: jax.Array,
+        num_nodes: int,
+        *,
+        assume_sorted: bool = False,
+    ) -> "Graph":
+        r"""Sort the edges by receiver and compute the offsets and the degrees.
+
+        Args:
+            senders (`jax.Array`): sender of each edge
+            receivers (`jax.Array`): receiver of each edge, out of ``[0, num_nodes)`` for the padding edges
+            num_nodes (int): number of nodes
+            assume_sorted (bool): whether the edges are already sorted by receiver
+                (with the padding edges at the end), skips the sort
+
+        Returns:
+            `Graph`
+        """
+        senders = jnp.asarray(senders, jnp.int32)
+        receivers = jnp.asarray(receivers, jnp.int32)
+        padding = (receivers < 0) | (receivers >= num_nodes)
+        receivers = jnp.where(padding, num_nodes, receivers)
+        senders = jnp.where(padding, num_nodes, senders)
+
+        num_edges = receivers.shape[0]
+        if assume_sorted:
+            perm = jnp.arange(num_edges, dtype=jnp.int32)
+            inverse_perm = perm
+        else:
+            perm = jnp.argsort(receivers, kind="stable").astype(jnp.int32)
+            inverse_perm = (
+                jnp.zeros_like(perm)
+                .at[perm]
+                .set(jnp.arange(num_edges, dtype=jnp.int32), unique_indices=True)
+            )
+            senders = senders[perm]
+            receivers = receivers[perm]
+
+        degree = jax.ops.segment_sum(
+            jnp.ones((num_edges,), jnp.int32),
+            receivers,
+            num_nodes,
+            indices_are_sorted=True,
+            mode="drop",
+        )
+        offsets = jnp.concatenate([jnp.zeros((1,), jnp.int32), jnp.cumsum(degree)])
+        return Graph(senders, receivers, offsets, degree, perm, inverse_perm, num_nodes)
+
+    @property
+    def num_edges(self) -> int:
+        """Number of edges, including the padding edges."""
+        return self.receivers.shape[0]
+
+    @property
+    def edge_mask(self) -> jax.Array:
+        """``False`` for the padding edges."""
+        return self.receivers < self.num_nodes
+
+    def sort_edges(
+        self, x: Union[jax.Array, e3nn.IrrepsArray]
+    ) -> Union[jax.Array, e3nn.IrrepsArray]:
+        """Reorder edge features given in the order of the original edge list into the order of the graph."""
+        return x[self.perm]
+
+    def unsort_edges(
+        self, x: Union[jax.Array, e3nn.IrrepsArray]
+    ) -> Union[jax.Array, e3nn.IrrepsArray]:
+        """Reorder edge features given in the order of the graph into the order of the original edge list."""
+        return x[self.inverse_perm]
+
+
+def _graph_segments(
+    dst: Union[jax.Array, Graph, None],
+    output_size: Optional[int],
+    mode: str,
+    map_back: bool = False,
+):
+    """Replace a `Graph` given as ``dst`` of a scatter function by its sorted receivers."""
+    if not isinstance(dst, Graph):
+        return dst, output_size, False, mode
+    if map_back:
+        return dst.receivers, output_size, True, "drop"
+    if output_size is not None and output_size != dst.num_nodes:
+        raise ValueError(
+            f"output_size={output_size} does not match the number of nodes of the graph {dst.num_nodes}"
+        )
+    # the padding edges have receiver num_nodes, they are dropped
+    return dst.receivers, dst.num_nodes, True, "drop"
+
+
+jax.tree_util.register_pytree_node(
+    Graph,
+    lambda g: (
+        (g.senders, g.receivers, g.offsets, g.degree, g.perm, g.inverse_perm),
+        g.num_nodes,
+    ),
+    lambda num_nodes, data: Graph(*data, num_nodes),
+)
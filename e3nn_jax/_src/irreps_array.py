@@ -860,10 +860,12 @@ class IrrepsArray:
         axis = _standardize_axis(axis, self.ndim)[0]
         jnp = _infer_backend(self.array)
 
-        new_irreps = self.irreps.repeat(self.shape[axis]).simplify()
+        new_irreps = self.irreps.repeat(self.shape[axis])
         new_array = jnp.moveaxis(self.array, axis, -2)
         new_array = jnp.reshape(new_array, self.shape[:-2] + (new_irreps.dim,))
-        return IrrepsArray(new_irreps, new_array)
+        return IrrepsArray(
+            new_irreps, new_array, zero_flags=self.zero_flags * self.shape[axis]
+        ).rechunk(new_irreps.simplify())
 
     repeat_irreps_by_last_axis = axis_to_irreps
 
@@ -975,7 +977,7 @@ class IrrepsArray:
         log_coordinates = log_coordinates.astype(self.dtype)
         D = {
             ir: ir.D_from_log_coordinates(log_coordinates, k)
-            for ir in {ir for _, ir in self.irreps}
+            for ir in {ir for (_, ir), z in zip(self.irreps, self.zero_flags) if not z}
         }
         new_list = [
             (
@@ -1028,7 +1030,7 @@ class IrrepsArray:
         )
         D = {
             ir: ir.D_from_angles(alpha, beta, gamma, k)
-            for ir in {ir for _, ir in self.irreps}
+            for ir in {ir for (_, ir), z in zip(self.irreps, self.zero_flags) if not z}
         }
         if inverse:
             D = {ir: jnp.swapaxes(D[ir], -2, -1) for ir in D}
@@ -1,4 +1,4 @@
-from math import sqrt
+from math import prod, sqrt
 from typing import Any, Callable, List, NamedTuple, Optional, Tuple, Union
 
 import jax
@@ -167,29 +167,88 @@ class FunctionalLinear:
     def __call__(
         self, ws: Union[List[jax.Array], jax.Array], input: IrrepsArray
     ) -> IrrepsArray:
+        r"""Apply the linear operator.
+
+        All the instructions acting on the same irrep are evaluated with a single matrix multiplication:
+        the input chunks are concatenated along the multiplicity axis and the weights are assembled
+        into a block matrix of shape ``(sum mul_in, sum mul_out)``.
+
+        Args:
+            ws: List of weights or flat array of weights.
+            input: Input of shape ``(..., irreps_in.dim)``, the leading dimensions are treated as batch dimensions.
+
+        Returns:
+            Output of shape ``(..., irreps_out.dim)``.
+        """
         input = input.rechunk(self.irreps_in)
-        if input.ndim != 1:
-            raise ValueError(
-                f"FunctionalLinear does not support broadcasting, input shape is {input.shape}"
-            )
+        leading_shape = input.shape[:-1]
 
         if not isinstance(ws, list):
             ws = self.split_weights(ws)
 
-        paths = [
-            (
-                ins.path_weight * w
-                if ins.i_in == -1
-                else (
-                    None
-                    if input.chunks[ins.i_in] is None
-                    else ins.path_weight
-                    * jnp.einsum("uw,ui->wi", w, input.chunks[ins.i_in])
-                )
-            )
-            for ins, w in zip(self.instructions, ws)
-        ]
-        return self.aggregate_paths(paths, input.shape[:-1], input.dtype)
+        chunks = [None] * len(self.irreps_out)
+
+        for ir in {ir for _, ir in self.irreps_out}:
+            i_outs = [
+                i for i, (_, ir_out) in enumerate(self.irreps_out) if ir_out == ir
+            ]
+            paths = [
+                (ins, w)
+                for ins, w in zip(self.instructions, ws)
+                if ins.i_in != -1
+                and ins.i_out in i_outs
+                and input.chunks[ins.i_in] is not None
+            ]
+            i_ins = sorted({ins.i_in for ins, _ in paths})
+            i_outs = [
+                i_out for i_out in i_outs if any(ins.i_out == i_out for ins, _ in paths)
+            ]
+            if len(i_ins) == 0 or len(i_outs) == 0:
+                continue
+
+            def block(i_in: int, i_out: int) -> jax.Array:
+                ws = [
+                    ins.path_weight * w
+                    for ins, w in paths
+                    if (ins.i_in, ins.i_out) == (i_in, i_out)
+                ]
+                if len(ws) == 0:
+                    return jnp.zeros(
+                        (self.irreps_in[i_in].mul, self.irreps_out[i_out].mul),
+                        input.dtype,
+                    )
+                return sum(ws)
+
+            w = jnp.concatenate(
+                [
+                    jnp.concatenate([block(i_in, i_out) for i_out in i_outs], axis=1)
+                    for i_in in i_ins
+                ],
+                axis=0,
+            )  # (sum mul_in, sum mul_out)
+            x = jnp.concatenate(
+                [input.chunks[i_in] for i_in in i_ins], axis=-2
+            )  # (..., sum mul_in, ir.dim)
+            y = jnp.einsum("...ui,uw->...wi", x, w)  # (..., sum mul_out, ir.dim)
+
+            cursor = 0
+            for i_out in i_outs:
+                mul = self.irreps_out[i_out].mul
+                chunks[i_out] = y[..., cursor : cursor + mul, :]
+                cursor += mul
+
+        for ins, w in zip(self.instructions, ws):
+            if ins.i_in == -1:
+                mul, ir = self.irreps_out[ins.i_out]
+                b = ins.path_weight * jnp.reshape(w, (mul, ir.dim))
+                if chunks[ins.i_out] is None:
+                    chunks[ins.i_out] = jnp.broadcast_to(
+                        b, leading_shape + (mul, ir.dim)
+                    )
+                else:
+                    chunks[ins.i_out] = chunks[ins.i_out] + b
+
+        return e3nn.from_chunks(self.irreps_out, chunks, leading_shape, input.dtype)
 
     def matrix(self, ws: List[jax.Array]) -> jax.Array:
         r"""Compute the matrix representation of the linear operator.
@@ -199,11 +258,13 @@ class FunctionalLinear:
 
         Returns:
             The matrix representation of the linear operator. The matrix is shape ``(irreps_in.dim, irreps_out.dim)``.
+            The biases are not included.
         """
         dtype = get_pytree_dtype(ws)
         output = jnp.zeros((self.irreps_in.dim, self.irreps_out.dim), dtype)
         for ins, w in zip(self.instructions, ws):
-            assert ins.i_in != -1
+            if ins.i_in == -1:
+                continue
             mul_in, ir_in = self.irreps_in[ins.i_in]
             mul_out, ir_out = self.irreps_out[ins.i_out]
             output = output.at[
@@ -223,6 +284,12 @@ class FunctionalLinear:
         )
 
 
+def _parameter_name(lin: FunctionalLinear, ins: Instruction) -> str:
+    if ins.i_in == -1:
+        return f"b[{ins.i_out}] {lin.irreps_out[ins.i_out]}"
+    return f"w[{ins.i_in},{ins.i_out}] {lin.irreps_in[ins.i_in]},{lin.irreps_out[ins.i_out]}"
+
+
 def linear_vanilla(
     input: IrrepsArray,
     linear: FunctionalLinear,
@@ -231,22 +298,14 @@ def linear_vanilla(
     """Vanilla linear layer."""
     w = [
         get_parameter(
-            (
-                f"b[{ins.i_out}] {linear.irreps_out[ins.i_out]}"
-                if ins.i_in == -1
-                else f"w[{ins.i_in},{ins.i_out}] {linear.irreps_in[ins.i_in]},{linear.irreps_out[ins.i_out]}"
-            ),
+            _parameter_name(linear, ins),
             ins.path_shape,
             ins.weight_std,
             input.dtype,
         )
         for ins in linear.instructions
     ]
-    f = lambda x: linear(w, x)
-    for _ in range(input.ndim - 1):
-        f = e3nn.utils.vmap(f)
-
-    return f(input)
+    return linear(w, input)
 
 
 def linear_indexed(
@@ -259,6 +318,10 @@ def linear_indexed(
     """Linear layer with indexed weights.
 
     Each input get an index, and the weights are indexed by these indices.
+    The weights are not gathered per input, instead the inputs are grouped by index
+    (see ``_indexed_matmul``). Few sets of weights are handled with a one-hot contraction,
+    otherwise the inputs are sorted by index and multiplied group by group, in which case
+    the memory stays proportional to the size of the input.
     """
     shape = jnp.broadcast_shapes(input.shape[:-1], indices.shape)
     input = input.broadcast_to(shape + (-1,))
@@ -266,23 +329,113 @@ def linear_indexed(
 
     w = [
         get_parameter(
-            (
-                f"b[{ins.i_out}] {lin.irreps_out[ins.i_out]}"
-                if ins.i_in == -1
-                else f"w[{ins.i_in},{ins.i_out}] {lin.irreps_in[ins.i_in]},{lin.irreps_out[ins.i_out]}"
-            ),
+            _parameter_name(lin, ins),
             (num_indexed_weights,) + ins.path_shape,
             ins.weight_std,
             input.dtype,
         )
         for ins in lin.instructions
     ]  # List of shape (num_weights, *path_shape)
-    w = [wi[indices] for wi in w]  # List of shape (..., *path_shape)
 
-    f = lin
-    for _ in range(input.ndim - 1):
-        f = e3nn.utils.vmap(f)
-    return f(w, input)
+    input = input.rechunk(lin.irreps_in).reshape((prod(shape), lin.irreps_in.dim))
+    indices = jnp.reshape(indices, (-1,))
+
+    paths = [
+        (
+            ins.path_weight * wi[indices]
+            if ins.i_in == -1
+            else (
+                None
+                if input.chunks[ins.i_in] is None
+                else ins.path_weight
+                * _indexed_matmul(input.chunks[ins.i_in], wi, indices)
+            )
+        )
+        for ins, wi in zip(lin.instructions, w)
+    ]
+    output = lin.aggregate_paths(paths, input.shape[:-1], input.dtype)
+    return output.reshape(shape + (-1,))
+
+
+def _indexed_matmul(x: jax.Array, w: jax.Array, indices: jax.Array) -> jax.Array:
+    """Equivalent to ``einsum("nui,nuw->nwi", x, w[indices])`` without gathering the weights.
+
+    Args:
+        x: array of shape ``(n, mul_in, ir_dim)``
+        w: array of shape ``(num_indexed_weights, mul_in, mul_out)``
+        indices: array of shape ``(n,)``
+
+    Returns:
+        array of shape ``(n, mul_out, ir_dim)``
+    """
+    n, mul_in, ir_dim = x.shape
+    num_indexed_weights, _, mul_out = w.shape
+
+    if hasattr(jax.lax, "ragged_dot"):
+        # Sort the inputs by index and do one matmul per group of inputs
+        perm = jnp.argsort(indices)
+        xs = jnp.swapaxes(x[perm], 1, 2).reshape(n * ir_dim, mul_in)
+        group_sizes = ir_dim * jnp.bincount(indices, length=num_indexed_weights)
+        ys = jax.lax.ragged_dot(xs, w, group_sizes.astype(jnp.int32))
+        ys = jnp.swapaxes(ys.reshape(n, ir_dim, mul_out), 1, 2)
+        return jnp.zeros_like(ys).at[perm].set(ys, unique_indices=True)
+
+    if num_indexed_weights <= _ONEHOT_MAX_WEIGHTS:
+        # One-hot contraction: one single matmul of shape (n ir_dim, k mul_in) @ (k mul_in, mul_out)
+        onehot = jax.nn.one_hot(indices, num_indexed_weights, dtype=x.dtype)
+        x = onehot[:, :, None, None] * x[:, None, :, :]  # (n, k, mul_in, ir_dim)
+        return jnp.einsum("nkui,kuw->nwi", x, w)
+
+    return _grouped_matmul(x, w, indices)
+
+
+_ONEHOT_MAX_WEIGHTS = 8
+_GROUP_BLOCK_SIZE = 32
+
+
+def _grouped_matmul(x: jax.Array, w: jax.Array, indices: jax.Array) -> jax.Array:
+    """Grouped matmul without ``jax.lax.ragged_dot``.
+
+    The inputs are sorted by index and each group is padded to a multiple of
+    ``_GROUP_BLOCK_SIZE``, such that every block of inputs uses a single set of weights.
+    A scan over the blocks does one matmul per block, the memory stays proportional to the size of the input.
+    """
+    n, mul_in, ir_dim = x.shape
+    num_indexed_weights, _, mul_out = w.shape
+    block = _GROUP_BLOCK_SIZE
+
+    # at most min(k, n) groups are not empty, each one adds less than one block of padding
+    num_blocks = -(-n // block) + min(num_indexed_weights, n)
+
+    perm = jnp.argsort(indices, kind="stable")
+    sorted_indices = indices[perm]
+    counts = jnp.bincount(indices, length=num_indexed_weights)
+    padded_counts = -(-counts // block) * block
+    starts = jnp.cumsum(counts) - counts
+    padded_ends = jnp.cumsum(padded_counts)
+    padded_starts = padded_ends - padded_counts
+
+    # position of each sorted input in the padded array
+    pos = padded_starts[sorted_indices] + jnp.arange(n) - starts[sorted_indices]
+    xp = jnp.zeros((num_blocks * block, mul_in, ir_dim), x.dtype)
+    xp = xp.at[pos].set(x[perm], unique_indices=True)
+    xp = xp.reshape(num_blocks, block, mul_in, ir_dim)
+
+    # index of the weights used by each block, the trailing blocks only contain zeros
+    block_indices = jnp.searchsorted(
+        padded_ends, jnp.arange(num_blocks) * block, side="right"
+    )
+    block_indices = jnp.minimum(block_indices, num_indexed_weights - 1)
+
+    def body(_, xs):
+        xb, k = xs
+        return None, jnp.einsum("bui,uw->bwi", xb, w[k])
+
+    _, yp = jax.lax.scan(body, None, (xp, block_indices))
+    yp = yp.reshape(num_blocks * block, mul_out, ir_dim)
+
+    y = jnp.zeros((n, mul_out, ir_dim), yp.dtype)
+    return y.at[perm].set(yp[pos], unique_indices=True)
 
 
 def linear_mixed(
@@ -295,6 +448,8 @@ def linear_mixed(
     """Linear layer with mixed weights.
 
     Each input get ``d`` weights. The weights (other ones) are mixed with the input weights.
+    The mixed weights are not formed per input when it is cheaper to contract
+    the input with the ``d`` weights first (see ``_mixed_matmul``).
     """
     shape = jnp.broadcast_shapes(input.shape[:-1], weights.shape[:-1])
     input = input.broadcast_to(shape + (-1,))  # (..., irreps)
@@ -307,11 +462,7 @@ def linear_mixed(
 
     w = [
         get_parameter(
-            (
-                f"b[{ins.i_out}] {lin.irreps_out[ins.i_out]}"
-                if ins.i_in == -1
-                else f"w[{ins.i_in},{ins.i_out}] {lin.irreps_in[ins.i_in]},{lin.irreps_out[ins.i_out]}"
-            ),
+            _parameter_name(lin, ins),
             (d,) + ins.path_shape,
             stddev * ins.weight_std,
             input.dtype,
@@ -319,16 +470,23 @@ def linear_mixed(
         for ins in lin.instructions
     ]  # List of shape (d, *path_shape)
     weights = weights.astype(input.array.dtype)
-    w = [
-        jnp.sqrt(alpha) ** gradient_normalization
-        * jax.lax.dot_general(weights, wi, (((weights.ndim - 1,), (0,)), ((), ())))
-        for wi in w
-    ]  # List of shape (..., *path_shape)
-
-    f = lin
-    for _ in range(input.ndim - 1):
-        f = e3nn.utils.vmap(f)
-    return f(w, input)  # (..., irreps)
+    weights = jnp.sqrt(alpha) ** gradient_normalization * weights
+
+    input = input.rechunk(lin.irreps_in)
+    paths = [
+        (
+            ins.path_weight * jnp.einsum("...d,dj->...j", weights, wi)
+            if ins.i_in == -1
+            else (
+                None
+                if input.chunks[ins.i_in] is None
+                else ins.path_weight
+                * _mixed_matmul(weights, wi, input.chunks[ins.i_in])
+            )
+        )
+        for ins, wi in zip(lin.instructions, w)
+    ]
+    return lin.aggregate_paths(paths, shape, input.dtype)  # (..., irreps)
 
 
 def linear_mixed_per_channel(
@@ -351,11 +509,7 @@ def linear_mixed_per_channel(
 
     w = [
         get_parameter(
-            (
-                f"b[{ins.i_out}] {lin.irreps_out[ins.i_out]}"
-                if ins.i_in == -1
-                else f"w[{ins.i_in},{ins.i_out}] {lin.irreps_in[ins.i_in]},{lin.irreps_out[ins.i_out]}"
-            ),
+            _parameter_name(lin, ins),
             (d, nc) + ins.path_shape,
             stddev * ins.weight_std,
             input.dtype,
@@ -363,13 +517,50 @@ def linear_mixed_per_channel(
         for ins in lin.instructions
     ]  # List of shape (d, num_channels, *path_shape)
     weights = weights.astype(input.array.dtype)
-    w = [
-        jnp.sqrt(alpha) ** gradient_normalization
-        * jax.lax.dot_general(weights, wi, (((weights.ndim - 1,), (0,)), ((), ())))
-        for wi in w
-    ]  # List of shape (..., num_channels, *path_shape)
-
-    f = lin
-    for _ in range(input.ndim - 1):
-        f = e3nn.utils.vmap(f)
-    return f(w, input)  # (..., num_channels, irreps)
+    weights = jnp.sqrt(alpha) ** gradient_normalization * weights
+
+    input = input.rechunk(lin.irreps_in)
+    paths = [
+        (
+            ins.path_weight * jnp.einsum("...d,dcj->...cj", weights, wi)
+            if ins.i_in == -1
+            else (
+                None
+                if input.chunks[ins.i_in] is None
+                else ins.path_weight
+                * _mixed_matmul(weights, wi, input.chunks[ins.i_in], channel="c")
+            )
+        )
+        for ins, wi in zip(lin.instructions, w)
+    ]
+    return lin.aggregate_paths(paths, shape + (nc,), input.dtype)
+    # (..., num_channels, irreps)
+
+
+def _mixed_matmul(
+    weights: jax.Array, w: jax.Array, x: jax.Array, channel: str = ""
+) -> jax.Array:
+    """Equivalent to ``einsum("...d,duw,...ui->...wi", weights, w, x)``.
+
+    The contraction order is chosen to allocate the smallest intermediate tensor:
+    either the mixed weights ``(..., mul_in, mul_out)`` or the input contracted
+    with all the weights ``(..., d, mul_out, ir_dim)``.
+
+    Args:
+        weights: array of shape ``(..., d)``
+        w: array of shape ``(d, [num_channels,] mul_in, mul_out)``
+        x: array of shape ``(..., [num_channels,] mul_in, ir_dim)``
+        channel: ``"c"`` if there is a channel axis, ``""`` otherwise
+
+    Returns:
+        array of shape ``(..., [num_channels,] mul_out, ir_dim)``
+    """
+    c = channel
+    d, mul_in, ir_dim = w.shape[0], w.shape[-2], x.shape[-1]
+
+    if d * ir_dim < mul_in:
+        y = jnp.einsum(f"...{c}ui,d{c}uw->...d{c}wi", x, w)
+        return jnp.einsum(f"...d,...d{c}wi->...{c}wi", weights, y)
+
+    w = jnp.einsum(f"...d,d{c}uw->...{c}uw", weights, w)
+    return jnp.einsum(f"...{c}uw,...{c}ui->...{c}wi", w, x)
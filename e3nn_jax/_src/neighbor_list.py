@@ -0,0 +1,228 @@
+import math
+from typing import Optional, Tuple, Union
+
+import jax
+import jax.numpy as jnp
+
+import e3nn_jax as e3nn
+from e3nn_jax._src.radius_graph import (
+    _auto_method,
+    _cell_capacity,
+    _max_graph_size,
+    _num_images,
+    _periodic_images,
+)
+
+
+class NeighborList:
+    r"""Verlet neighbor list, reused as long as the points move less than half the skin.
+
+    The edges are computed with `radius_graph` using the cutoff ``r_max + skin``.
+    They contain all the pairs closer than ``r_max`` as long as no point moved more than ``skin / 2``
+    since the last build. `update` returns the same edges until then and rebuilds the list otherwise.
+    The edges may contain pairs farther than ``r_max`` (up to ``r_max + skin``).
+
+    The number of edges is fixed at build time (``size``) such that `update` can be jitted.
+    When a rebuild finds more edges than ``size``, or more points per cell than ``cell_capacity``,
+    the extra edges are dropped and ``overflow`` is set. The list should then be built again with a larger capacity.
+
+    Args:
+        src (`jax.Array`): source indices, padded with ``-1``
+        dst (`jax.Array`): destination indices, padded with ``-1``
+        shifts (`jax.Array`): integer cell shifts of the edges, ``None`` without periodic cell
+        reference_positions (`jax.Array`): positions of the points at the last build
+        overflow (`jax.Array`): whether edges were dropped at the last build
+        batch (`jax.Array`): graph index of each point
+        cell (`jax.Array`): periodic cell
+        r_max (float): cutoff radius
+        skin (float): extra distance added to the cutoff
+        options (tuple): static options passed to `radius_graph`
+
+    Examples:
+        >>> pos = jax.random.normal(jax.random.PRNGKey(0), (20, 3))
+        >>> nl = NeighborList.build(pos, 0.8, skin=0.2)
+        >>> nl.src.shape
+        (18,)
+        >>> nl = jax.jit(NeighborList.update)(nl, pos + 0.01)
+        >>> bool(nl.overflow)
+        False
+    """
+
+    def __init__(
+        self,
+        src: jax.Array,
+        dst: jax.Array,
+        shifts: Optional[jax.Array],
+        reference_positions: jax.Array,
+        overflow: jax.Array,
+        batch: Optional[jax.Array],
+        cell: Optional[jax.Array],
+        r_max: float,
+        skin: float,
+        options: Tuple[Tuple[str, object], ...],
+    ):
+        self.src = src
+        self.dst = dst
+        self.shifts = shifts
+        self.reference_positions = reference_positions
+        self.overflow = overflow
+        self.batch = batch
+        self.cell = cell
+        self.r_max = r_max
+        self.skin = skin
+        self.options = options
+
+    def __repr__(self):
+        return (
+            f"NeighborList(r_max={self.r_max}, skin={self.skin}, "
+            f"num_points={self.reference_positions.shape[0]}, size={self.src.shape[0]})"
+        )
+
+    @staticmethod
+    def build(
+        pos: Union[e3nn.IrrepsArray, jax.Array],
+        r_max: float,
+        skin: float,
+        *,
+        batch: Optional[jax.Array] = None,
+        size: Optional[int] = None,
+        capacity_multiplier: float = 1.25,
+        loop: bool = False,
+        cell: Optional[jax.Array] = None,
+        pbc: Union[bool, Tuple[bool, bool, bool]] = True,
+        num_images: Optional[Union[int, Tuple[int, int, int]]] = None,
+        method: str = "auto",
+        cell_capacity: Optional[int] = None,
+        max_num_neighbors: Optional[int] = None,
+        max_graph_size: Optional[int] = None,
+    ) -> "NeighborList":
+        r"""Build the neighbor list.
+
+        Args:
+            pos (`jax.Array`): positions of shape ``(n, 3)``
+            r_max (float): cutoff radius
+            skin (float): extra distance added to the cutoff
+            batch (`jax.Array`): graph index of each point
+            size (int): number of edges. If not specified, it is the number of edges found
+                multiplied by ``capacity_multiplier``, which is not possible under ``jax.jit``.
+            capacity_multiplier (float): margin on the number of edges when ``size`` is not specified,
+                and on ``cell_capacity`` when it is computed
+            loop (bool): whether to include self-loops
+            cell (`jax.Array`): periodic cell, see `radius_graph`
+            pbc (bool or tuple of bool): periodicity along each lattice vector
+            num_images (int or tuple of int): number of periodic images, computed from ``cell`` if not specified
+            method (str): method of `radius_graph`, ``"auto"`` is resolved at build time
+            cell_capacity (int): maximum number of points per cell for the cell list.
+                If not specified, it is computed from ``pos`` at build time (``pos`` is not traced).
+            max_num_neighbors (int): maximum number of neighbors per point for the cell list
+            max_graph_size (int): maximum number of points per graph of ``batch`` for the dense method.
+                If not specified, it is computed from ``batch`` at build time (``batch`` is not traced).
+
+        Returns:
+            `NeighborList`
+        """
+        if isinstance(pos, e3nn.IrrepsArray):
+            pos = pos.array
+
+        if not isinstance(pbc, bool):
+            pbc = tuple(bool(p) for p in pbc)
+        if cell is not None and num_images is None:
+            num_images = _num_images(cell, r_max + skin)
+
+        # resolve the options at build time, such that the jitted update uses the same method
+        data, data_batch = pos, batch
+        if cell is not None and method in ("auto", "cell_list"):
+            data, data_batch = _periodic_images(
+                pos, batch, cell, pbc, r_max + skin, num_images
+            )[3:]
+        if method == "auto":
+            method = _auto_method(data, cell_capacity)
+        if method == "cell_list" and cell_capacity is None:
+            if not isinstance(data, jax.core.Tracer):
+                cell_capacity = _cell_capacity(data, data_batch, r_max + skin)
+                cell_capacity = math.ceil(capacity_multiplier * cell_capacity)
+        if method == "dense" and batch is not None and max_graph_size is None:
+            if not isinstance(batch, jax.core.Tracer):
+                max_graph_size = _max_graph_size(batch)
+
+        options = (
+            ("loop", loop),
+            ("pbc", pbc),
+            ("num_images", num_images),
+            ("method", method),
+            ("cell_capacity", cell_capacity),
+            ("max_num_neighbors", max_num_neighbors),
+            ("max_graph_size", max_graph_size),
+        )
+
+        if size is None:
+            if isinstance(pos, jax.core.Tracer):
+                raise ValueError(
+                    "size must be specified to build a neighbor list under a jax transformation"
+                )
+            num_edges = e3nn.radius_graph(
+                pos, r_max + skin, batch=batch, cell=cell, **dict(options)
+            )[0].shape[0]
+            size = max(math.ceil(capacity_multiplier * num_edges), 1)
+
+        options = (("size", size),) + options
+        return NeighborList._build(pos, batch, cell, r_max, skin, options)
+
+    @staticmethod
+    def _build(pos, batch, cell, r_max, skin, options) -> "NeighborList":
+        output = e3nn.radius_graph(
+            pos,
+            r_max + skin,
+            batch=batch,
+            cell=cell,
+            return_overflow=True,
+            **dict(options),
+        )
+        if cell is None:
+            src, dst, overflow = output
+            shifts = None
+        else:
+            src, dst, shifts, overflow = output
+        return NeighborList(
+            src, dst, shifts, pos, overflow, batch, cell, r_max, skin, options
+        )
+
+    def needs_rebuild(self, pos: Union[e3nn.IrrepsArray, jax.Array]) -> jax.Array:
+        r"""Whether a point moved more than ``skin / 2`` since the last build."""
+        if isinstance(pos, e3nn.IrrepsArray):
+            pos = pos.array
+        displacement2 = jnp.sum((pos - self.reference_positions) ** 2, axis=-1)
+        return jnp.max(displacement2, initial=0.0) > (self.skin / 2) ** 2
+
+    def update(self, pos: Union[e3nn.IrrepsArray, jax.Array]) -> "NeighborList":
+        r"""Return the same neighbor list if the points moved less than ``skin / 2``, rebuild it otherwise.
+
+        The displacements are not wrapped in the periodic cell: wrapping the positions triggers a rebuild.
+
+        Args:
+            pos (`jax.Array`): new positions of shape ``(n, 3)``
+
+        Returns:
+            `NeighborList`
+        """
+        if isinstance(pos, e3nn.IrrepsArray):
+            pos = pos.array
+
+        return jax.lax.cond(
+            self.needs_rebuild(pos),
+            lambda nl: NeighborList._build(
+                pos, nl.batch, nl.cell, nl.r_max, nl.skin, nl.options
+            ),
+            lambda nl: nl,
+            self,
+        )
+
+
+jax.tree_util.register_pytree_node(
+    NeighborList,
+    lambda x: (
+        (x.src, x.dst, x.shifts, x.reference_positions, x.overflow, x.batch, x.cell),
+        (x.r_max, x.skin, x.options),
+    ),
+    lambda aux, data: NeighborList(*data, *aux),
+)
@@ -1,9 +1,12 @@
-from typing import Union
+import itertools
+from typing import Optional, Tuple, Union
 
 import jax
 import jax.numpy as jnp
+import numpy as np
 
 import e3nn_jax as e3nn
+from e3nn_jax._src.radius_graph_numpy import _host_edges
 
 
 def radius_graph(
@@ -15,21 +18,78 @@ def radius_graph(
     loop: bool = False,
     fill_src: int = -1,
     fill_dst: int = -1,
+    method: str = "dense",
+    cell_capacity: Optional[int] = None,
+    max_num_neighbors: Optional[int] = None,
+    return_overflow: bool = False,
+    cell: Optional[jax.Array] = None,
+    pbc: Union[bool, Tuple[bool, bool, bool]] = True,
+    num_images: Optional[Union[int, Tuple[int, int, int]]] = None,
+    max_graph_size: Optional[int] = None,
+    num_graphs: Optional[int] = None,
+    return_num_edges: bool = False,
+    return_graph: bool = False,
 ):
-    r"""Try to use ``matscipy.neighbours.neighbour_list`` instead.
+    r"""Compute the pairs of points closer than ``r_max``.
+
+    Three methods are available:
+
+    - ``"dense"`` computes all the pairwise distances, :math:`O(N^2)` in time and memory.
+      With ``batch``, only the pairs of the same graph are computed, :math:`O(N K)` where :math:`K` is the
+      number of points of the largest graph (``max_graph_size``).
+    - ``"cell_list"`` sorts the points into cells of size ``r_max`` (spatial hashing) and only compares
+      the points of neighboring cells, :math:`O(N \log N)` in time and :math:`O(N)` in memory.
+      The number of points per cell is bounded by ``cell_capacity`` to keep the shapes static.
+    - ``"host"`` runs a NumPy cell list on the host with a thread pool, called with `jax.pure_callback`.
+      Under ``jax.jit`` the output ``size`` is required. Thanks to the asynchronous dispatch of JAX,
+      the search for the next positions can run while the device evaluates the model on the current ones.
+
+    The edges are sorted by source. With the dense and host methods they are also sorted by destination
+    for each source, the periodic images of a destination follow each other.
 
     Args:
         pos (`jax.Array`): array of shape ``(n, 3)``
-        r_max (float):
-        batch (`jax.Array`): indices
-        size (int): size of the output
+        r_max (float): cutoff radius
+        batch (`jax.Array`): indices of the graph of each point, points of different graphs are never connected
+        size (int): size of the output, it is padded with ``fill_src`` and ``fill_dst``
         loop (bool): whether to include self-loops
+        fill_src (int): padding value of the source indices
+        fill_dst (int): padding value of the destination indices
+        method (str): ``"dense"`` (default), ``"cell_list"``, ``"host"`` or ``"auto"``. ``"auto"`` uses the cell list
+            for more than 1024 points when ``cell_capacity`` is given or can be computed (``pos`` is not traced),
+            computing it synchronizes with the device. The order of the destinations of each source then
+            differs from the dense method.
+        cell_capacity (int): maximum number of points per cell for the cell list.
+            If not specified, it is computed from ``pos``, which is not possible under ``jax.jit``.
+        max_num_neighbors (int): maximum number of neighbors per point for the cell list,
+            bounds the memory to ``(n, max_num_neighbors)``. By default there is no bound.
+        return_overflow (bool): whether to also return a flag indicating that edges were dropped,
+            because ``size``, ``cell_capacity`` or ``max_num_neighbors`` is too small.
+        cell (`jax.Array`): optional periodic cell of shape ``(3, 3)`` (the lattice vectors are the rows)
+            or ``(num_graphs, 3, 3)`` for one cell per graph of ``batch``. Triclinic cells are supported.
+        pbc (bool or tuple of bool): periodicity along each lattice vector, only used with ``cell``
+        num_images (int or tuple of int): number of periodic images searched in each direction,
+            only used with ``cell``. By default it is computed from ``cell`` and ``r_max``,
+            which is not possible under ``jax.jit``. The cutoff can be larger than the cell.
+        max_graph_size (int): maximum number of points per graph of ``batch`` for the dense method.
+            If not specified, it is computed from ``batch``, which is not possible under ``jax.jit``.
+        num_graphs (int): number of graphs, only used with ``return_num_edges``.
+            If not specified, it is computed from ``batch``, which is not possible under ``jax.jit``.
+        return_num_edges (bool): whether to also return the number of edges of each graph
+        return_graph (bool): whether to return a `Graph` instead of the source and destination indices.
+            The edges are already sorted by source and the pairs are symmetric, so the graph is built
+            without sorting: its receivers are the sources and its senders the destinations
+            (the shifts are negated accordingly).
 
     Returns:
         (tuple): tuple containing:
 
             jax.Array: source indices
             jax.Array: destination indices
+            jax.Array: integer cell shifts of shape ``(num_edges, 3)`` (only if ``cell`` is given),
+                the edge vectors are ``pos[dst] - pos[src] + shifts @ cell``, see `edge_vectors`
+            jax.Array: number of edges of each graph of shape ``(num_graphs,)`` (only if ``return_num_edges``)
+            jax.Array: overflow flag (only if ``return_overflow``)
 
     Examples:
         >>> key = jax.random.PRNGKey(0)
@@ -37,26 +97,451 @@ def radius_graph(
         >>> batch = jnp.arange(20) < 10
         >>> radius_graph(pos, 0.8, batch=batch)
         (Array([ 3,  7, 10, 11, 12, 18], dtype=int32), Array([ 7,  3, 11, 10, 18, 12], dtype=int32))
+        >>> radius_graph(pos, 0.8, batch=batch, method="cell_list", cell_capacity=8, size=8)
+        (Array([ 3,  7, 10, 11, 12, 18, -1, -1], dtype=int32), Array([ 7,  3, 11, 10, 18, 12, -1, -1], dtype=int32))
     """
-    # TODO(mario): replace with the function made for Allan once the project is finished
     if isinstance(pos, e3nn.IrrepsArray):
         pos = pos.array
 
+    n = pos.shape[0]
+    if batch is not None:
+        batch = jnp.asarray(batch).astype(jnp.int32)
+
+    if cell is None:
+        data, data_batch = pos, batch
+    else:
+        pos, wrap, images, data, data_batch = _periodic_images(
+            pos, batch, cell, pbc, r_max, num_images
+        )
+
+    if method == "auto":
+        method = _auto_method(data, cell_capacity)
+
+    if method == "host":
+        src, dst, overflow = _host_edges(
+            pos, data, r_max, batch, data_batch, loop, size
+        )
+    elif method == "dense":
+        if batch is not None:
+            if max_graph_size is None:
+                max_graph_size = _max_graph_size(batch)
+            neighbors, overflow = _batched_dense_neighbors(
+                pos, data, r_max, batch, loop, max_graph_size
+            )
+        else:
+            neighbors = _dense_neighbors(pos, data, r_max, batch, data_batch, loop)
+            overflow = jnp.array(False)
+    elif method == "cell_list":
+        neighbors, overflow = _cell_list_neighbors(
+            pos,
+            data,
+            r_max,
+            batch,
+            data_batch,
+            loop,
+            cell_capacity,
+            max_num_neighbors,
+        )
+    else:
+        raise ValueError(f"Unknown method {method}")
+
+    if method != "host":
+        src, dst, size_overflow = _neighbors_to_edges(neighbors, size)
+        overflow = overflow | size_overflow
+
+    if cell is not None:
+        # the data points are the images of the (wrapped) points
+        image = jnp.where(dst == -1, 0, dst // n)
+        dst = jnp.where(dst == -1, -1, dst % n)
+        if method != "cell_list":
+            # mapping the images back breaks the order of the destinations, the padding stays at the end
+            perm = jnp.lexsort((dst, jnp.where(src == -1, n, src)))
+            src, dst, image = src[perm], dst[perm], image[perm]
+        shifts = images[image] + wrap[src] - wrap[dst]
+        shifts = jnp.where(src[:, None] == -1, 0, shifts)
+
+    if return_num_edges:
+        num_edges = _num_edges_per_graph(src, batch, num_graphs)
+
+    if return_graph:
+        # the reverse of the edge (src, dst, shift) is (dst, src, -shift)
+        output = (e3nn.Graph.from_edges(dst, src, n, assume_sorted=True),)
+        if cell is not None:
+            shifts = -shifts
+    else:
+        if fill_src != -1:
+            src = jnp.where(src == -1, fill_src, src)
+        if fill_dst != -1:
+            dst = jnp.where(dst == -1, fill_dst, dst)
+        output = (src, dst)
+
+    if cell is not None:
+        output += (shifts,)
+    if return_num_edges:
+        output += (num_edges,)
+    if return_overflow:
+        output += (overflow,)
+    return output
+
+
+def edge_vectors(
+    pos: Union[e3nn.IrrepsArray, jax.Array],
+    src: jax.Array,
+    dst: jax.Array,
+    *,
+    shifts: Optional[jax.Array] = None,
+    cell: Optional[jax.Array] = None,
+    batch: Optional[jax.Array] = None,
+) -> Union[e3nn.IrrepsArray, jax.Array]:
+    r"""Vectors of the edges of a (periodic) graph.
+
+    Computes ``pos[dst] - pos[src] + shifts @ cell``.
+
+    Args:
+        pos (`jax.Array` or `IrrepsArray`): positions of shape ``(n, 3)``
+        src (`jax.Array`): source indices of shape ``(num_edges,)``
+        dst (`jax.Array`): destination indices of shape ``(num_edges,)``
+        shifts (`jax.Array`): optional integer cell shifts of shape ``(num_edges, 3)``
+        cell (`jax.Array`): periodic cell of shape ``(3, 3)`` or ``(num_graphs, 3, 3)``
+        batch (`jax.Array`): graph index of each point, needed with one cell per graph
+
+    Returns:
+        `jax.Array` or `IrrepsArray`: edge vectors of shape ``(num_edges, 3)``
+
+    Examples:
+        >>> pos = jnp.array([[0.25, 0.0, 0.0], [0.875, 0.0, 0.0]])
+        >>> cell = jnp.eye(3)
+        >>> src, dst, shifts = radius_graph(pos, 0.5, cell=cell, pbc=(True, False, False))
+        >>> shifts
+        Array([[-1,  0,  0],
+               [ 1,  0,  0]], dtype=int32)
+        >>> edge_vectors(pos, src, dst, shifts=shifts, cell=cell)
+        Array([[-0.375,  0.   ,  0.   ],
+               [ 0.375,  0.   ,  0.   ]], dtype=float32)
+    """
+    irreps = None
+    if isinstance(pos, e3nn.IrrepsArray):
+        irreps = pos.irreps
+        pos = pos.array
+
+    vectors = pos[dst] - pos[src]
+    if shifts is not None:
+        cell = jnp.asarray(cell, vectors.dtype)
+        shifts = shifts.astype(vectors.dtype)
+        if cell.ndim == 3:
+            cell = cell[batch[src]]  # [num_edges, 3, 3]
+            vectors = vectors + jnp.einsum("ei,eij->ej", shifts, cell)
+        else:
+            vectors = vectors + shifts @ cell
+
+    if irreps is not None:
+        return e3nn.IrrepsArray(irreps, vectors)
+    return vectors
+
+
+def _auto_method(data: jax.Array, cell_capacity: Optional[int]) -> str:
+    """Method selected by ``method="auto"``."""
+    concrete = not isinstance(data, jax.core.Tracer)
+    if data.shape[0] > 1024 and (cell_capacity is not None or concrete):
+        return "cell_list"
+    return "dense"
+
+
+def _max_graph_size(batch: jax.Array) -> int:
+    """Number of points of the largest graph of ``batch``."""
+    if isinstance(batch, jax.core.Tracer):
+        raise ValueError(
+            "max_graph_size must be specified to use the dense method with batch under a jax transformation"
+        )
+    return int(np.max(np.bincount(np.asarray(batch)), initial=1))
+
+
+def _num_images(cell: jax.Array, r_max: float) -> Tuple[int, int, int]:
+    """Number of periodic images needed in each direction to find all the neighbors within ``r_max``."""
+    if isinstance(cell, jax.core.Tracer) or isinstance(r_max, jax.core.Tracer):
+        raise ValueError(
+            "num_images must be specified to use a periodic cell under a jax transformation"
+        )
+    # distance between the lattice planes is 1 / |column of inv(cell)|
+    inv_cell = np.linalg.inv(np.asarray(cell, dtype=np.float64))
+    plane_spacing = 1.0 / np.linalg.norm(inv_cell, axis=-2)
+    num_images = np.ceil(r_max / plane_spacing).astype(int)
+    return tuple(int(m) for m in num_images.reshape(-1, 3).max(0))
+
+
+def _periodic_images(
+    pos: jax.Array,
+    batch: Optional[jax.Array],
+    cell: jax.Array,
+    pbc: Union[bool, Tuple[bool, bool, bool]],
+    r_max: float,
+    num_images: Optional[Union[int, Tuple[int, int, int]]],
+):
+    """Wrap the points in the cell and list their periodic images.
+
+    Returns:
+        ``(pos, wrap, images, data, data_batch)``: the wrapped points, the integer shifts removed by the wrap,
+        the image shifts of shape ``(num_images, 3)`` and the images of all the points.
+    """
+    n = pos.shape[0]
+    cell = jnp.asarray(cell, pos.dtype)
+    if isinstance(pbc, bool):
+        pbc = (pbc,) * 3
+    pbc = np.array(pbc, dtype=bool)
+
+    if cell.ndim == 3:
+        if batch is None:
+            raise ValueError("batch must be specified with one cell per graph")
+        cell_per_point = cell[batch]  # [n, 3, 3]
+    else:
+        cell_per_point = cell
+
+    inv_cell = jnp.linalg.inv(cell)
+
+    if num_images is None:
+        num_images = _num_images(cell, r_max)
+    num_images = np.broadcast_to(np.asarray(num_images, dtype=int), (3,))
+    num_images = np.where(pbc, num_images, 0)
+
+    images = np.array(
+        list(itertools.product(*[range(-m, m + 1) for m in num_images])), dtype=np.int32
+    )  # [num_images, 3]
+
+    if cell.ndim == 2:
+        frac = pos @ inv_cell
+    else:
+        frac = jnp.einsum("ni,nij->nj", pos, inv_cell[batch])
+    wrap = jnp.where(pbc, jnp.floor(frac), 0.0)
+    if cell.ndim == 2:
+        pos = pos - wrap @ cell
+    else:
+        pos = pos - jnp.einsum("ni,nij->nj", wrap, cell_per_point)
+
+    if cell.ndim == 2:
+        # [num_images, 1, 3]
+        image_vectors = (images.astype(pos.dtype) @ cell)[:, None, :]
+    else:
+        image_vectors = jnp.einsum(
+            "si,nij->snj", images.astype(pos.dtype), cell_per_point
+        )  # [num_images, n, 3]
+    data = pos[None] + image_vectors
+    data = jnp.reshape(data, (-1, 3))
+    data_batch = None if batch is None else jnp.tile(batch, images.shape[0])
+    return pos, wrap.astype(jnp.int32), jnp.asarray(images), data, data_batch
+
+
+def _dense_neighbors(
+    query: jax.Array,
+    data: jax.Array,
+    r_max: float,
+    query_batch: Optional[jax.Array],
+    data_batch: Optional[jax.Array],
+    loop: bool,
+) -> jax.Array:
+    """Neighbors of each query point, shape ``(n_query, n_data)``, padded with ``-1``."""
     r = jax.vmap(
         jax.vmap(lambda x, y: jnp.linalg.norm(x - y), (None, 0), 0), (0, None), 0
-    )(pos, pos)
+    )(query, data)
     if loop:
         mask = r < r_max
     else:
         mask = (r < r_max) & (r > 0)
 
-    src, dst = jnp.where(mask, size=size, fill_value=-1)
+    if query_batch is not None:
+        mask = mask & (query_batch[:, None] == data_batch[None, :])
 
-    if fill_src != -1:
-        src = jnp.where(src == -1, fill_src, src)
-    if fill_dst != -1:
-        dst = jnp.where(dst == -1, fill_dst, dst)
+    return jnp.where(mask, jnp.arange(data.shape[0], dtype=jnp.int32)[None, :], -1)
+
+
+def _batched_dense_neighbors(
+    query: jax.Array,
+    data: jax.Array,
+    r_max: float,
+    batch: jax.Array,
+    loop: bool,
+    max_graph_size: int,
+) -> Tuple[jax.Array, jax.Array]:
+    """Neighbors of each query point among the data points of its graph, padded with ``-1``.
 
+    The points are sorted by graph, each query point is compared to the ``max_graph_size`` points
+    following the first point of its graph. The data points are ``data.shape[0] // n`` copies (periodic images)
+    of the ``n`` query points.
+    """
+    n = query.shape[0]
+    num_copies = data.shape[0] // max(n, 1)
+
+    perm = jnp.argsort(batch, kind="stable")
+    start = jnp.searchsorted(batch[perm], batch, side="left")  # [n]
+    end = jnp.searchsorted(batch[perm], batch, side="right")  # [n]
+
+    k = jnp.arange(max_graph_size)
+    valid = k < (end - start)[:, None]  # [n, max_graph_size]
+    cand = perm[jnp.minimum(start[:, None] + k, n - 1)]  # [n, max_graph_size]
+    copies = jnp.arange(num_copies, dtype=jnp.int32)[:, None, None] * n
+    cand = jnp.moveaxis(copies + cand, 0, 1)  # [n, num_copies, max_graph_size]
+
+    r = jnp.linalg.norm(data[cand] - query[:, None, None, :], axis=-1)
+    mask = valid[:, None, :] & (r < r_max)
+    if not loop:
+        mask &= r > 0
+
+    neighbors = jnp.where(mask, cand, -1).reshape(n, -1)
+    return neighbors, jnp.any(end - start > max_graph_size)
+
+
+def _num_edges_per_graph(
+    src: jax.Array,
+    batch: Optional[jax.Array],
+    num_graphs: Optional[int],
+) -> jax.Array:
+    """Number of edges of each graph, the padding edges have ``src == -1``."""
+    mask = src != -1
     if batch is None:
-        return src, dst
-    return src[batch[src] == batch[dst]], dst[batch[src] == batch[dst]]
+        return jnp.sum(mask, keepdims=True).astype(jnp.int32)
+    if num_graphs is None:
+        if isinstance(batch, jax.core.Tracer):
+            raise ValueError(
+                "num_graphs must be specified to count the edges per graph under a jax transformation"
+            )
+        num_graphs = int(np.max(np.asarray(batch), initial=-1)) + 1
+    return jax.ops.segment_sum(
+        mask.astype(jnp.int32), jnp.where(mask, batch[src], num_graphs), num_graphs
+    )
+
+
+def _neighbors_to_edges(
+    neighbors: jax.Array, size: Optional[int]
+) -> Tuple[jax.Array, jax.Array, jax.Array]:
+    """Flatten the neighbors (padded with ``-1``) into an edge list."""
+    mask = neighbors >= 0
+    src, col = jnp.where(mask, size=size, fill_value=-1)
+    dst = jnp.where(src == -1, -1, neighbors[src, col])
+
+    if size is None:
+        overflow = jnp.array(False)
+    else:
+        overflow = jnp.sum(mask) > size
+    return src.astype(jnp.int32), dst.astype(jnp.int32), overflow
+
+
+def _cell_hash(cells: jax.Array, batch: jax.Array) -> jax.Array:
+    """Hash the integer cell coordinates ``(..., 3)`` and the graph index ``(...)`` into ``uint32``."""
+    c = jax.lax.bitcast_convert_type(cells.astype(jnp.int32), jnp.uint32)
+    b = jax.lax.bitcast_convert_type(batch.astype(jnp.int32), jnp.uint32)
+    return (
+        (c[..., 0] * np.uint32(73856093))
+        ^ (c[..., 1] * np.uint32(19349663))
+        ^ (c[..., 2] * np.uint32(83492791))
+        ^ (b * np.uint32(2654435761))
+    )
+
+
+def _cell_capacity(
+    data: jax.Array, data_batch: Optional[jax.Array], r_max: float
+) -> int:
+    """Largest number of points sharing a cell hash, the smallest ``cell_capacity`` without overflow."""
+    if isinstance(data, jax.core.Tracer):
+        raise ValueError(
+            "cell_capacity must be specified to use the cell list under a jax transformation"
+        )
+    if data.shape[0] == 0:
+        return 1
+    if data_batch is None:
+        data_batch = jnp.zeros((data.shape[0],), jnp.int32)
+    keys = np.asarray(_cell_hash(jnp.floor(data / r_max), data_batch))
+    return max(int(np.max(np.unique(keys, return_counts=True)[1])), 1)
+
+
+def _cell_list_neighbors(
+    query: jax.Array,
+    data: jax.Array,
+    r_max: float,
+    query_batch: Optional[jax.Array],
+    data_batch: Optional[jax.Array],
+    loop: bool,
+    cell_capacity: Optional[int],
+    max_num_neighbors: Optional[int],
+    chunk_size: int = 1024,
+) -> Tuple[jax.Array, jax.Array]:
+    """Neighbors of each query point using a cell list, shape ``(n_query, max_num_neighbors)``, padded with ``-1``.
+
+    The data points are sorted by the hash of their cell, the points of a cell are then a contiguous range
+    found with a binary search. Hash collisions only cost capacity, the candidates are filtered by distance.
+    """
+    n = query.shape[0]
+    m = data.shape[0]
+    has_batch = query_batch is not None
+    if query_batch is None:
+        query_batch = jnp.zeros((n,), jnp.int32)
+        data_batch = jnp.zeros((m,), jnp.int32)
+
+    keys = _cell_hash(jnp.floor(data / r_max), data_batch)  # [m]
+    perm = jnp.argsort(keys)
+    sorted_keys = keys[perm]
+
+    query_cells = jnp.floor(query / r_max).astype(jnp.int32)  # [n, 3]
+    offsets = jnp.array(list(itertools.product([-1, 0, 1], repeat=3)), jnp.int32)
+
+    def ranges(i):
+        neigh_cells = query_cells[i, None, :] + offsets  # [..., 27, 3]
+        neigh_keys = _cell_hash(neigh_cells, query_batch[i, None])  # [..., 27]
+        start = jnp.searchsorted(sorted_keys, neigh_keys, side="left")
+        end = jnp.searchsorted(sorted_keys, neigh_keys, side="right")
+        # two neighboring cells with the same hash share the same range, visit it once
+        duplicate = jnp.any(
+            (neigh_keys[..., :, None] == neigh_keys[..., None, :])
+            & jnp.tri(27, k=-1, dtype=bool),
+            axis=-1,
+        )
+        return start, jnp.where(duplicate, 0, end - start)
+
+    if cell_capacity is None:
+        cell_capacity = _cell_capacity(data, data_batch, r_max)
+
+    compact = max_num_neighbors is not None and max_num_neighbors < 27 * cell_capacity
+    if not compact:
+        max_num_neighbors = 27 * cell_capacity
+
+    k = jnp.arange(cell_capacity)
+
+    def neighbors(i):
+        # i: [chunk]
+        start, count = ranges(i)  # [chunk, 27]
+        cand = perm[jnp.minimum(start[..., None] + k, m - 1)]  # [chunk, 27, cap]
+        valid = k < count[..., None]
+        # the points of other cells colliding with a neighboring cell are far, except for the batch
+        if has_batch:
+            valid &= data_batch[cand] == query_batch[i, None, None]
+
+        d2 = jnp.sum(jnp.square(data[cand] - query[i, None, None, :]), axis=-1)
+        valid &= d2 < r_max**2
+        if not loop:
+            valid &= d2 > 0
+
+        cand = cand.reshape(i.shape[0], -1)
+        valid = valid.reshape(i.shape[0], -1)
+        cell_overflow = jnp.any(count > cell_capacity)
+        if not compact:
+            return jnp.where(valid, cand, -1), cell_overflow
+
+        # compact the valid candidates at the beginning of each row (a sort would be much slower)
+        col = jnp.cumsum(valid, axis=1) - 1
+        col = jnp.where(valid, col, max_num_neighbors)
+        row = jnp.arange(i.shape[0])[:, None]
+        output = jnp.full((i.shape[0], max_num_neighbors), -1, jnp.int32)
+        output = output.at[row, col].set(cand, mode="drop")
+
+        neighbor_overflow = jnp.any(jnp.sum(valid, axis=1) > max_num_neighbors)
+        return output, cell_overflow | neighbor_overflow
+
+    num_chunks = -(-n // chunk_size)
+    if num_chunks <= 1:
+        output, overflow = neighbors(jnp.arange(n))
+    else:
+        # process the points by chunks to bound the memory of the candidates
+        i = jnp.arange(num_chunks * chunk_size).reshape(num_chunks, chunk_size)
+        output, overflow = jax.lax.map(neighbors, jnp.minimum(i, n - 1))
+        output = output.reshape(-1, max_num_neighbors)[:n]
+        overflow = jnp.any(overflow)
+
+    return output.astype(jnp.int32), overflow
@@ -0,0 +1,169 @@
+import concurrent.futures
+import itertools
+import math
+import os
+from typing import Callable, Optional, Tuple
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+_executor = None
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1, thread_name_prefix="e3nn_radius_graph"
+        )
+    return _executor
+
+
+def _cell_keys(cells: np.ndarray, extent: np.ndarray) -> np.ndarray:
+    """Unique integer key of each cell ``(..., 4)`` (graph and cell coordinates), the cells outside ``[0, extent)`` get ``-1``."""
+    inside = np.all((cells >= 0) & (cells < extent), axis=-1)
+    key = cells[..., 0]
+    for a in range(1, 4):
+        key = key * extent[a] + cells[..., a]
+    return np.where(inside, key, -1)
+
+
+def _cell_coordinates(
+    data_cells: np.ndarray,
+) -> Tuple[Callable[[np.ndarray], np.ndarray], np.ndarray]:
+    """Map the cells ``(..., 4)`` to coordinates in ``[0, extent)`` such that the keys fit in ``int64``.
+
+    The coordinates are relative to the bounding box of the data cells. If the box has too many cells,
+    the coordinates along each axis are the ranks among the values occupied by the data,
+    the cells with values not occupied by the data are outside.
+    """
+    low = data_cells.min(0)
+    extent = data_cells.max(0) - low + 1
+    if math.prod(int(e) for e in extent) < 2**63:
+        return lambda cells: cells - low, extent
+
+    values = [np.unique(data_cells[:, a]) for a in range(4)]
+    extent = np.array([v.shape[0] for v in values], np.int64)
+    if math.prod(int(e) for e in extent) >= 2**63:
+        raise ValueError(
+            "Too many cells for the host method of radius_graph, use a larger r_max or another method"
+        )
+
+    def coordinates(cells: np.ndarray) -> np.ndarray:
+        ranks = []
+        for a, v in enumerate(values):
+            j = np.minimum(np.searchsorted(v, cells[..., a]), v.shape[0] - 1)
+            ranks.append(np.where(v[j] == cells[..., a], j, -1))
+        return np.stack(ranks, axis=-1)
+
+    return coordinates, extent
+
+
+def radius_graph_numpy(
+    query: np.ndarray,
+    data: np.ndarray,
+    r_max: float,
+    query_batch: Optional[np.ndarray] = None,
+    data_batch: Optional[np.ndarray] = None,
+    loop: bool = False,
+    chunk_size: int = 4096,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pairs ``(i, j)`` such that ``|query[i] - data[j]| < r_max``, sorted by ``i`` then ``j``.
+
+    Cell list on the host. The query points are processed by chunks in a thread pool
+    (the NumPy operations release the GIL).
+    """
+    query = np.asarray(query)
+    data = np.asarray(data)
+    n, m = query.shape[0], data.shape[0]
+    if n == 0 or m == 0:
+        return np.zeros((0,), np.int64), np.zeros((0,), np.int64)
+    if query_batch is None:
+        query_batch = np.zeros((n,), np.int64)
+        data_batch = np.zeros((m,), np.int64)
+    query_batch = np.asarray(query_batch, np.int64)
+    data_batch = np.asarray(data_batch, np.int64)
+
+    # the graph index is the first coordinate of the cells
+    data_cells = np.concatenate(
+        [data_batch[:, None], np.floor(data / r_max).astype(np.int64)], axis=1
+    )
+    query_cells = np.concatenate(
+        [query_batch[:, None], np.floor(query / r_max).astype(np.int64)], axis=1
+    )
+    coordinates, extent = _cell_coordinates(data_cells)
+
+    keys = _cell_keys(coordinates(data_cells), extent)
+    perm = np.argsort(keys, kind="stable")
+    sorted_keys = keys[perm]
+    offsets = np.array(list(itertools.product([0], *[[-1, 0, 1]] * 3)), np.int64)
+
+    def chunk(i: np.ndarray):
+        neigh_keys = _cell_keys(
+            coordinates(query_cells[i, None] + offsets), extent
+        )  # [chunk, 27]
+        start = np.searchsorted(sorted_keys, neigh_keys, side="left")
+        count = np.searchsorted(sorted_keys, neigh_keys, side="right") - start
+        count = np.where(neigh_keys == -1, 0, count).ravel()
+
+        # all the candidates of the chunk, without padding
+        total = count.sum()
+        first = np.repeat(np.cumsum(count) - count, count)
+        cand = perm[np.repeat(start.ravel(), count) + np.arange(total) - first]
+        src = np.repeat(np.repeat(i, 27), count)
+
+        d = np.linalg.norm(data[cand] - query[src], axis=-1)
+        mask = d < r_max
+        if not loop:
+            mask &= d > 0
+        src, cand = src[mask], cand[mask]
+        order = np.lexsort((cand, src))
+        return src[order], cand[order]
+
+    chunks = [np.arange(i, min(i + chunk_size, n)) for i in range(0, n, chunk_size)]
+    if len(chunks) == 1:
+        results = [chunk(chunks[0])]
+    else:
+        results = list(_get_executor().map(chunk, chunks))
+    src = np.concatenate([s for s, _ in results])
+    dst = np.concatenate([d for _, d in results])
+    return src, dst
+
+
+def _host_edges(
+    query: jax.Array,
+    data: jax.Array,
+    r_max: float,
+    query_batch: Optional[jax.Array],
+    data_batch: Optional[jax.Array],
+    loop: bool,
+    size: Optional[int],
+) -> Tuple[jax.Array, jax.Array, jax.Array]:
+    """Edges computed on the host, padded with ``-1`` to ``size``."""
+    has_batch = query_batch is not None
+
+    def f(query, data, r_max, *batches):
+        src, dst = radius_graph_numpy(query, data, float(r_max), *batches, loop=loop)
+        if size is None:
+            return src.astype(np.int32), dst.astype(np.int32), np.array(False)
+        overflow = np.array(src.shape[0] > size)
+        src = np.pad(src[:size], (0, max(size - src.shape[0], 0)), constant_values=-1)
+        dst = np.pad(dst[:size], (0, max(size - dst.shape[0], 0)), constant_values=-1)
+        return src.astype(np.int32), dst.astype(np.int32), overflow
+
+    args = (query, data, r_max) + ((query_batch, data_batch) if has_batch else ())
+
+    if size is None:
+        if any(isinstance(x, jax.core.Tracer) for x in args):
+            raise ValueError(
+                "size must be specified to use the host method under a jax transformation"
+            )
+        return tuple(jnp.asarray(x) for x in f(*map(np.asarray, args)))
+
+    shapes = (
+        jax.ShapeDtypeStruct((size,), jnp.int32),
+        jax.ShapeDtypeStruct((size,), jnp.int32),
+        jax.ShapeDtypeStruct((), jnp.bool_),
+    )
+    return jax.pure_callback(f, shapes, *args)
@@ -1,16 +1,19 @@
+import collections
+import functools
 import math
-from typing import Callable, List, Optional, Tuple, Union
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
 
 import jax
 import jax.numpy as jnp
 import numpy as np
-import scipy.signal
-import scipy.spatial
+import scipy.linalg
 
 import e3nn_jax as e3nn
 
 from .activation import parity_function
-from .so3 import change_basis_real_to_complex
+from .J import Jd
+from .so3 import change_basis_real_to_complex, generators
 from .spherical_harmonics.legendre import _sh_alpha, _sh_beta
 
 
@@ -369,13 +372,25 @@ class SphericalSignal:
     ) -> "SphericalSignal":
         """A wrapper for different transform_by functions."""
         coeffs = e3nn.from_s2grid(self, s2_irreps(lmax, self.p_val, self.p_arg))
-        transforms = {
-            "angles": coeffs.transform_by_angles,
-            "matrix": coeffs.transform_by_matrix,
-            "axis_angle": coeffs.transform_by_axis_angle,
-            "quaternion": coeffs.transform_by_quaternion,
-        }
-        transformed_coeffs = transforms[transform_type](**transform_kwargs)
+        k = 0
+        if transform_type == "angles":
+            angles = (
+                transform_kwargs["alpha"],
+                transform_kwargs["beta"],
+                transform_kwargs["gamma"],
+            )
+        elif transform_type == "matrix":
+            R = transform_kwargs["R"]
+            d = jnp.sign(jnp.linalg.det(R))
+            k = (1 - d) / 2
+            angles = e3nn.matrix_to_angles(d[..., None, None] * R)
+        elif transform_type == "axis_angle":
+            angles = e3nn.axis_angle_to_angles(
+                transform_kwargs["axis"], transform_kwargs["angle"]
+            )
+        elif transform_type == "quaternion":
+            angles = e3nn.quaternion_to_angles(transform_kwargs["q"])
+        transformed_coeffs = s2_rotate(coeffs, *angles, k=k)
         return e3nn.to_s2grid(
             transformed_coeffs,
             *self.grid_resolution,
@@ -425,54 +440,87 @@ class SphericalSignal:
             grid_values, self.quadrature, p_val=self.p_val, p_arg=self.p_arg
         )
 
-    @staticmethod
-    def _find_peaks_2d(x: np.ndarray) -> List[Tuple[int, int]]:
-        """Helper for finding peaks in a 2D signal."""
-        iii = []
-        for i in range(x.shape[0]):
-            jj, _ = scipy.signal.find_peaks(x[i, :])
-            iii += [(i, j) for j in jj]
+    def find_peaks(self, lmax: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        r"""Locate peaks on the signal on the sphere.
+
+        The peaks are the local maxima on the grid, with refined positions and values,
+        see `top_peaks` for a jittable version.
 
-        jjj = []
-        for j in range(x.shape[1]):
-            ii, _ = scipy.signal.find_peaks(x[:, j])
-            jjj += [(i, j) for i in ii]
+        Args:
+            lmax (int, optional): not used anymore
 
-        return list(set(iii).intersection(set(jjj)))
+        Returns:
+            (tuple): tuple containing:
+                x (`numpy.ndarray`): positions of the peaks, shape ``(num_peaks, 3)``
+                f (`numpy.ndarray`): values of the peaks, shape ``(num_peaks,)``
+        """
+        num_peaks = int(jnp.sum(_local_maxima(self.grid_values)))
+        x, f, _ = self.top_peaks(num_peaks, refine=True)
+        return np.asarray(x), np.asarray(f)
 
-    def find_peaks(self, lmax: int) -> Tuple[np.ndarray, np.ndarray]:
-        r"""Locate peaks on the signal on the sphere.
+    def top_peaks(
+        self, num_peaks: int, *, refine: bool = False
+    ) -> Tuple[jax.Array, jax.Array, jax.Array]:
+        r"""Highest local maxima of the signal on the grid, with a static number of outputs.
 
-        Currently cannot be wrapped with jax.jit().
+        A point of the grid is a peak if it is larger than its 8 neighbors.
+        The grid is periodic in :math:`\alpha` and the neighbors of the first and last rows are taken across the poles.
+        Works with batch dimensions and can be jitted.
+
+        Args:
+            num_peaks (int): number of outputs, padded when there are fewer peaks
+            refine (bool): refine the positions and values with a parabola through the neighbors
+                along :math:`\beta` and :math:`\alpha`
+
+        Returns:
+            (tuple): tuple containing:
+                x (`jax.Array`): positions of the peaks, shape ``(..., num_peaks, 3)``
+                f (`jax.Array`): values of the peaks in decreasing order, shape ``(..., num_peaks)``
+                mask (`jax.Array`): ``False`` for the padding, shape ``(..., num_peaks)``
+
+        Examples:
+            >>> coeffs = e3nn.s2_dirac(jnp.array([0.6, 0.0, 0.8]), 6, p_val=1, p_arg=-1)
+            >>> sig = e3nn.to_s2grid(coeffs, 20, 19, quadrature="soft")
+            >>> x, f, mask = sig.top_peaks(3, refine=True)
+            >>> bool(jnp.allclose(x[0], jnp.array([0.6, 0.0, 0.8]), atol=0.01))
+            True
         """
-        # TODO: Still has the bug `ValueError: buffer source array is read-only`
-        grid_resolution = self.grid_resolution
-        x1, f1 = self.grid_vectors, self.grid_values
-        x1, f1 = jax.tree_map(lambda arr: np.asarray(arr.copy()), (x1, f1))
-
-        # Rotate signal.
-        abc = (np.pi / 2, np.pi / 2, np.pi / 2)
-        rotated_signal = self.transform_by_angles(*abc, lmax=lmax)
-        rotated_vectors = e3nn.IrrepsArray("1o", x1).transform_by_angles(*abc).array
-        x2, f2 = rotated_vectors, rotated_signal.grid_values
-        x2, f2 = jax.tree_map(lambda arr: np.asarray(arr.copy()), (x2, f2))
-
-        ij = self._find_peaks_2d(f1)
-        x1p = np.stack([x1[i, j] for i, j in ij])
-        f1p = np.stack([f1[i, j] for i, j in ij])
-
-        ij = self._find_peaks_2d(f2)
-        x2p = np.stack([x2[i, j] for i, j in ij])
-        f2p = np.stack([f2[i, j] for i, j in ij])
-
-        # Union of the results
-        mask = scipy.spatial.distance.cdist(x1p, x2p) < 2 * np.pi / max(
-            *grid_resolution
+        f = self.grid_values
+        res_beta, res_alpha = self.grid_resolution
+        batch = f.shape[:-2]
+
+        peak = _local_maxima(f)
+        flat = jnp.where(peak, f, jnp.finfo(f.dtype).min)
+        _, index = jax.lax.top_k(flat.reshape(batch + (-1,)), num_peaks)
+        i, j = jnp.divmod(index, res_alpha)
+        mask = jnp.take_along_axis(peak.reshape(batch + (-1,)), index, -1)
+        values = jnp.take_along_axis(f.reshape(batch + (-1,)), index, -1)
+
+        y, alpha, _ = _s2grid(res_beta, res_alpha, self.quadrature)
+        beta = np.arccos(-y)  # y = -cos(beta)
+        beta = np.concatenate([[-beta[0]], beta, [2 * np.pi - beta[-1]]])
+        beta, alpha = jnp.asarray(beta, f.dtype), jnp.asarray(alpha, f.dtype)
+        b, a = beta[i + 1], alpha[j]
+
+        if refine:
+            g = _pad_across_poles(f).reshape(batch + (-1,))
+
+            def value(di, dj):
+                k = (i + 1 + di) * res_alpha + (j + dj) % res_alpha
+                return jnp.take_along_axis(g, k, -1)
+
+            db, fb = _parabola(value(-1, 0), values, value(1, 0))
+            da, fa = _parabola(value(0, -1), values, value(0, 1))
+            b = b + db * jnp.where(db > 0, beta[i + 2] - b, b - beta[i])
+            a = a + da * (2 * np.pi / res_alpha)
+            values = values + fb + fa
+
+        x = jnp.stack(
+            [jnp.sin(b) * jnp.sin(a), -jnp.cos(b), jnp.sin(b) * jnp.cos(a)], axis=-1
         )
-        x = np.concatenate([x1p[mask.sum(axis=1) == 0], x2p])
-        f = np.concatenate([f1p[mask.sum(axis=1) == 0], f2p])
-
-        return x, f
+        x = jnp.where(mask[..., None], x, 0.0)
+        values = jnp.where(mask, values, 0.0)
+        return x, values, mask
 
     def pad_to_plot(
         self,
@@ -597,19 +645,28 @@ class SphericalSignal:
         integral_irreps = {1: "0e", -1: "0o"}[self.p_val]
         return e3nn.IrrepsArray(integral_irreps, values)
 
-    def sample(self, key: jax.Array) -> Tuple[jax.Array, jax.Array]:
-        """Sample a point on the sphere using the signal as a probability distribution.
+    def sample(
+        self, key: jax.Array, num_samples: Optional[int] = None, *, jitter: bool = False
+    ) -> Union[Tuple[jax.Array, jax.Array], jax.Array]:
+        """Sample points on the sphere using the signal as a probability distribution.
 
         The probability distribution does not need to be normalized.
+        The cumulative distributions (marginal in beta and conditional in alpha) are computed once per signal,
+        each sample then costs a binary search.
 
         Args:
             key (`jax.Array`): random key
+            num_samples (int, optional): number of samples per signal, if ``None`` a single sample without extra axis
+            jitter (bool): if ``True``, returns points drawn uniformly inside the sampled grid cells
+                instead of the indices of the cells
 
         Returns:
             (tuple): tuple containing:
 
-                beta_index (`jax.Array`): index of the sampled beta
-                alpha_index (`jax.Array`): index of the sampled alpha
+                beta_index (`jax.Array`): index of the sampled beta, shape ``(..., num_samples)``
+                alpha_index (`jax.Array`): index of the sampled alpha, shape ``(..., num_samples)``
+
+            or if ``jitter`` is ``True``, the sampled points of shape ``(..., num_samples, 3)``
 
         Examples:
 
@@ -630,27 +687,44 @@ class SphericalSignal:
             beta_index, alpha_index = signal.sample(jax.random.PRNGKey(0))
             print(beta_index, alpha_index)
             print(signal.grid_vectors[beta_index, alpha_index])
-        """
 
-        def f(k, p_ya):  # single signal only
-            assert k.shape == (2,)
-            assert p_ya.shape == (self.res_beta, self.res_alpha)
-            k1, k2 = jax.random.split(k)
-            p_y = self.quadrature_weights * jnp.sum(p_ya, axis=1)  # [y]
-            y_index = jax.random.choice(k1, jnp.arange(self.res_beta), p=p_y)  # []
-            alpha_index = jax.random.choice(
-                k2, jnp.arange(self.res_alpha), p=p_ya[y_index]
-            )  # []
-            return y_index, alpha_index
-
-        vf = f
-        for _ in range(self.ndim - 2):
-            vf = jax.vmap(vf)
-
-        keys = jax.random.split(key, math.prod(self.shape[:-2])).reshape(
-            self.shape[:-2] + key.shape
-        )
-        return vf(keys, self.grid_values)
+        .. jupyter-execute::
+
+            x = signal.sample(jax.random.PRNGKey(0), 1000, jitter=True)
+            print(x.shape, jnp.mean(x, axis=0))
+        """
+        shape = self.shape[:-2] + (1 if num_samples is None else num_samples,)
+        k_beta, k_alpha = jax.random.split(key)
+
+        # cumulative distribution of the cells, flattened in the order (beta, alpha)
+        qw = self.quadrature_weights
+        cdf_alpha = jnp.cumsum(self.grid_values, axis=-1)  # [..., beta, alpha]
+        p_beta = qw * cdf_alpha[..., -1]  # [..., beta]
+        cdf_beta = jnp.cumsum(p_beta, axis=-1)  # [..., beta]
+        cdf = (cdf_beta - p_beta)[..., None] + qw[:, None] * cdf_alpha
+        cdf = cdf.reshape(self.shape[:-2] + (self.res_beta * self.res_alpha,))
+
+        u = jax.random.uniform(k_beta, shape, cdf.dtype) * cdf[..., -1:]
+        index = _searchsorted(cdf, u)
+        beta_index, alpha_index = jnp.divmod(index, self.res_alpha)
+
+        if jitter:
+            y, alpha, qw = _s2grid(self.res_beta, self.res_alpha, self.quadrature)
+            # cells of area proportional to the quadrature weights, uniform in y and alpha
+            y_edges = np.concatenate([[-1.0], -1.0 + 2.0 * np.cumsum(qw)])
+            u_y, u_alpha = jax.random.uniform(k_alpha, (2,) + shape, cdf.dtype)
+            y_low = jnp.asarray(y_edges[:-1], cdf.dtype)[beta_index]
+            y_high = jnp.asarray(y_edges[1:], cdf.dtype)[beta_index]
+            y = jnp.clip(y_low + u_y * (y_high - y_low), -1.0, 1.0)
+            alpha = jnp.asarray(alpha, cdf.dtype)[alpha_index]
+            alpha = alpha + (u_alpha - 0.5) * (2 * jnp.pi / self.res_alpha)
+            r = jnp.sqrt(1.0 - y**2)
+            x = jnp.stack([r * jnp.sin(alpha), y, r * jnp.cos(alpha)], axis=-1)
+            return x[..., 0, :] if num_samples is None else x
+
+        if num_samples is None:
+            return beta_index[..., 0], alpha_index[..., 0]
+        return beta_index, alpha_index
 
     def __getitem__(self, index) -> "SphericalSignal":
         grid_values = self.grid_values[index]
@@ -829,6 +903,8 @@ def from_s2grid(
     lmax_in: Optional[int] = None,
     fft: bool = True,
     use_s2fft: bool = False,
+    use_legendre_recursion: bool = False,
+    batch_chunk_size: Optional[int] = None,
 ) -> e3nn.IrrepsArray:
     r"""Transform signal on the sphere into spherical harmonics coefficients.
 
@@ -842,6 +918,11 @@ def from_s2grid(
         normalization ({'norm', 'component', 'integral'}): normalization of the spherical harmonics basis
         lmax_in (int, optional): maximum degree of the input signal, only used for normalization purposes
         fft (bool): True if we use FFT, False if we use the naive implementation
+        use_legendre_recursion (bool): compute the Legendre functions on the fly with a recursion over :math:`l`
+            instead of using a precomputed table. The memory goes from :math:`O(l_{\mathit{max}}^2 N)` to
+            :math:`O(l_{\mathit{max}} N)`, for large ``lmax``.
+        batch_chunk_size (int, optional): if given, the leading (batch) dimensions are flattened and transformed
+            by chunks of ``batch_chunk_size`` signals in a `jax.lax.map`, to bound the memory of the intermediates
 
     Returns:
         `IrrepsArray`: coefficient array of shape ``(..., (lmax+1)^2)``
@@ -860,25 +941,42 @@ def from_s2grid(
     if lmax_in is None:
         lmax_in = lmax
 
+    if batch_chunk_size is not None and math.prod(x.shape[:-2]) > batch_chunk_size:
+
+        def f(values: jax.Array) -> jax.Array:
+            return from_s2grid(
+                SphericalSignal(values, x.quadrature, p_val=x.p_val, p_arg=x.p_arg),
+                irreps,
+                normalization=normalization,
+                lmax_in=lmax_in,
+                fft=fft,
+                use_s2fft=use_s2fft,
+                use_legendre_recursion=use_legendre_recursion,
+            ).array
+
+        return e3nn.IrrepsArray(
+            irreps, _map_batch_chunks(f, x.grid_values, 2, batch_chunk_size)
+        )
+
     if use_s2fft:
         _check_compatibility_with_s2fft(
             lmax, x.res_beta, x.res_alpha, x.quadrature, fft
         )
         return _from_s2grid_s2fft(x, irreps, normalization=normalization)
 
-    with jax.ensure_compile_time_eval():
-        _, _, sh_y, sha, qw = _spherical_harmonics_s2grid(
-            lmax, res_beta, res_alpha, quadrature=x.quadrature, dtype=x.dtype
-        )
-        # sh_y: (res_beta, l, |m|)
-
-        n = _normalization(lmax, normalization, x.dtype, "from_s2", lmax_in)
-
-        # prepare beta integrand
-        m_in = jnp.asarray(_expand_matrix(range(lmax + 1)), x.dtype)  # [l, m, j]
-        m_out = jnp.asarray(_expand_matrix(irreps.ls), x.dtype)  # [l, m, i]
-        sh_y = _rollout_sh(sh_y, lmax)
-        sh_y = jnp.einsum("lmj,bj,lmi,l,b->mbi", m_in, sh_y, m_out, n, qw)  # [m, b, i]
+    if use_legendre_recursion:
+        sha = None if fft else _sh_alpha_s2grid(lmax, res_alpha, x.dtype)
+    else:
+        sh_y, _, block, sha = _s2grid_operator(
+            "from_s2",
+            tuple(irreps.ls),
+            res_beta,
+            res_alpha,
+            x.quadrature,
+            normalization,
+            lmax_in,
+            x.dtype,
+        )  # sh_y: [m, b, k]
 
     # integrate over alpha
     if fft:
@@ -889,7 +987,14 @@ def from_s2grid(
         )  # [..., res_beta, 2*l+1]
 
     # integrate over beta
-    int_b = jnp.einsum("mbi,...bm->...i", sh_y.astype(x.dtype), int_a)  # [..., irreps]
+    if use_legendre_recursion:
+        int_b = _from_s2_beta_recursion(
+            int_a, irreps, x.quadrature, normalization, lmax_in
+        )  # [..., irreps]
+    else:
+        # frequency by frequency
+        int_b = jnp.einsum("mbk,...bm->...mk", sh_y.astype(x.dtype), int_a)
+        int_b = jnp.reshape(int_b, int_b.shape[:-2] + (-1,))[..., block]
 
     # convert to IrrepsArray
     return e3nn.IrrepsArray(irreps, int_b)
@@ -953,6 +1058,8 @@ def to_s2grid(
     p_val: Optional[int] = None,
     p_arg: Optional[int] = None,
     use_s2fft: bool = False,
+    use_legendre_recursion: bool = False,
+    batch_chunk_size: Optional[int] = None,
 ) -> SphericalSignal:
     r"""Sample a signal on the sphere given by the coefficient in the spherical harmonics basis.
 
@@ -967,6 +1074,11 @@ def to_s2grid(
         fft (bool): True if we use FFT, False if we use the naive implementation
         p_val (int, optional): parity of the value of the signal
         p_arg (int, optional): parity of the argument of the signal
+        use_legendre_recursion (bool): compute the Legendre functions on the fly with a recursion over :math:`l`
+            instead of using a precomputed table. The memory goes from :math:`O(l_{\mathit{max}}^2 N)` to
+            :math:`O(l_{\mathit{max}} N)`, for large ``lmax``.
+        batch_chunk_size (int, optional): if given, the leading (batch) dimensions are flattened and transformed
+            by chunks of ``batch_chunk_size`` signals in a `jax.lax.map`, to bound the memory of the intermediates
 
     Returns:
         `SphericalSignal`: signal on the sphere of shape ``(..., y/beta, alpha)``
@@ -1038,6 +1150,25 @@ def to_s2grid(
             f"p_val and p_arg cannot be determined from the irreps {coeffs.irreps}, please specify them."
         )
 
+    if batch_chunk_size is not None and math.prod(coeffs.shape[:-1]) > batch_chunk_size:
+
+        def f(x: jax.Array) -> jax.Array:
+            return to_s2grid(
+                e3nn.IrrepsArray(coeffs.irreps, x),
+                res_beta,
+                res_alpha,
+                quadrature=quadrature,
+                normalization=normalization,
+                fft=fft,
+                p_val=p_val,
+                p_arg=p_arg,
+                use_s2fft=use_s2fft,
+                use_legendre_recursion=use_legendre_recursion,
+            ).grid_values
+
+        signal = _map_batch_chunks(f, coeffs.array, 1, batch_chunk_size)
+        return SphericalSignal(signal, quadrature=quadrature, p_val=p_val, p_arg=p_arg)
+
     if use_s2fft:
         _check_compatibility_with_s2fft(lmax, res_beta, res_alpha, quadrature, fft)
         return _to_s2grid_s2fft(
@@ -1049,23 +1180,29 @@ def to_s2grid(
             p_arg=p_arg,
         )
 
-    with jax.ensure_compile_time_eval():
-        _, _, sh_y, sha, _ = _spherical_harmonics_s2grid(
-            lmax, res_beta, res_alpha, quadrature=quadrature, dtype=coeffs.dtype
-        )
-
-        n = _normalization(lmax, normalization, coeffs.dtype, "to_s2")
-
-        m_in = jnp.asarray(_expand_matrix(range(lmax + 1)), coeffs.dtype)  # [l, m, j]
-        m_out = jnp.asarray(_expand_matrix(coeffs.irreps.ls), coeffs.dtype)  # [l, m, i]
-        # put beta component in summable form
-        sh_y = _rollout_sh(sh_y, lmax)
-        sh_y = jnp.einsum("lmj,bj,lmi,l->mbi", m_in, sh_y, m_out, n)  # [m, b, i]
-
-    # multiply spherical harmonics by their coefficients
-    signal_b = jnp.einsum(
-        "mbi,...i->...bm", sh_y.astype(coeffs.dtype), coeffs.array
-    )  # [batch, beta, m]
+    if use_legendre_recursion:
+        sha = None if fft else _sh_alpha_s2grid(lmax, res_alpha, coeffs.dtype)
+        signal_b = _to_s2_beta_recursion(
+            coeffs, res_beta, quadrature, normalization
+        )  # [batch, beta, m]
+    else:
+        sh_y, index, _, sha = _s2grid_operator(
+            "to_s2",
+            tuple(coeffs.irreps.ls),
+            res_beta,
+            res_alpha,
+            quadrature,
+            normalization,
+            None,
+            coeffs.dtype,
+        )  # sh_y: [m, b, k]
+
+        # multiply spherical harmonics by their coefficients, frequency by frequency
+        zero = jnp.zeros(coeffs.shape[:-1] + (1,), coeffs.dtype)
+        x = jnp.concatenate([coeffs.array, zero], axis=-1)[..., index]  # [..., m, k]
+        signal_b = jnp.einsum(
+            "mbk,...mk->...bm", sh_y.astype(coeffs.dtype), x
+        )  # [batch, beta, m]
 
     if fft:
         if res_alpha % 2 == 0:
@@ -1132,6 +1269,256 @@ def _to_s2grid_s2fft(
     return _to_s2grid_s2fft_single_dim(coeffs)
 
 
+def s2_activation(
+    coeffs: e3nn.IrrepsArray,
+    act: Callable[[jax.Array], jax.Array],
+    res_beta: int,
+    res_alpha: int,
+    *,
+    quadrature: str,
+    irreps_out: Optional[e3nn.Irreps] = None,
+    normalization: str = "integral",
+    fft: bool = True,
+    p_val: Optional[int] = None,
+    p_arg: Optional[int] = None,
+    use_legendre_recursion: bool = False,
+    batch_chunk_size: Optional[int] = None,
+) -> e3nn.IrrepsArray:
+    r"""Apply a pointwise activation to a signal on the sphere given by its coefficients.
+
+    Computes the same thing as
+
+    .. code-block:: python
+
+        from_s2grid(to_s2grid(coeffs, res_beta, res_alpha, ...).apply(act), irreps_out, ...)
+
+    but the gradient recomputes the signal on the grid instead of storing it.
+    Reverse mode only keeps the coefficients, the grid values and the FFT intermediates are not saved.
+    Forward mode differentiation is not supported.
+
+    Args:
+        coeffs (`IrrepsArray`): coefficient array
+        act (callable): pointwise activation, it can close over parameters,
+            their gradient is computed as well
+        res_beta (int): number of points on the sphere in the :math:`\theta` direction
+        res_alpha (int): number of points on the sphere in the :math:`\phi` direction
+        quadrature (str): "soft" or "gausslegendre"
+        irreps_out (`Irreps`, optional): irreps of the output, by default ``s2_irreps(lmax)``
+            with the parity of the activated signal
+        normalization ({'norm', 'component', 'integral'}): normalization of the basis
+        fft (bool): True if we use FFT, False if we use the naive implementation
+        p_val (int, optional): parity of the value of the signal
+        p_arg (int, optional): parity of the argument of the signal
+        use_legendre_recursion (bool): see `to_s2grid`
+        batch_chunk_size (int, optional): see `to_s2grid`, the signals of a chunk are
+            transformed, activated and transformed back before the next chunk
+
+    Returns:
+        `IrrepsArray`: coefficients of the activated signal
+
+    Examples:
+        >>> x = e3nn.IrrepsArray("0e + 1o", jnp.array([1.0, 0.0, 0.5, 0.0]))
+        >>> e3nn.s2_activation(x, jax.nn.relu, 20, 39, quadrature="gausslegendre").irreps
+        1x0e+1x1o
+    """
+    coeffs = coeffs.regroup()
+
+    if (p_val is not None) != (p_arg is not None):
+        raise ValueError("p_val and p_arg should be both None or both not None.")
+
+    p_val, p_arg = _check_parities(coeffs.irreps, p_val, p_arg)
+
+    if p_val is None or p_arg is None:
+        raise ValueError(
+            f"p_val and p_arg cannot be determined from the irreps {coeffs.irreps}, please specify them."
+        )
+
+    new_p_val = parity_function(act) if p_val == -1 else p_val
+    if new_p_val == 0:
+        raise ValueError(
+            "Activation: the parity is violated! The input scalar is odd but the activation is neither even nor odd."
+        )
+
+    if irreps_out is None:
+        irreps_out = s2_irreps(coeffs.irreps.lmax, p_val=new_p_val, p_arg=p_arg)
+    irreps_out = e3nn.Irreps(irreps_out)
+
+    def to_grid(x: jax.Array) -> jax.Array:
+        return to_s2grid(
+            e3nn.IrrepsArray(coeffs.irreps, x),
+            res_beta,
+            res_alpha,
+            quadrature=quadrature,
+            normalization=normalization,
+            fft=fft,
+            p_val=p_val,
+            p_arg=p_arg,
+            use_legendre_recursion=use_legendre_recursion,
+        ).grid_values
+
+    def from_grid(y: jax.Array) -> jax.Array:
+        return from_s2grid(
+            SphericalSignal(y, quadrature, p_val=new_p_val, p_arg=p_arg),
+            irreps_out,
+            normalization=normalization,
+            fft=fft,
+            use_legendre_recursion=use_legendre_recursion,
+        ).array
+
+    def f(x: jax.Array) -> jax.Array:
+        # the values closed over by act (e.g. learned parameters) become explicit differentiable inputs
+        y = jax.eval_shape(to_grid, x)
+        act_closed, consts = jax.closure_convert(act, jnp.zeros(y.shape, y.dtype))
+        return _s2_activation(act_closed, to_grid, from_grid, consts, x)
+
+    if batch_chunk_size is not None and math.prod(coeffs.shape[:-1]) > batch_chunk_size:
+        return e3nn.IrrepsArray(
+            irreps_out, _map_batch_chunks(f, coeffs.array, 1, batch_chunk_size)
+        )
+    return e3nn.IrrepsArray(irreps_out, f(coeffs.array))
+
+
+def _map_batch_chunks(
+    f: Callable[[jax.Array], jax.Array], x: jax.Array, event_ndim: int, chunk_size: int
+) -> jax.Array:
+    """Apply ``f`` to chunks of ``chunk_size`` elements of the flattened leading dimensions of ``x``.
+
+    The last chunk is padded with zeros.
+    """
+    batch_shape = x.shape[: x.ndim - event_ndim]
+    event_shape = x.shape[x.ndim - event_ndim :]
+    n = math.prod(batch_shape)
+    num_chunks = -(-n // chunk_size)
+
+    x = jnp.reshape(x, (n,) + event_shape)
+    x = jnp.pad(x, [(0, num_chunks * chunk_size - n)] + [(0, 0)] * event_ndim)
+    y = jax.lax.map(f, jnp.reshape(x, (num_chunks, chunk_size) + event_shape))
+    y = jnp.reshape(y, (num_chunks * chunk_size,) + y.shape[2:])[:n]
+    return jnp.reshape(y, batch_shape + y.shape[1:])
+
+
+@functools.partial(jax.custom_vjp, nondiff_argnums=(0, 1, 2))
+def _s2_activation(act, to_grid, from_grid, consts, x):
+    return from_grid(act(to_grid(x), *consts))
+
+
+def _s2_activation_fwd(act, to_grid, from_grid, consts, x):
+    return from_grid(act(to_grid(x), *consts)), (consts, x)
+
+
+def _s2_activation_bwd(act, to_grid, from_grid, res, g):
+    consts, x = res
+    # recompute the grid
+    y, to_grid_vjp = jax.vjp(to_grid, x)
+    z, act_vjp = jax.vjp(act, y, *consts)
+    _, from_grid_vjp = jax.vjp(from_grid, z)
+    (g,) = from_grid_vjp(g)
+    g, *g_consts = act_vjp(g)
+    (g,) = to_grid_vjp(g)
+    return g_consts, g
+
+
+_s2_activation.defvjp(_s2_activation_fwd, _s2_activation_bwd)
+
+
+def s2_rotate(
+    coeffs: e3nn.IrrepsArray,
+    alpha: jax.Array,
+    beta: jax.Array,
+    gamma: jax.Array,
+    *,
+    k: jax.Array = 0,
+    inverse: bool = False,
+) -> e3nn.IrrepsArray:
+    r"""Rotate the coefficients of signals on the sphere.
+
+    Computes the same thing as ``coeffs.transform_by_angles(alpha, beta, gamma, k, inverse)``
+    but all the degrees are rotated together in a packed ``[..., l, m]`` layout:
+    the rotations around the Y axis are pointwise in :math:`m` and
+    the rotation around the X axis is a single batched matrix product over :math:`l`.
+    No Wigner D matrix is formed. The angles can have batch dimensions, broadcasted with the ones of ``coeffs``,
+    for instance to rotate each signal of a batch differently.
+    Rotations can be chained without going through the grid.
+
+    Args:
+        coeffs (`IrrepsArray`): coefficients, each :math:`l` at most once (like ``s2_irreps(lmax)``)
+        alpha (`jax.Array`): third rotation angle around the Y axis
+        beta (`jax.Array`): second rotation angle around the X axis
+        gamma (`jax.Array`): first rotation angle around the Y axis
+        k (`jax.Array`): number of times the parity is applied
+        inverse (bool): if True, apply the inverse rotation
+
+    Returns:
+        `IrrepsArray`: rotated coefficients
+
+    Examples:
+        >>> x = e3nn.normal(e3nn.s2_irreps(3), jax.random.PRNGKey(0), (10,))
+        >>> alpha, beta, gamma = e3nn.rand_angles(jax.random.PRNGKey(1), (10,))
+        >>> y = e3nn.s2_rotate(x, alpha, beta, gamma)
+        >>> z = jax.vmap(lambda x, a, b, c: x.transform_by_angles(a, b, c))(x, alpha, beta, gamma)
+        >>> bool(jnp.allclose(y.array, z.array, atol=1e-5))
+        True
+    """
+    if not all(mul == 1 for mul, _ in coeffs.irreps) or len(
+        set(coeffs.irreps.ls)
+    ) != len(coeffs.irreps.ls):
+        raise ValueError(
+            f"Each l should appear at most once in the irreps. Got {coeffs.irreps}."
+        )
+
+    lmax = coeffs.irreps.lmax
+    dtype = coeffs.dtype
+    alpha, beta, gamma = (jnp.asarray(a, dtype) for a in (alpha, beta, gamma))
+    k = jnp.asarray(k)
+    if inverse:
+        alpha, beta, gamma = -gamma, -beta, -alpha
+
+    shape = jnp.broadcast_shapes(
+        coeffs.shape[:-1], alpha.shape, beta.shape, gamma.shape, k.shape
+    )
+    index = np.full(((lmax + 1) * (2 * lmax + 1),), coeffs.irreps.dim, np.int32)
+    index[_degree_index(coeffs.irreps.ls, lmax)] = np.arange(coeffs.irreps.dim)
+    zero = jnp.zeros(coeffs.shape[:-1] + (1,), dtype)
+    x = jnp.concatenate([coeffs.array, zero], axis=-1)[..., index]
+    x = jnp.reshape(x, coeffs.shape[:-1] + (lmax + 1, 2 * lmax + 1))
+    x = jnp.broadcast_to(x, shape + (lmax + 1, 2 * lmax + 1))  # [..., l, m]
+
+    m = jnp.arange(-lmax, lmax + 1, dtype=dtype)
+    J = jnp.asarray(_packed_J(lmax), dtype)  # [l, m, m]
+
+    def rot_y(x, phi):
+        phi = phi[..., None, None] * m
+        return jnp.cos(phi) * x - jnp.sin(phi) * jnp.flip(x, -1)
+
+    x = rot_y(x, gamma)
+    x = jnp.einsum("lij,...lj->...li", J, x)
+    x = rot_y(x, beta)
+    x = jnp.einsum("lij,...lj->...li", J, x)
+    x = rot_y(x, alpha)
+
+    p = np.zeros((lmax + 1,), np.int32)
+    for _, ir in coeffs.irreps:
+        p[ir.l] = ir.p
+    x = x * jnp.power(p, k[..., None])[..., None].astype(dtype)
+
+    x = jnp.reshape(x, shape + (-1,))[..., _degree_index(coeffs.irreps.ls, lmax)]
+    return e3nn.IrrepsArray(coeffs.irreps, x)
+
+
+@functools.lru_cache(maxsize=None)
+def _packed_J(lmax: int) -> np.ndarray:
+    """Change of basis ``J[l]`` exchanging the Y and X axes, such that a rotation around X is ``J rot_y J``, zero padded to ``2 lmax + 1``."""
+    J = np.zeros((lmax + 1, 2 * lmax + 1, 2 * lmax + 1))
+    for l in range(lmax + 1):
+        if l < len(Jd):
+            J_l = Jd[l]
+        else:
+            X = generators(l)
+            J_l = (-1) ** l * scipy.linalg.expm(np.pi / np.sqrt(2) * (X[0] + X[1]))
+        J[l, lmax - l : lmax + l + 1, lmax - l : lmax + l + 1] = J_l
+    return J
+
+
 def legendre_transform_to_s2grid(
     coeffs: jax.Array,
     res_beta: int,
@@ -1244,6 +1631,7 @@ def to_s2point(
     """Evaluate a signal on the sphere given by the coefficient in the spherical harmonics basis.
 
     It computes the same thing as :func:`to_s2grid` but at a single point.
+    See `S2PointEvaluator` to evaluate many signals at the same points.
 
     Args:
         coeffs (`IrrepsArray`): coefficient array of shape ``(*shape1, irreps)``
@@ -1254,37 +1642,324 @@ def to_s2point(
         `IrrepsArray`: signal on the sphere of shape ``(*shape1, *shape2, irreps)``
     """
     coeffs = coeffs.regroup()
+    return S2PointEvaluator(point, coeffs.irreps, normalization=normalization)(coeffs)
 
-    if not all(mul == 1 for mul, _ in coeffs.irreps):
-        raise ValueError(f"Multiplicities should be ones. Got {coeffs.irreps}.")
 
-    if not isinstance(point, e3nn.IrrepsArray):
-        raise TypeError(f"point should be an e3nn.IrrepsArray, got {type(point)}.")
+class S2PointEvaluator:
+    r"""Evaluate signals on the sphere at fixed points.
+
+    The spherical harmonics of the points are computed once, when the evaluator is created.
+    Each call is then a single matrix product with the coefficients. :math:`A_{pi} = Y_i(x_p)`
+    (with the normalization of `to_s2grid`) is the matrix of the evaluation:
+    `__call__` computes :math:`A c`, `transpose` computes :math:`A^T v` and `fit` solves the least squares problem
+    :math:`\min_c |A c - v|^2 + \lambda |c|^2`.
+
+    With ``chunk_size``, the points are processed by chunks in a `jax.lax.map` (`jax.lax.scan` for the reductions).
+    With ``precompute=False`` the harmonics of each chunk are recomputed on the fly instead of being stored,
+    for very large sets of points.
+
+    Args:
+        points (`IrrepsArray`): points on the sphere of shape ``(*shape2, 3)`` and irreps ``1e`` or ``1o``
+        irreps (`Irreps`): irreps of the coefficients, multiplicities should be ones
+        normalization ({'norm', 'component', 'integral'}): normalization of the basis
+        chunk_size (int, optional): number of points per chunk
+        precompute (bool): whether to store the harmonics of the points
 
-    if point.irreps not in ["1e", "1o"]:
-        raise ValueError(f"point should be of irreps '1e' or '1o', got {point.irreps}.")
+    Examples:
+        >>> points = e3nn.IrrepsArray("1o", jax.random.normal(jax.random.PRNGKey(0), (100, 3)))
+        >>> evaluator = e3nn.S2PointEvaluator(points, e3nn.s2_irreps(2))
+        >>> coeffs = e3nn.normal(e3nn.s2_irreps(2), jax.random.PRNGKey(1), (8,))
+        >>> evaluator(coeffs).shape
+        (8, 100, 1)
+        >>> bool(jnp.allclose(evaluator.fit(evaluator(coeffs)).array, coeffs.array, atol=1e-4))
+        True
+    """
 
-    p_arg = point.irreps[0].ir.p
-    p_val, _ = _check_parities(coeffs.irreps, None, p_arg)
+    def __init__(
+        self,
+        points: e3nn.IrrepsArray,
+        irreps: e3nn.Irreps,
+        *,
+        normalization: str = "integral",
+        chunk_size: Optional[int] = None,
+        precompute: bool = True,
+    ):
+        irreps = e3nn.Irreps(irreps).regroup()
+
+        if not all(mul == 1 for mul, _ in irreps):
+            raise ValueError(f"Multiplicities should be ones. Got {irreps}.")
+
+        if not isinstance(points, e3nn.IrrepsArray):
+            raise TypeError(
+                f"points should be an e3nn.IrrepsArray, got {type(points)}."
+            )
+
+        if points.irreps not in ["1e", "1o"]:
+            raise ValueError(
+                f"points should be of irreps '1e' or '1o', got {points.irreps}."
+            )
 
-    sh = e3nn.spherical_harmonics(
-        coeffs.irreps.ls, point, True, "integral"
-    )  # [*shape2, irreps]
-    n = _normalization(sh.irreps.lmax, normalization, coeffs.dtype, "to_s2")[
-        jnp.array(sh.irreps.ls)
-    ]  # [num_irreps]
-    sh = sh * n
+        p_arg = points.irreps[0].ir.p
+        self.p_val, _ = _check_parities(irreps, None, p_arg)
+        self.irreps = irreps
+        self.points = points
+        self.normalization = normalization
+        self.chunk_size = chunk_size
+        self.precompute = precompute
 
-    shape1 = coeffs.shape[:-1]
-    coeffs = coeffs.reshape((-1, coeffs.shape[-1]))
-    shape2 = point.shape[:-1]
-    sh = sh.reshape((-1, sh.shape[-1]))
+        self.matrix = None  # [num_points, irreps]
+        if precompute:
+            self.matrix = self._harmonics(self.points.array.reshape(-1, 3))
 
-    irreps = {1: "0e", -1: "0o"}[p_val]
-    return e3nn.IrrepsArray(
-        irreps,
-        jnp.einsum("ai,bi->ab", sh.array, coeffs.array).reshape(shape1 + shape2 + (1,)),
+    @staticmethod
+    def _from_data(
+        points, matrix, irreps, p_val, normalization, chunk_size, precompute
+    ):
+        self = object.__new__(S2PointEvaluator)
+        self.points = points
+        self.matrix = matrix
+        self.irreps = irreps
+        self.p_val = p_val
+        self.normalization = normalization
+        self.chunk_size = chunk_size
+        self.precompute = precompute
+        return self
+
+    def __repr__(self) -> str:
+        return (
+            f"S2PointEvaluator(num_points={self.num_points}, irreps={self.irreps}, "
+            f"normalization={self.normalization}, chunk_size={self.chunk_size})"
+        )
+
+    @property
+    def num_points(self) -> int:
+        """Number of points."""
+        return math.prod(self.points.shape[:-1])
+
+    def _harmonics(self, x: jax.Array) -> jax.Array:
+        """Normalized spherical harmonics of the points ``x``, shape ``[n, irreps]``."""
+        sh = e3nn.spherical_harmonics(
+            self.irreps.ls, e3nn.IrrepsArray(self.points.irreps, x), True, "integral"
+        )
+        n = _normalization(self.irreps.lmax, self.normalization, sh.dtype, "to_s2")
+        return (sh * n[jnp.array(self.irreps.ls)]).array
+
+    def _full_matrix(self) -> jax.Array:
+        if self.precompute:
+            return self.matrix
+        return self._harmonics(self.points.array.reshape(-1, 3))
+
+    def _chunks(self) -> Tuple[Any, Callable[[Any], jax.Array]]:
+        """Chunks of the matrix or of the points, ``[num_chunks, chunk_size, ...]``, and the function giving the matrix of a chunk.
+
+        The padding rows of the matrix are zero.
+        """
+        num_chunks = -(-self.num_points // self.chunk_size)
+        pad = num_chunks * self.chunk_size - self.num_points
+        if self.precompute:
+            x = jnp.pad(self.matrix, [(0, pad), (0, 0)])
+            return x.reshape(num_chunks, self.chunk_size, -1), lambda x: x
+
+        x = self.points.array.reshape(-1, 3)
+        x = jnp.concatenate(
+            [x, jnp.broadcast_to(jnp.array([0.0, 1.0, 0.0], x.dtype), (pad, 3))]
+        )
+        mask = jnp.arange(num_chunks * self.chunk_size) < self.num_points
+
+        def matrix(chunk):
+            x, mask = chunk
+            return self._harmonics(x) * mask[:, None]
+
+        chunks = (
+            x.reshape(num_chunks, self.chunk_size, 3),
+            mask.reshape(num_chunks, self.chunk_size),
+        )
+        return chunks, matrix
+
+    def _flat_values(self, values: Union[e3nn.IrrepsArray, jax.Array]) -> jax.Array:
+        if isinstance(values, e3nn.IrrepsArray):
+            values = values.array[..., 0]
+        shape2 = self.points.shape[:-1]
+        if values.shape[values.ndim - len(shape2) :] != shape2:
+            raise ValueError(
+                f"values of shape {values.shape} do not end with the shape of the points {shape2}."
+            )
+        return values.reshape(values.shape[: values.ndim - len(shape2)] + (-1,))
+
+    def __call__(self, coeffs: e3nn.IrrepsArray) -> e3nn.IrrepsArray:
+        """Evaluate the signals at the points.
+
+        Args:
+            coeffs (`IrrepsArray`): coefficients of shape ``(*shape1, irreps)``
+
+        Returns:
+            `IrrepsArray`: values of shape ``(*shape1, *shape2, 1)``
+        """
+        coeffs = coeffs.regroup()
+        if coeffs.irreps != self.irreps:
+            raise ValueError(f"Expected irreps {self.irreps}, got {coeffs.irreps}.")
+
+        shape1 = coeffs.shape[:-1]
+        x = coeffs.array.reshape((-1, coeffs.shape[-1]))  # [b, i]
+
+        if self.chunk_size is None:
+            A = self._full_matrix()
+            values = jnp.einsum("ai,bi->ba", A, x)
+        else:
+            chunks, matrix = self._chunks()
+
+            def f(c):
+                return jnp.einsum("ai,bi->ba", matrix(c), x)
+
+            values = jnp.moveaxis(jax.lax.map(f, chunks), 0, 1)  # [b, chunk, a]
+            values = values.reshape(x.shape[0], -1)[:, : self.num_points]
+
+        irreps = {1: "0e", -1: "0o"}[self.p_val]
+        return e3nn.IrrepsArray(
+            irreps, values.reshape(shape1 + self.points.shape[:-1] + (1,))
+        )
+
+    def transpose(self, values: Union[e3nn.IrrepsArray, jax.Array]) -> e3nn.IrrepsArray:
+        r"""Adjoint of the evaluation, :math:`\sum_p v_p Y(x_p)`.
+
+        Args:
+            values (`IrrepsArray` or `jax.Array`): values of shape ``(*shape1, *shape2, 1)`` (or ``(*shape1, *shape2)``)
+
+        Returns:
+            `IrrepsArray`: coefficients of shape ``(*shape1, irreps)``
+        """
+        v = self._flat_values(values)
+        shape1 = v.shape[:-1]
+        v = v.reshape(-1, self.num_points)  # [b, a]
+
+        if self.chunk_size is None:
+            A = self._full_matrix()
+            x = jnp.einsum("ba,ai->bi", v, A)
+        else:
+            chunks, matrix = self._chunks()
+            num_chunks = -(-self.num_points // self.chunk_size)
+            v = jnp.pad(
+                v, [(0, 0), (0, num_chunks * self.chunk_size - self.num_points)]
+            )
+            v = v.reshape(v.shape[0], num_chunks, self.chunk_size)
+            v = jnp.moveaxis(v, 1, 0)  # [chunk, b, a]
+
+            def f(x, cv):
+                c, v = cv
+                return x + jnp.einsum("ba,ai->bi", v, matrix(c)), None
+
+            x0 = jnp.zeros((v.shape[1], self.irreps.dim), v.dtype)
+            x, _ = jax.lax.scan(f, x0, (chunks, v))
+
+        return e3nn.IrrepsArray(self.irreps, x.reshape(shape1 + (self.irreps.dim,)))
+
+    def gram(self) -> jax.Array:
+        """The matrix :math:`A^T A` of shape ``(irreps, irreps)``."""
+        if self.chunk_size is None:
+            A = self._full_matrix()
+            return A.T @ A
+
+        chunks, matrix = self._chunks()
+
+        def f(G, c):
+            A = matrix(c)
+            return G + A.T @ A, None
+
+        dtype = self.points.dtype if self.matrix is None else self.matrix.dtype
+        G, _ = jax.lax.scan(
+            f, jnp.zeros((self.irreps.dim, self.irreps.dim), dtype), chunks
+        )
+        return G
+
+    def fit(
+        self,
+        values: Union[e3nn.IrrepsArray, jax.Array],
+        *,
+        regularization: float = 0.0,
+    ) -> e3nn.IrrepsArray:
+        r"""Coefficients of the signals best fitting the values at the points, in the least squares sense.
+
+        Args:
+            values (`IrrepsArray` or `jax.Array`): values of shape ``(*shape1, *shape2, 1)`` (or ``(*shape1, *shape2)``)
+            regularization (float): weight :math:`\lambda` of the squared norm of the coefficients
+
+        Returns:
+            `IrrepsArray`: coefficients of shape ``(*shape1, irreps)``
+        """
+        rhs = self.transpose(values)
+        G = self.gram()
+        G = G + regularization * jnp.eye(G.shape[0], dtype=G.dtype)
+        x = jnp.linalg.solve(G, rhs.array.reshape(-1, G.shape[0]).T).T
+        return e3nn.IrrepsArray(self.irreps, x.reshape(rhs.shape))
+
+
+jax.tree_util.register_pytree_node(
+    S2PointEvaluator,
+    lambda e: (
+        (e.points, e.matrix),
+        (e.irreps, e.p_val, e.normalization, e.chunk_size, e.precompute),
+    ),
+    lambda aux, data: S2PointEvaluator._from_data(*data, *aux),
+)
+
+
+def _searchsorted(cdf: jax.Array, u: jax.Array) -> jax.Array:
+    """Index of the first ``cdf[..., i] > u[..., k]``, for each of the leading dimensions."""
+    f = functools.partial(jnp.searchsorted, side="right")
+    for _ in range(cdf.ndim - 1):
+        f = jax.vmap(f)
+    return jnp.minimum(f(cdf, u), cdf.shape[-1] - 1)
+
+
+def _pad_across_poles(f: jax.Array) -> jax.Array:
+    """Add the neighbors across the poles of the first and last rows, ``[..., res_beta + 2, res_alpha]``."""
+    res_alpha = f.shape[-1]
+    top = jnp.roll(f[..., :1, :], res_alpha // 2, axis=-1)
+    bottom = jnp.roll(f[..., -1:, :], res_alpha // 2, axis=-1)
+    return jnp.concatenate([top, f, bottom], axis=-2)
+
+
+def _local_maxima(f: jax.Array) -> jax.Array:
+    """Points of the grid ``[..., res_beta, res_alpha]`` larger than their 8 neighbors.
+
+    The points of the first (and of the last) row are all neighbors of each other, through the pole.
+    Ties are broken in favor of the first point in row-major order.
+    """
+    res_beta, res_alpha = f.shape[-2:]
+    index = jnp.arange(res_beta * res_alpha).reshape(res_beta, res_alpha)
+    g, index_g = _pad_across_poles(f), _pad_across_poles(index)
+
+    def larger(f, index, fn, index_n):
+        return (f > fn) | ((f == fn) & (index < index_n))
+
+    peak = jnp.ones(f.shape, bool)
+    for di in [-1, 0, 1]:
+        for dj in [-1, 0, 1]:
+            if di == dj == 0:
+                continue
+            rows = slice(1 + di, 1 + di + res_beta)
+            fn = jnp.roll(g, -dj, axis=-1)[..., rows, :]
+            index_n = jnp.roll(index_g, -dj, axis=-1)[rows, :]
+            peak &= larger(f, index, fn, index_n)
+
+    for row in [0, res_beta - 1]:
+        first = jnp.argmax(f[..., row, :], axis=-1)
+        peak = peak.at[..., row, :].set(
+            peak[..., row, :] & (jnp.arange(res_alpha) == first[..., None])
+        )
+    return peak
+
+
+def _parabola(
+    fm: jax.Array, f0: jax.Array, fp: jax.Array
+) -> Tuple[jax.Array, jax.Array]:
+    """Offset in ``[-1/2, 1/2]`` of the maximum of the parabola through ``(-1, fm), (0, f0), (1, fp)`` and its increase."""
+    curvature = fm - 2 * f0 + fp
+    delta = jnp.where(
+        curvature < 0, 0.5 * (fm - fp) / jnp.where(curvature < 0, curvature, -1), 0.0
     )
+    delta = jnp.clip(delta, -0.5, 0.5)
+    return delta, 0.25 * (fp - fm) * delta
 
 
 def _s2grid_vectors(y: jax.Array, alpha: jax.Array) -> jax.Array:
@@ -1417,6 +2092,254 @@ def _spherical_harmonics_s2grid(
     return y, alphas, sh_y, sh_alpha, qw
 
 
+class _LRUCache:
+    """Thread-safe LRU cache of numpy arrays bounded by the number of bytes held."""
+
+    def __init__(self):
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+
+    def get(self, key: Hashable, compute: Callable[[], Any], max_bytes: int) -> Any:
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+
+        value = compute()
+        size = sum(x.nbytes for x in jax.tree_util.tree_leaves(value))
+
+        with self._lock:
+            if key not in self._data and size <= max_bytes:
+                self._data[key] = value
+                self.bytes += size
+            while self.bytes > max_bytes:
+                _, old = self._data.popitem(last=False)
+                self.bytes -= sum(x.nbytes for x in jax.tree_util.tree_leaves(old))
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.bytes = 0
+
+    def info(self, max_bytes: int) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                hit_rate=self.hits / total if total else 0.0,
+                entries=len(self._data),
+                bytes=self.bytes,
+                max_bytes=max_bytes,
+            )
+
+
+_operator_cache = _LRUCache()
+
+
+def s2grid_cache_info() -> Dict[str, Any]:
+    r"""Statistics of the cache of the transform matrices used by `to_s2grid`, `from_s2grid` and `to_so3grid`.
+
+    The matrices only depend on ``lmax``, the irreps, the grid resolution, the quadrature,
+    the normalization and the dtype. They are computed once and shared by all the calls.
+    The cache is bounded by ``e3nn.config("s2grid_cache_max_bytes")``, the least recently used matrices are evicted.
+
+    Returns:
+        dict with the number of ``hits`` and ``misses``, the ``hit_rate``, the number of ``entries``,
+        the ``bytes`` held and ``max_bytes``
+    """
+    return _operator_cache.info(e3nn.config("s2grid_cache_max_bytes"))
+
+
+def s2grid_cache_clear():
+    r"""Empty the cache of the transform matrices and reset its statistics, see `s2grid_cache_info`."""
+    _operator_cache.clear()
+
+
+def _s2grid_operator(
+    direction: str,
+    ls: Tuple[int, ...],
+    res_beta: int,
+    res_alpha: int,
+    quadrature: str,
+    normalization: str,
+    lmax_in: Optional[int],
+    dtype,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    r"""Operators of `to_s2grid` and `from_s2grid`, computed once and cached.
+
+    The beta transform couples the component :math:`(l, m)` of the irreps only with the frequency :math:`m`.
+    Instead of a dense ``[m, b, i]`` tensor (mostly zeros), it is stored per frequency:
+    ``sh_y[m, :, k]`` is the Legendre function of the ``k``-th component of frequency ``m``.
+
+    Returns:
+        (tuple): tuple containing:
+            sh_y (`numpy.ndarray`): beta transform of shape ``(2 * lmax + 1, res_beta, K)``, zero for the padding
+            index (`numpy.ndarray`): index in the irreps of the components, ``dim`` for the padding, shape ``(2 * lmax + 1, K)``
+            block (`numpy.ndarray`): position ``m * K + k`` of each component of the irreps, shape ``(dim,)``
+            sha (`numpy.ndarray`): alpha transform of shape ``(res_alpha, 2 * lmax + 1)``, for ``fft=False``
+    """
+    dtype = np.dtype(dtype)
+    key = (direction, ls, res_beta, res_alpha, quadrature, normalization, lmax_in)
+    key += (dtype.name,)
+
+    def compute():
+        lmax = max(ls)
+        with jax.ensure_compile_time_eval():
+            _, _, sh_y, sha, qw = _spherical_harmonics_s2grid(
+                lmax, res_beta, res_alpha, quadrature=quadrature, dtype=dtype
+            )
+            n = _normalization(lmax, normalization, dtype, direction, lmax_in)
+
+        sh_y = np.asarray(sh_y) * np.asarray(n)[:, None]  # [b, l, |m|]
+        if direction == "from_s2":
+            # prepare beta integrand
+            sh_y = sh_y * np.asarray(qw)[:, None, None]
+
+        l = np.concatenate([np.full((2 * l + 1,), l) for l in ls])  # [i]
+        m = np.concatenate([np.arange(-l, l + 1) for l in ls]) + lmax  # [i]
+        k = np.zeros_like(m)  # position of each component in its frequency
+        count = np.zeros((2 * lmax + 1,), np.int64)
+        for i in range(m.shape[0]):
+            k[i] = count[m[i]]
+            count[m[i]] += 1
+        K = int(count.max())
+
+        blocks = np.zeros((2 * lmax + 1, res_beta, K), sh_y.dtype)
+        blocks[m, :, k] = sh_y[:, l, np.abs(m - lmax)].T
+        index = np.full((2 * lmax + 1, K), m.shape[0], np.int32)
+        index[m, k] = np.arange(m.shape[0])
+        block = (m * K + k).astype(np.int32)
+        return blocks, index, block, np.asarray(sha)
+
+    return _operator_cache.get(key, compute, e3nn.config("s2grid_cache_max_bytes"))
+
+
+def _legendre_scan(
+    lmax: int,
+    y: jax.Array,
+    f: Callable[[Any, jax.Array, jax.Array], Tuple[Any, Any]],
+    carry: Any,
+) -> Tuple[Any, Any]:
+    r"""Scan over the degrees :math:`l = 0, \dots, l_{\mathit{max}}` with the Legendre functions computed on the fly.
+
+    The normalized associated Legendre functions (same as `_sh_beta`) are computed with the stable three-term recursion
+
+    .. math::
+        P_l^m = \sqrt{\frac{4l^2 - 1}{l^2 - m^2}} \left(y P_{l-1}^m - \sqrt{\frac{(l-1)^2 - m^2}{4(l-1)^2 - 1}} P_{l-2}^m\right)
+
+    starting from :math:`P_m^m` and :math:`P_{m+1}^m`. Only the degrees :math:`l-1` and :math:`l-2` are kept in memory.
+
+    Args:
+        lmax (int): maximum degree
+        y (`jax.Array`): :math:`\cos(\beta)` of shape ``(res_beta,)``
+        f: function ``(carry, l, p) -> (carry, out)`` where ``p`` of shape ``(res_beta, lmax + 1)`` are the functions of degree ``l``
+        carry: initial carry of ``f``
+
+    Returns:
+        (tuple): the final carry and the outputs of ``f`` stacked along a first axis of size ``lmax + 1``
+    """
+    s = jnp.sqrt(1 - y**2)[:, None]
+    y = y[:, None]
+    m = jnp.arange(lmax + 1)
+    mf = m.astype(y.dtype)
+
+    def step(state, l):
+        p1, p2, carry = state  # degrees l - 1 and l - 2: [b, m]
+        lf = l.astype(y.dtype)
+
+        a = jnp.sqrt((4 * lf**2 - 1) / jnp.maximum(lf**2 - mf**2, 1))
+        b = jnp.sqrt(
+            jnp.maximum((lf - 1) ** 2 - mf**2, 0)
+            / jnp.maximum(4 * (lf - 1) ** 2 - 1, 1)
+        )
+        p = a * (y * p1 - b * p2)  # m <= l - 2
+        p = jnp.where(m == l - 1, jnp.sqrt(2 * mf + 3) * y * p1, p)
+        diag = jnp.sqrt((2 * mf + 1) / jnp.maximum(2 * mf, 1)) * s * jnp.roll(p1, 1, -1)
+        p = jnp.where(m == l, diag, p)
+        p = jnp.where(m > l, 0.0, p)
+        p = jnp.where(l == 0, jnp.where(m == 0, 1 / math.sqrt(4 * math.pi), 0.0), p)
+        p = p.astype(y.dtype)
+
+        carry, out = f(carry, l, p)
+        return (p, p1, carry), out
+
+    zeros = jnp.zeros((y.shape[0], lmax + 1), y.dtype)
+    (_, _, carry), out = jax.lax.scan(step, (zeros, zeros, carry), jnp.arange(lmax + 1))
+    return carry, out
+
+
+def _degree_index(ls: List[int], lmax: int) -> np.ndarray:
+    """Position ``l * (2 lmax + 1) + lmax + m`` of each component of the irreps in a ``[l, m]`` layout."""
+    return np.concatenate(
+        [l * (2 * lmax + 1) + lmax + np.arange(-l, l + 1) for l in ls]
+    ).astype(np.int32)
+
+
+def _to_s2_beta_recursion(
+    coeffs: e3nn.IrrepsArray, res_beta: int, quadrature: str, normalization: str
+) -> jax.Array:
+    """Beta transform of `to_s2grid` with `_legendre_scan`, returns ``[..., res_beta, 2 lmax + 1]``."""
+    lmax = coeffs.irreps.lmax
+    dtype = coeffs.dtype
+    y, _ = _quadrature_weights(res_beta, quadrature=quadrature)
+    n = _normalization(lmax, normalization, dtype, "to_s2")
+    abs_m = np.abs(np.arange(-lmax, lmax + 1))
+
+    # coefficients of each degree, zero padded to 2 lmax + 1 frequencies
+    index = np.full(((lmax + 1) * (2 * lmax + 1),), coeffs.irreps.dim, np.int32)
+    index[_degree_index(coeffs.irreps.ls, lmax)] = np.arange(coeffs.irreps.dim)
+    zero = jnp.zeros(coeffs.shape[:-1] + (1,), dtype)
+    x = jnp.concatenate([coeffs.array, zero], axis=-1)[..., index]
+    x = jnp.reshape(x, coeffs.shape[:-1] + (lmax + 1, 2 * lmax + 1))
+    x = jnp.moveaxis(x * n[:, None], -2, 0)  # [l, ..., m]
+
+    def f(signal_b, l, p):
+        return signal_b + jnp.einsum("bm,...m->...bm", p[:, abs_m], x[l]), None
+
+    signal_b = jnp.zeros(coeffs.shape[:-1] + (res_beta, 2 * lmax + 1), dtype)
+    signal_b, _ = _legendre_scan(lmax, jnp.asarray(y, dtype), f, signal_b)
+    return signal_b
+
+
+def _from_s2_beta_recursion(
+    int_a: jax.Array,
+    irreps: e3nn.Irreps,
+    quadrature: str,
+    normalization: str,
+    lmax_in: int,
+) -> jax.Array:
+    """Beta integration of `from_s2grid` with `_legendre_scan`, ``int_a`` is ``[..., res_beta, 2 lmax + 1]``."""
+    lmax = irreps.lmax
+    dtype = int_a.dtype
+    y, qw = _quadrature_weights(int_a.shape[-2], quadrature=quadrature)
+    n = _normalization(lmax, normalization, dtype, "from_s2", lmax_in)
+    abs_m = np.abs(np.arange(-lmax, lmax + 1))
+    qw = jnp.asarray(qw, dtype)[:, None]
+
+    def f(_, l, p):
+        return None, jnp.einsum("bm,...bm->...m", p[:, abs_m] * qw * n[l], int_a)
+
+    _, int_b = _legendre_scan(lmax, jnp.asarray(y, dtype), f, None)  # [l, ..., m]
+    int_b = jnp.moveaxis(int_b, 0, -2)
+    int_b = jnp.reshape(int_b, int_b.shape[:-2] + (-1,))
+    return int_b[..., _degree_index(irreps.ls, lmax)]
+
+
+def _sh_alpha_s2grid(lmax: int, res_alpha: int, dtype) -> jax.Array:
+    """Alpha transform ``[a, m]`` for ``fft=False``."""
+    alphas = jnp.asarray(np.arange(res_alpha) / res_alpha * 2 * np.pi, dtype)
+    return _sh_alpha(lmax, alphas)
+
+
 def _check_parities(
     irreps: e3nn.Irreps, p_val: Optional[int] = None, p_arg: Optional[int] = None
 ) -> Tuple[int, int]:
@@ -1540,50 +2463,3 @@ def _irfft(x: jax.Array, res: int) -> jax.Array:
     ).reshape((-1, x.shape[-1]))
     x_transformed = jnp.fft.irfft(x_reshaped, res)
     return x_transformed.reshape((*x.shape[:-1], x_transformed.shape[-1]))
-
-
-def _expand_matrix(ls: List[int]) -> np.ndarray:
-    """
-    conversion matrix between a flatten vector (L, m) like that
-    (0, 0) (1, -1) (1, 0) (1, 1) (2, -2) (2, -1) (2, 0) (2, 1) (2, 2)
-    and a bidimensional matrix representation like that
-                    (0, 0)
-            (1, -1) (1, 0) (1, 1)
-    (2, -2) (2, -1) (2, 0) (2, 1) (2, 2)
-
-    Args:
-        ls: list of l values
-    Returns:
-        array of shape ``[l, m, l * m]``
-    """
-    lmax = max(ls)
-    m = np.zeros((lmax + 1, 2 * lmax + 1, sum(2 * l + 1 for l in ls)), np.float64)
-    i = 0
-    for l in ls:
-        m[l, lmax - l : lmax + l + 1, i : i + 2 * l + 1] = np.eye(
-            2 * l + 1, dtype=np.float64
-        )
-        i += 2 * l + 1
-    return m
-
-
-def _rollout_sh(input: jax.Array, lmax: int) -> jax.Array:
-    """
-    Input:
-        [[(0,0)            ]       l=0
-         [(1,0) (1,1)      ]       l=1
-         [(2,0) (2,1) (2,2)]]      l=2
-    Output:
-        [(0,0) (1,1) (1,0) (1,1) (2,2) (2,1) (2,0) (2,1) (2,2)]
-    """
-    assert input.shape[-2] == lmax + 1  # l
-    assert input.shape[-1] == lmax + 1  # abs(m)
-    ls = []
-    ms = []
-    for l in range(lmax + 1):
-        for m in range(-l, l + 1):
-            ls.append(l)
-            ms.append(abs(m))
-    ls = jnp.asarray(ls)
-    ms = jnp.asarray(ms)
-    return input[..., ls, ms]
@@ -1,37 +1,58 @@
 import warnings
-from typing import Optional, Union
+from typing import Callable, Optional, Tuple, Union
 
 import jax
 import jax.numpy as jnp
 
 import e3nn_jax as e3nn
+from e3nn_jax._src.graph import _graph_segments
 
 
-def _distinct_but_small(x: jax.Array) -> jax.Array:
+def _distinct_but_small(x: jax.Array, assume_sorted: bool = False) -> jax.Array:
     """Maps the input to the integers 0, 1, 2, ..., n-1, where n is the number of distinct elements in x.
 
+    The order is preserved: smaller elements are mapped to smaller integers.
+    The cost is dominated by a sort, i.e. O(N log N) for N elements.
+
     Args:
         x (`jax.Array`): array of integers
+        assume_sorted (bool): whether the flattened ``x`` is already sorted, skips the sort
 
     Returns:
         `jax.Array`: array of integers of same size
     """
     shape = x.shape
     x = jnp.ravel(x)
-    unique = jnp.unique(x, size=x.shape[0])  # Pigeonhole principle
-    x = jax.lax.scan(
-        lambda _, i: (None, jnp.where(i == unique, size=1)[0][0]), None, x
-    )[1]
+    if x.shape[0] == 0:
+        return jnp.zeros(shape, jnp.int32)
+
+    if assume_sorted:
+        x_sorted = x
+    else:
+        perm = jnp.argsort(x)
+        x_sorted = x[perm]
+    is_new = jnp.concatenate(
+        [
+            jnp.zeros((1,), jnp.int32),
+            (x_sorted[1:] != x_sorted[:-1]).astype(jnp.int32),
+        ]
+    )
+    labels = jnp.cumsum(is_new)
+    if assume_sorted:
+        x = labels
+    else:
+        x = jnp.zeros_like(labels).at[perm].set(labels, unique_indices=True)
     return jnp.reshape(x, shape)
 
 
 def scatter_sum(
     data: Union[jax.Array, e3nn.IrrepsArray],
     *,
-    dst: Optional[jax.Array] = None,
+    dst: Optional[Union[jax.Array, e3nn.Graph]] = None,
     nel: Optional[jax.Array] = None,
     output_size: Optional[int] = None,
     map_back: bool = False,
+    assume_sorted: bool = False,
     mode: str = "promise_in_bounds",
 ) -> Union[jax.Array, e3nn.IrrepsArray]:
     r"""Scatter sum of data.
@@ -45,15 +66,22 @@ def scatter_sum(
 
     Args:
         data (`jax.Array` or `IrrepsArray`): array of shape ``(n1,..nd, ...)``
-        dst (optional, `jax.Array`): array of shape ``(n1,..nd)``. If not specified, ``nel`` must be specified.
+        dst (optional, `jax.Array` or `Graph`): array of shape ``(n1,..nd)``. If not specified, ``nel`` must be specified.
+            A `Graph` reduces the data of its (sorted) edges into its nodes.
         nel (optional, `jax.Array`): array of shape ``(output_size,)``. If not specified, ``dst`` must be specified.
         output_size (optional, int): size of output array.
             If not specified, ``nel`` must be specified or ``map_back`` must be ``True``.
         map_back (bool): whether to map back to the input position
+        assume_sorted (bool): whether ``dst`` (flattened) is sorted, e.g. receivers of an edge list
+            grouped per node. Enables a faster sorted segment reduction. Implied by ``nel``.
 
     Returns:
         `jax.Array` or `IrrepsArray`: output array of shape ``(output_size, ...)``
     """
+    dst, output_size, sorted_dst, mode = _graph_segments(
+        dst, output_size, mode, map_back
+    )
+    assume_sorted = assume_sorted or sorted_dst
     return _scatter_op(
         "sum",
         0.0,
@@ -62,6 +90,7 @@ def scatter_sum(
         nel=nel,
         output_size=output_size,
         map_back=map_back,
+        assume_sorted=assume_sorted,
         mode=mode,
     )
 
@@ -69,10 +98,11 @@ def scatter_sum(
 def scatter_mean(
     data: Union[jax.Array, e3nn.IrrepsArray],
     *,
-    dst: Optional[jax.Array] = None,
+    dst: Optional[Union[jax.Array, e3nn.Graph]] = None,
     nel: Optional[jax.Array] = None,
     output_size: Optional[int] = None,
     map_back: bool = False,
+    assume_sorted: bool = False,
     mode: str = "promise_in_bounds",
 ) -> Union[jax.Array, e3nn.IrrepsArray]:
     r"""Scatter mean of data.
@@ -88,15 +118,22 @@ def scatter_mean(
 
     Args:
         data (`jax.Array` or `IrrepsArray`): array of shape ``(n1,..nd, ...)``
-        dst (optional, `jax.Array`): array of shape ``(n1,..nd)``. If not specified, ``nel`` must be specified.
+        dst (optional, `jax.Array` or `Graph`): array of shape ``(n1,..nd)``. If not specified, ``nel`` must be specified.
+            A `Graph` reduces the data of its (sorted) edges into its nodes.
         nel (optional, `jax.Array`): array of shape ``(output_size,)``. If not specified, ``dst`` must be specified.
         output_size (optional, int): size of output array.
             If not specified, ``nel`` must be specified or ``map_back`` must be ``True``.
         map_back (bool): whether to map back to the input position
+        assume_sorted (bool): whether ``dst`` (flattened) is sorted, e.g. receivers of an edge list
+            grouped per node. Enables a faster sorted segment reduction. Implied by ``nel``.
 
     Returns:
         `jax.Array` or `IrrepsArray`: output array of shape ``(output_size, ...)``
     """
+    dst, output_size, sorted_dst, mode = _graph_segments(
+        dst, output_size, mode, map_back
+    )
+    assume_sorted = assume_sorted or sorted_dst
     if map_back and nel is not None:
         assert dst is None
         assert output_size is None
@@ -107,6 +144,7 @@ def scatter_mean(
             data,
             nel=nel,
             map_back=False,
+            assume_sorted=assume_sorted,
             mode=mode,
         )
         den = jnp.maximum(1, nel)
@@ -115,9 +153,10 @@ def scatter_mean(
             den = den[..., None]
 
         output = total / den.astype(total.dtype)
-        output = jax.tree_map(
+        output = _map_leading(
             lambda x: jnp.repeat(x, nel, axis=0, total_repeat_length=data.shape[0]),
             output,
+            data.shape[:-1],
         )
         return output
 
@@ -129,6 +168,7 @@ def scatter_mean(
         nel=nel,
         output_size=output_size,
         map_back=map_back,
+        assume_sorted=assume_sorted,
         mode=mode,
     )
 
@@ -146,6 +186,7 @@ def scatter_mean(
             nel=nel,
             output_size=output_size,
             map_back=map_back,
+            assume_sorted=assume_sorted,
             mode=mode,
         )
 
@@ -160,11 +201,12 @@ def scatter_mean(
 def scatter_max(
     data: Union[jax.Array, e3nn.IrrepsArray],
     *,
-    dst: Optional[jax.Array] = None,
+    dst: Optional[Union[jax.Array, e3nn.Graph]] = None,
     nel: Optional[jax.Array] = None,
     initial: float = -jnp.inf,
     output_size: Optional[int] = None,
     map_back: bool = False,
+    assume_sorted: bool = False,
     mode: str = "promise_in_bounds",
 ) -> Union[jax.Array, e3nn.IrrepsArray]:
     r"""Scatter max of data.
@@ -179,16 +221,23 @@ def scatter_max(
 
     Args:
         data (`jax.Array` or `IrrepsArray`): array of shape ``(n, ...)``
-        dst (optional, `jax.Array`): array of shape ``(n,)``. If not specified, ``nel`` must be specified.
+        dst (optional, `jax.Array` or `Graph`): array of shape ``(n,)``. If not specified, ``nel`` must be specified.
+            A `Graph` reduces the data of its (sorted) edges into its nodes.
         nel (optional, `jax.Array`): array of shape ``(output_size,)``. If not specified, ``dst`` must be specified.
         initial (float): initial value to compare to
         output_size (optional, int): size of output array. If not specified, ``nel`` must be specified
             or ``map_back`` must be ``True``.
         map_back (bool): whether to map back to the input position
+        assume_sorted (bool): whether ``dst`` (flattened) is sorted, e.g. receivers of an edge list
+            grouped per node. Enables a faster sorted segment reduction. Implied by ``nel``.
 
     Returns:
         `jax.Array` or `IrrepsArray`: output array of shape ``(output_size, ...)``
     """
+    dst, output_size, sorted_dst, mode = _graph_segments(
+        dst, output_size, mode, map_back
+    )
+    assume_sorted = assume_sorted or sorted_dst
     if isinstance(data, e3nn.IrrepsArray):
         if not data.irreps.is_scalar():
             raise ValueError("scatter_max only works with scalar IrrepsArray")
@@ -201,10 +250,316 @@ def scatter_max(
         nel=nel,
         output_size=output_size,
         map_back=map_back,
+        assume_sorted=assume_sorted,
         mode=mode,
     )
 
 
+def scatter_min(
+    data: Union[jax.Array, e3nn.IrrepsArray],
+    *,
+    dst: Optional[Union[jax.Array, e3nn.Graph]] = None,
+    nel: Optional[jax.Array] = None,
+    initial: float = jnp.inf,
+    output_size: Optional[int] = None,
+    map_back: bool = False,
+    assume_sorted: bool = False,
+    mode: str = "promise_in_bounds",
+) -> Union[jax.Array, e3nn.IrrepsArray]:
+    r"""Scatter min of data.
+
+    Performs either of the following two operations::
+
+        output[i] = min(initial, *(x for j, x in zip(dst, data) if j == i))
+
+    or::
+
+        output[i] = min(initial, *data[sum(nel[:i]):sum(nel[:i+1])])
+
+    Args:
+        data (`jax.Array` or `IrrepsArray`): array of shape ``(n, ...)``
+        dst (optional, `jax.Array` or `Graph`): array of shape ``(n,)``. If not specified, ``nel`` must be specified.
+            A `Graph` reduces the data of its (sorted) edges into its nodes.
+        nel (optional, `jax.Array`): array of shape ``(output_size,)``. If not specified, ``dst`` must be specified.
+        initial (float): initial value to compare to
+        output_size (optional, int): size of output array. If not specified, ``nel`` must be specified
+            or ``map_back`` must be ``True``.
+        map_back (bool): whether to map back to the input position
+        assume_sorted (bool): whether ``dst`` (flattened) is sorted, e.g. receivers of an edge list
+            grouped per node. Enables a faster sorted segment reduction. Implied by ``nel``.
+
+    Returns:
+        `jax.Array` or `IrrepsArray`: output array of shape ``(output_size, ...)``
+    """
+    dst, output_size, sorted_dst, mode = _graph_segments(
+        dst, output_size, mode, map_back
+    )
+    assume_sorted = assume_sorted or sorted_dst
+    if isinstance(data, e3nn.IrrepsArray):
+        if not data.irreps.is_scalar():
+            raise ValueError("scatter_min only works with scalar IrrepsArray")
+
+    return _scatter_op(
+        "min",
+        initial,
+        data,
+        dst=dst,
+        nel=nel,
+        output_size=output_size,
+        map_back=map_back,
+        assume_sorted=assume_sorted,
+        mode=mode,
+    )
+
+
+def _segment_logsumexp(
+    x: jax.Array,
+    weights: Optional[jax.Array],
+    dst: jax.Array,
+    output_size: int,
+    indices_are_sorted: bool,
+    mode: str,
+) -> Tuple[jax.Array, jax.Array]:
+    """``log(sum(weights * exp(x)))`` per segment, returned as the max ``m`` and ``log(sum(weights * exp(x - m)))``.
+
+    The empty segments give ``(finfo.min, 0)``.
+    """
+    kwargs = dict(
+        dst=dst, output_size=output_size, assume_sorted=indices_are_sorted, mode=mode
+    )
+    # the shift does not change the result, it does not need to be differentiated
+    m = jax.lax.stop_gradient(
+        _scatter_op("max", jnp.finfo(x.dtype).min, x, **kwargs)
+    )  # [output_size, ...]
+    exp = jnp.exp(x - m[(dst,)])
+    if weights is not None:
+        exp = _expand_to(weights, exp) * exp
+    z = _scatter_op("sum", 0.0, exp, **kwargs)
+    z = jnp.where(z == 0.0, 1.0, z)
+    return m, jnp.log(z)
+
+
+def _expand_to(x: jax.Array, y: jax.Array) -> jax.Array:
+    return jnp.reshape(x, x.shape + (1,) * (y.ndim - x.ndim))
+
+
+def scatter_logsumexp(
+    data: Union[jax.Array, e3nn.IrrepsArray],
+    *,
+    dst: Optional[Union[jax.Array, e3nn.Graph]] = None,
+    nel: Optional[jax.Array] = None,
+    output_size: Optional[int] = None,
+    map_back: bool = False,
+    assume_sorted: bool = False,
+    mode: str = "promise_in_bounds",
+) -> Union[jax.Array, e3nn.IrrepsArray]:
+    r"""Scatter logsumexp of data.
+
+    Performs either of the following two operations::
+
+        output[i] = log(sum(exp(x) for j, x in zip(dst, data) if j == i))
+
+    or::
+
+        output[i] = log(sum(exp(data[sum(nel[:i]):sum(nel[:i+1])])))
+
+    The maximum of each segment is subtracted before the exponential, the result does not overflow.
+    The empty segments are set to the lowest finite value of the dtype.
+
+    Args:
+        data (`jax.Array` or `IrrepsArray`): array of shape ``(n1,..nd, ...)``
+        dst (optional, `jax.Array` or `Graph`): array of shape ``(n1,..nd)``. If not specified, ``nel`` must be specified.
+            A `Graph` reduces the data of its (sorted) edges into its nodes.
+        nel (optional, `jax.Array`): array of shape ``(output_size,)``. If not specified, ``dst`` must be specified.
+        output_size (optional, int): size of output array.
+            If not specified, ``nel`` must be specified or ``map_back`` must be ``True``.
+        map_back (bool): whether to map back to the input position
+        assume_sorted (bool): whether ``dst`` (flattened) is sorted, e.g. receivers of an edge list
+            grouped per node. Enables a faster sorted segment reduction. Implied by ``nel``.
+
+    Returns:
+        `jax.Array` or `IrrepsArray`: output array of shape ``(output_size, ...)``
+    """
+    dst, output_size, sorted_dst, mode = _graph_segments(
+        dst, output_size, mode, map_back
+    )
+    assume_sorted = assume_sorted or sorted_dst
+    if isinstance(data, e3nn.IrrepsArray):
+        if not data.irreps.is_scalar():
+            raise ValueError("scatter_logsumexp only works with scalar IrrepsArray")
+        return e3nn.IrrepsArray(
+            data.irreps,
+            scatter_logsumexp(
+                data.array,
+                dst=dst,
+                nel=nel,
+                output_size=output_size,
+                map_back=map_back,
+                assume_sorted=assume_sorted,
+                mode=mode,
+            ),
+        )
+
+    dst, output_size, indices_are_sorted = _segments(
+        "scatter_logsumexp", data, dst, nel, output_size, map_back, assume_sorted
+    )
+    m, log_z = _segment_logsumexp(
+        data, None, dst, output_size, indices_are_sorted, mode
+    )
+    output = m + log_z
+    if map_back:
+        output = output[(dst,)]
+    return output
+
+
+def scatter_softmax(
+    data: Union[jax.Array, e3nn.IrrepsArray],
+    *,
+    dst: Optional[Union[jax.Array, e3nn.Graph]] = None,
+    nel: Optional[jax.Array] = None,
+    output_size: Optional[int] = None,
+    weights: Optional[jax.Array] = None,
+    assume_sorted: bool = False,
+    mode: str = "promise_in_bounds",
+) -> Union[jax.Array, e3nn.IrrepsArray]:
+    r"""Softmax of data within the segments.
+
+    Computes::
+
+        output[i] = weights[i] * exp(data[i]) / sum(weights[j] * exp(data[j]) for j if dst[j] == dst[i])
+
+    The maximum of each segment is subtracted before the exponential, the result does not overflow.
+    The maximum and the log-normalization of each segment are gathered together, in a single gather.
+    The segments where all the weights vanish give zero.
+
+    Args:
+        data (`jax.Array` or `IrrepsArray`): array of shape ``(n1,..nd, ...)``, the logits
+        dst (optional, `jax.Array` or `Graph`): array of shape ``(n1,..nd)``. If not specified, ``nel`` must be specified.
+            A `Graph` reduces the data of its (sorted) edges into its nodes.
+        nel (optional, `jax.Array`): array of shape ``(num_segments,)``. If not specified, ``dst`` must be specified.
+        output_size (optional, int): number of segments (upper bound of ``dst``).
+            If not specified, it is computed by relabelling ``dst``.
+        weights (optional, `jax.Array`): non-negative weights of shape ``(n1,..nd)``,
+            e.g. a smooth cutoff of the edges
+        assume_sorted (bool): whether ``dst`` (flattened) is sorted, e.g. receivers of an edge list
+            grouped per node. Enables a faster sorted segment reduction. Implied by ``nel``.
+
+    Returns:
+        `jax.Array` or `IrrepsArray`: output array of shape ``(n1,..nd, ...)``
+    """
+    dst, output_size, sorted_dst, mode = _graph_segments(dst, output_size, mode)
+    assume_sorted = assume_sorted or sorted_dst
+    if isinstance(data, e3nn.IrrepsArray):
+        if not data.irreps.is_scalar():
+            raise ValueError("scatter_softmax only works with scalar IrrepsArray")
+        return e3nn.IrrepsArray(
+            data.irreps,
+            scatter_softmax(
+                data.array,
+                dst=dst,
+                nel=nel,
+                output_size=output_size,
+                weights=weights,
+                assume_sorted=assume_sorted,
+                mode=mode,
+            ),
+        )
+
+    map_back = nel is None and output_size is None
+    dst, output_size, indices_are_sorted = _segments(
+        "scatter_softmax", data, dst, nel, output_size, map_back, assume_sorted
+    )
+    m, log_z = _segment_logsumexp(
+        data, weights, dst, output_size, indices_are_sorted, mode
+    )
+    # a single gather, m and log_z are not summed to keep the precision for large logits
+    m_log_z = jnp.stack([m, log_z], axis=-1)[(dst,)]
+    output = jnp.exp(data - m_log_z[..., 0] - m_log_z[..., 1])
+    if weights is not None:
+        output = _expand_to(weights, output) * output
+    return output
+
+
+def scatter_std(
+    data: Union[jax.Array, e3nn.IrrepsArray],
+    *,
+    dst: Optional[Union[jax.Array, e3nn.Graph]] = None,
+    nel: Optional[jax.Array] = None,
+    output_size: Optional[int] = None,
+    map_back: bool = False,
+    ddof: int = 0,
+    assume_sorted: bool = False,
+    mode: str = "promise_in_bounds",
+) -> Union[jax.Array, e3nn.IrrepsArray]:
+    r"""Scatter standard deviation of data.
+
+    Performs either of the following two operations::
+
+        output[i] = std(x for j, x in zip(dst, data) if j == i)
+
+    or::
+
+        output[i] = std(data[sum(nel[:i]):sum(nel[:i+1])])
+
+    The mean is subtracted before squaring (two passes), which avoids the cancellation of ``E[x^2] - E[x]^2``.
+    The gradient is zero where the standard deviation is zero.
+
+    Args:
+        data (`jax.Array` or `IrrepsArray`): array of shape ``(n1,..nd, ...)``
+        dst (optional, `jax.Array` or `Graph`): array of shape ``(n1,..nd)``. If not specified, ``nel`` must be specified.
+            A `Graph` reduces the data of its (sorted) edges into its nodes.
+        nel (optional, `jax.Array`): array of shape ``(output_size,)``. If not specified, ``dst`` must be specified.
+        output_size (optional, int): size of output array.
+            If not specified, ``nel`` must be specified or ``map_back`` must be ``True``.
+        map_back (bool): whether to map back to the input position
+        ddof (int): delta degrees of freedom, the divisor is ``n - ddof``
+        assume_sorted (bool): whether ``dst`` (flattened) is sorted, e.g. receivers of an edge list
+            grouped per node. Enables a faster sorted segment reduction. Implied by ``nel``.
+
+    Returns:
+        `jax.Array` or `IrrepsArray`: output array of shape ``(output_size, ...)``
+    """
+    dst, output_size, sorted_dst, mode = _graph_segments(
+        dst, output_size, mode, map_back
+    )
+    assume_sorted = assume_sorted or sorted_dst
+    if isinstance(data, e3nn.IrrepsArray):
+        if not data.irreps.is_scalar():
+            raise ValueError("scatter_std only works with scalar IrrepsArray")
+        return e3nn.IrrepsArray(
+            data.irreps,
+            scatter_std(
+                data.array,
+                dst=dst,
+                nel=nel,
+                output_size=output_size,
+                map_back=map_back,
+                ddof=ddof,
+                assume_sorted=assume_sorted,
+                mode=mode,
+            ),
+        )
+
+    dst, output_size, indices_are_sorted = _segments(
+        "scatter_std", data, dst, nel, output_size, map_back, assume_sorted
+    )
+    kwargs = dict(
+        dst=dst, output_size=output_size, assume_sorted=indices_are_sorted, mode=mode
+    )
+
+    n = _scatter_op("sum", 0.0, jnp.ones(dst.shape, data.dtype), **kwargs)
+    n = jnp.reshape(n, n.shape + (1,) * (data.ndim - dst.ndim))
+    mean = _scatter_op("sum", 0.0, data, **kwargs) / jnp.maximum(n, 1.0)
+    var = _scatter_op("sum", 0.0, jnp.square(data - mean[(dst,)]), **kwargs)
+    var = var / jnp.maximum(n - ddof, 1.0)
+
+    positive = var > 0.0
+    output = jnp.where(positive, jnp.sqrt(jnp.where(positive, var, 1.0)), 0.0)
+    if map_back:
+        output = output[(dst,)]
+    return output
+
+
 def _scatter_op(
     op: str,
     initial: float,
@@ -214,8 +569,65 @@ def _scatter_op(
     nel: Optional[jax.Array] = None,
     output_size: Optional[int] = None,
     map_back: bool = False,
+    assume_sorted: bool = False,
     mode: str = "promise_in_bounds",
 ) -> Union[jax.Array, e3nn.IrrepsArray]:
+    dst, output_size, indices_are_sorted = _segments(
+        f"scatter_{op}", data, dst, nel, output_size, map_back, assume_sorted
+    )
+
+    if op in ["max", "min"] and isinstance(data, e3nn.IrrepsArray):
+        # max(initial, 0) is not zero, the zero chunks have to be computed
+        data = e3nn.IrrepsArray(data.irreps, data.array)
+
+    segment_ids = jnp.ravel(dst)
+
+    def _op(x):
+        # segment reductions act on a single (flattened) segment axis
+        x = jnp.reshape(x, (dst.size,) + x.shape[dst.ndim :])
+        if op == "sum":
+            return jax.ops.segment_sum(
+                x,
+                segment_ids,
+                output_size,
+                indices_are_sorted=indices_are_sorted,
+                mode=mode,
+            )
+        elif op == "max":
+            # not jax.ops.segment_max because it fills the empty segments with -inf
+            z = initial * jnp.ones((output_size,) + x.shape[1:], x.dtype)
+            return z.at[segment_ids].max(
+                x, indices_are_sorted=indices_are_sorted, mode=mode
+            )
+        elif op == "min":
+            z = initial * jnp.ones((output_size,) + x.shape[1:], x.dtype)
+            return z.at[segment_ids].min(
+                x, indices_are_sorted=indices_are_sorted, mode=mode
+            )
+
+    output = _map_leading(_op, data, (output_size,) + data.shape[dst.ndim : -1])
+
+    if map_back:
+        output = output[(dst,)]
+
+    return output
+
+
+def _segments(
+    name: str,
+    data: Union[jax.Array, e3nn.IrrepsArray],
+    dst: Optional[jax.Array],
+    nel: Optional[jax.Array],
+    output_size: Optional[int],
+    map_back: bool,
+    assume_sorted: bool,
+) -> Tuple[jax.Array, int, bool]:
+    """Check the arguments of the scatter functions and compute the segment of each element.
+
+    Returns:
+        ``(dst, output_size, indices_are_sorted)``: the segment indices of shape ``data.shape[: dst.ndim]``,
+        the number of segments and whether the (flattened) indices are sorted.
+    """
     if dst is None and nel is None:
         raise ValueError("Either dst or nel must be specified")
     if dst is not None and nel is not None:
@@ -231,12 +643,12 @@ def _scatter_op(
         if map_back:
             output_size = None
     else:
-        indices_are_sorted = False
+        indices_are_sorted = assume_sorted
 
     if not (dst.shape == data.shape[: dst.ndim]):
         raise ValueError(
             (
-                f"trying to do e3nn.scatter_{op} with dst.shape={dst.shape} and data.shape={data.shape}"
+                f"trying to do e3nn.{name} with dst.shape={dst.shape} and data.shape={data.shape}"
                 f" but dst.shape must be equal to data.shape[: dst.ndim]"
             )
         )
@@ -248,21 +660,47 @@ def _scatter_op(
 
     if output_size is None and map_back is True:
         output_size = dst.size
-        dst = _distinct_but_small(dst)
+        dst = _distinct_but_small(dst, indices_are_sorted)
 
-    def _op(x):
-        z = initial * jnp.ones((output_size,) + x.shape[dst.ndim :], x.dtype)
-        if op == "sum":
-            return z.at[(dst,)].add(x, indices_are_sorted=indices_are_sorted, mode=mode)
-        elif op == "max":
-            return z.at[(dst,)].max(x, indices_are_sorted=indices_are_sorted, mode=mode)
+    return dst, output_size, indices_are_sorted
 
-    output = jax.tree_util.tree_map(_op, data)
 
-    if map_back:
-        output = output[(dst,)]
+def _map_leading(
+    f: Callable[[jax.Array], jax.Array],
+    data: Union[jax.Array, e3nn.IrrepsArray],
+    leading_shape: Tuple[int, ...],
+) -> Union[jax.Array, e3nn.IrrepsArray]:
+    """Apply ``f``, which only acts on the leading axes, to an array or to an IrrepsArray.
 
-    return output
+    ``f`` is applied once to all the non-zero chunks of an IrrepsArray (stacked along the last axis).
+    The zero chunks are not computed and stay zero.
+    """
+    if not isinstance(data, e3nn.IrrepsArray):
+        return f(data)
+
+    if not any(data.zero_flags):
+        return e3nn.IrrepsArray(data.irreps, f(data.array))
+
+    slices = [s for s, z in zip(data.irreps.slices(), data.zero_flags) if not z]
+    if not slices:
+        return e3nn.from_chunks(
+            data.irreps, [None] * len(data.irreps), leading_shape, data.dtype
+        )
+
+    x = jnp.concatenate([data.array[..., s] for s in slices], axis=-1)
+    x = f(x)
+
+    chunks = []
+    i = 0
+    for (mul, ir), z in zip(data.irreps, data.zero_flags):
+        if z:
+            chunks.append(None)
+        else:
+            chunks.append(
+                jnp.reshape(x[..., i : i + mul * ir.dim], leading_shape + (mul, ir.dim))
+            )
+            i += mul * ir.dim
+    return e3nn.from_chunks(data.irreps, chunks, leading_shape, data.dtype)
 
 
 def index_add(
@@ -0,0 +1,463 @@
+from typing import Callable, Tuple, Union
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+import e3nn_jax as e3nn
+
+from .s2grid import _irfft, _operator_cache, _packed_J, _quadrature_weights, _rfft
+
+
+class SO3Signal:
+    r"""Representation of a signal on :math:`SO(3)`.
+
+    The rotations of the grid are given by the Euler angles of `e3nn.angles_to_matrix`:
+    ``alpha`` and ``gamma`` are uniform on :math:`[0, 2\pi)` and ``beta`` is the arccosine
+    of the ``y`` of the quadrature used by `SphericalSignal`.
+
+    Args:
+        grid_values: values of the signal on the grid, shape ``(..., res_beta, res_alpha, res_gamma)``
+        quadrature: quadrature used to create the grid, either ``"soft"`` or ``"gausslegendre"``
+
+    Examples:
+        >>> x = e3nn.normal(e3nn.so3_irreps(2), jax.random.PRNGKey(0))
+        >>> signal = e3nn.to_so3grid(x, 6, 7, 7, quadrature="gausslegendre")
+        >>> signal
+        SO3Signal(shape=(6, 7, 7), res_beta=6, res_alpha=7, res_gamma=7, quadrature=gausslegendre)
+        >>> bool(jnp.allclose(e3nn.from_so3grid(signal, 2).array, x.array, atol=1e-5))
+        True
+    """
+
+    grid_values: jax.Array
+    quadrature: str
+
+    def __init__(
+        self,
+        grid_values: jax.Array,
+        quadrature: str,
+        *,
+        _perform_checks: bool = True,
+    ) -> None:
+        if _perform_checks:
+            if len(grid_values.shape) < 3:
+                raise ValueError(
+                    f"Grid values should have atleast 3 axes. Got grid_values of shape {grid_values.shape}."
+                )
+
+            if quadrature not in ["soft", "gausslegendre"]:
+                raise ValueError(f"Invalid quadrature for SO3Signal: {quadrature}")
+
+        self.grid_values = grid_values
+        self.quadrature = quadrature
+
+    def __repr__(self) -> str:
+        if hasattr(self.grid_values, "ndim") and self.ndim >= 3:
+            return (
+                "SO3Signal("
+                f"shape={self.shape}, "
+                f"res_beta={self.res_beta}, res_alpha={self.res_alpha}, res_gamma={self.res_gamma}, "
+                f"quadrature={self.quadrature})"
+            )
+        else:
+            return f"SO3Signal({self.grid_values})"
+
+    def __mul__(self, scalar: Union[float, "SO3Signal"]) -> "SO3Signal":
+        """Multiply SO3Signal by a scalar or pointwise by another SO3Signal."""
+        if isinstance(scalar, SO3Signal):
+            self._check_compatible(scalar)
+            return self.replace_values(self.grid_values * scalar.grid_values)
+
+        scalar = jnp.asarray(scalar)[..., None, None, None]
+        return self.replace_values(self.grid_values * scalar)
+
+    def __rmul__(self, scalar: float) -> "SO3Signal":
+        """Multiply SO3Signal by a scalar."""
+        return self * scalar
+
+    def __truediv__(self, scalar: float) -> "SO3Signal":
+        """Divide SO3Signal by a scalar."""
+        return self * (1 / scalar)
+
+    def __add__(self, other: "SO3Signal") -> "SO3Signal":
+        """Add to another SO3Signal."""
+        self._check_compatible(other)
+        return self.replace_values(self.grid_values + other.grid_values)
+
+    def __sub__(self, other: "SO3Signal") -> "SO3Signal":
+        """Subtract another SO3Signal."""
+        return self + (-other)
+
+    def __neg__(self) -> "SO3Signal":
+        """Negate SO3Signal."""
+        return self.replace_values(-self.grid_values)
+
+    def _check_compatible(self, other: "SO3Signal"):
+        if self.grid_resolution != other.grid_resolution:
+            raise ValueError("Grid resolutions for both signals must be identical.")
+        if self.quadrature != other.quadrature:
+            raise ValueError("Quadrature for both signals must be identical.")
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Returns the shape of this signal."""
+        return self.grid_values.shape
+
+    @property
+    def dtype(self) -> jnp.dtype:
+        """Returns the dtype of this signal."""
+        return self.grid_values.dtype
+
+    @property
+    def ndim(self) -> int:
+        """Returns the number of dimensions of this signal."""
+        return self.grid_values.ndim
+
+    @property
+    def res_beta(self) -> int:
+        """Grid resolution for beta."""
+        return self.grid_values.shape[-3]
+
+    @property
+    def res_alpha(self) -> int:
+        """Grid resolution for alpha."""
+        return self.grid_values.shape[-2]
+
+    @property
+    def res_gamma(self) -> int:
+        """Grid resolution for gamma."""
+        return self.grid_values.shape[-1]
+
+    @property
+    def grid_resolution(self) -> Tuple[int, int, int]:
+        """Grid resolution for (beta, alpha, gamma)."""
+        return (self.res_beta, self.res_alpha, self.res_gamma)
+
+    @property
+    def grid_beta(self) -> np.ndarray:
+        """Returns beta values on the grid for this signal."""
+        y, _ = _quadrature_weights(self.res_beta, quadrature=self.quadrature)
+        return np.arccos(y)
+
+    @property
+    def grid_alpha(self) -> np.ndarray:
+        """Returns alpha values on the grid for this signal."""
+        return np.arange(self.res_alpha) / self.res_alpha * 2 * np.pi
+
+    @property
+    def grid_gamma(self) -> np.ndarray:
+        """Returns gamma values on the grid for this signal."""
+        return np.arange(self.res_gamma) / self.res_gamma * 2 * np.pi
+
+    @property
+    def quadrature_weights(self) -> np.ndarray:
+        """Returns quadrature weights along the beta-coordinates."""
+        _, qw = _quadrature_weights(self.res_beta, quadrature=self.quadrature)
+        return qw
+
+    def apply(self, func: Callable[[jax.Array], jax.Array]) -> "SO3Signal":
+        """Applies a function pointwise on the grid."""
+        return self.replace_values(func(self.grid_values))
+
+    def replace_values(self, grid_values: jax.Array) -> "SO3Signal":
+        """Replace the grid values of the signal."""
+        return SO3Signal(grid_values, self.quadrature)
+
+    def integrate(self) -> jax.Array:
+        r"""Integrate the signal on :math:`SO(3)`.
+
+        The integral of a constant signal of value 1 is :math:`8\pi^2`.
+
+        Returns:
+            `jax.Array`: integral of the signal, shape ``(...)``
+        """
+        values = jnp.einsum(
+            "...bag,b->...",
+            self.grid_values,
+            self.quadrature_weights.astype(self.dtype),
+        )
+        return values / (self.res_alpha * self.res_gamma) * 8 * jnp.pi**2
+
+    def argmax(self) -> Tuple[jax.Array, jax.Array, jax.Array]:
+        r"""Euler angles of the grid point of maximum value.
+
+        Returns:
+            (tuple): tuple containing:
+
+                alpha (`jax.Array`): shape ``(...)``
+                beta (`jax.Array`): shape ``(...)``
+                gamma (`jax.Array`): shape ``(...)``
+        """
+        flat = jnp.reshape(self.grid_values, self.shape[:-3] + (-1,))
+        b, a, g = jnp.unravel_index(jnp.argmax(flat, axis=-1), self.grid_resolution)
+        return (
+            jnp.asarray(self.grid_alpha, self.dtype)[a],
+            jnp.asarray(self.grid_beta, self.dtype)[b],
+            jnp.asarray(self.grid_gamma, self.dtype)[g],
+        )
+
+
+jax.tree_util.register_pytree_node(
+    SO3Signal,
+    lambda x: ((x.grid_values,), x.quadrature),
+    lambda quadrature, grid_values: SO3Signal(
+        grid_values[0], quadrature, _perform_checks=False
+    ),
+)
+
+
+def so3_irreps(lmax: int) -> e3nn.Irreps:
+    r"""The Wigner D coefficients of the signals on :math:`SO(3)` up to degree ``lmax``.
+
+    The degree :math:`l` has multiplicity :math:`2l+1`: the coefficient ``[j, i]`` of the
+    chunk :math:`l` multiplies :math:`D^l_{ij}`. Each column :math:`j` is rotated
+    by `IrrepsArray.transform_by_angles` which rotates the signal, :math:`f(R) \to f(Q^{-1}R)`.
+
+    Args:
+        lmax (int): maximum degree
+
+    Returns:
+        `Irreps`: ``1x0e + 3x1e + 5x2e + ...``
+    """
+    return e3nn.Irreps([(2 * l + 1, (l, 1)) for l in range(lmax + 1)])
+
+
+def to_so3grid(
+    coeffs: e3nn.IrrepsArray,
+    res_beta: int,
+    res_alpha: int,
+    res_gamma: int,
+    *,
+    quadrature: str,
+) -> SO3Signal:
+    r"""Evaluate a signal on :math:`SO(3)` given by its Wigner D coefficients on a grid.
+
+    .. math::
+        f(\alpha, \beta, \gamma) = \sum_{l=0}^{l_{\mathit{max}}} \sum_{ij} F^l_{ij} D^l_{ij}(\alpha, \beta, \gamma)
+
+    The Wigner D matrices factor as :math:`R(\alpha) d(\beta) R(\gamma)` where :math:`R` acts on :math:`\pm m`.
+    The :math:`d^l(\beta)` part is a product with a table of the grid,
+    then the :math:`\alpha` and :math:`\gamma` dependencies are computed with two real FFTs (like `to_s2grid`).
+
+    The inverse transformation of :func:`from_so3grid`
+
+    Args:
+        coeffs (`IrrepsArray`): coefficients of irreps ``so3_irreps(lmax)``
+        res_beta (int): number of points in the :math:`\beta` direction
+        res_alpha (int): number of points in the :math:`\alpha` direction, odd
+        res_gamma (int): number of points in the :math:`\gamma` direction, odd
+        quadrature (str): "soft" or "gausslegendre"
+
+    Returns:
+        `SO3Signal`: signal of shape ``(..., res_beta, res_alpha, res_gamma)``
+    """
+    lmax = _check_so3_irreps(coeffs.irreps)
+    if res_alpha % 2 == 0 or res_gamma % 2 == 0:
+        raise ValueError("res_alpha and res_gamma must be odd for fft")
+
+    d, _, K = _so3grid_operator(lmax, res_beta, quadrature, coeffs.dtype)
+    Ka, Kg = K, K * np.array([1, -1])[:, None, None]
+
+    x = _to_padded(coeffs.array, lmax)  # [..., l, p, q]
+    x = jnp.einsum("blpq,...stlpq->...bstpq", d, _flips(x))
+    x = jnp.einsum("sup,tvq,...bstpq->...buv", Ka, Kg, x)  # [..., beta, u, v]
+
+    x = _irfft(x, res_gamma) * res_gamma  # [..., beta, u, gamma]
+    x = jnp.swapaxes(x, -2, -1)  # [..., beta, gamma, u]
+    x = _irfft(x, res_alpha) * res_alpha  # [..., beta, gamma, alpha]
+    return SO3Signal(jnp.swapaxes(x, -2, -1), quadrature)
+
+
+def from_so3grid(x: SO3Signal, lmax: int) -> e3nn.IrrepsArray:
+    r"""Wigner D coefficients of a signal on :math:`SO(3)`.
+
+    .. math::
+        F^l_{ij} = (2l+1) \frac{1}{8\pi^2} \int f(R) D^l_{ij}(R) dR
+
+    The integral is exact for signals of degree at most ``lmax`` if ``res_alpha`` and ``res_gamma``
+    are larger than ``2 lmax`` and the quadrature in beta is exact to degree ``2 lmax``.
+
+    The inverse transformation of :func:`to_so3grid`
+
+    Args:
+        x (`SO3Signal`): signal of shape ``(..., res_beta, res_alpha, res_gamma)``
+        lmax (int): maximum degree of the coefficients
+
+    Returns:
+        `IrrepsArray`: coefficients of irreps ``so3_irreps(lmax)``
+    """
+    d, qw, K = _so3grid_operator(lmax, x.res_beta, x.quadrature, x.dtype)
+    Ka, Kg = K, K * np.array([1, -1])[:, None, None]
+
+    y = _rfft(x.grid_values, lmax) / x.res_gamma  # [..., beta, alpha, v]
+    y = _rfft(jnp.swapaxes(y, -2, -1), lmax) / x.res_alpha  # [..., beta, v, u]
+    y = jnp.einsum("sup,tvq,...bvu->...bstpq", Ka, Kg, y)
+    y = jnp.einsum("blpq,b,...bstpq->...stlpq", d, qw, y)
+    y = _unflips(y)  # [..., l, p, q]
+    y = y * jnp.asarray(2 * np.arange(lmax + 1) + 1, x.dtype)[:, None, None]
+    return e3nn.IrrepsArray(so3_irreps(lmax), _from_padded(y, lmax))
+
+
+def s2_correlation(
+    f: e3nn.IrrepsArray,
+    g: e3nn.IrrepsArray,
+    res_beta: int,
+    res_alpha: int,
+    res_gamma: int,
+    *,
+    quadrature: str,
+) -> SO3Signal:
+    r"""Correlation of two signals on the sphere, as a signal on :math:`SO(3)`.
+
+    .. math::
+        c(R) = \sum_l f_l \cdot D^l(R) g_l = \frac{1}{4\pi} \int_{S^2} f(x) g(R^{-1} x) dx
+
+    The integral holds for the ``"integral"`` normalization of `to_s2grid`.
+    The outer products :math:`f_l g_l^T` are the Wigner D coefficients of :math:`c`, evaluated on all the rotations of
+    the grid with `to_so3grid` in :math:`O(L^4 \log L)` instead of :math:`O(L^6)` for the rotations one by one.
+    The maximum of ``c`` (`SO3Signal.argmax`) is the rotation that best aligns ``g`` on ``f``.
+
+    Args:
+        f (`IrrepsArray`): coefficients of the first signal, each :math:`l` at most once
+        g (`IrrepsArray`): coefficients of the second signal, each :math:`l` at most once
+        res_beta (int): number of points in the :math:`\beta` direction
+        res_alpha (int): number of points in the :math:`\alpha` direction, odd
+        res_gamma (int): number of points in the :math:`\gamma` direction, odd
+        quadrature (str): "soft" or "gausslegendre"
+
+    Returns:
+        `SO3Signal`: correlation on the grid
+
+    Examples:
+        >>> f = e3nn.normal(e3nn.s2_irreps(4), jax.random.PRNGKey(0))
+        >>> g = f.transform_by_angles(0.3, 1.2, 2.0, inverse=True)
+        >>> c = e3nn.s2_correlation(f, g, 30, 31, 31, quadrature="gausslegendre")
+        >>> c.argmax()  # close to (0.3, 1.2, 2.0) on the grid
+        (Array(0.2026834, dtype=float32), Array(1.2103363, dtype=float32), Array(2.026834, dtype=float32))
+    """
+    f, g = f.regroup(), g.regroup()
+    for x in [f, g]:
+        if not all(mul == 1 for mul, _ in x.irreps) or len(set(x.irreps.ls)) != len(
+            x.irreps.ls
+        ):
+            raise ValueError(
+                f"Each l should appear at most once in the irreps. Got {x.irreps}."
+            )
+
+    lmax = max(f.irreps.lmax, g.irreps.lmax)
+    shape = jnp.broadcast_shapes(f.shape[:-1], g.shape[:-1])
+    dtype = jnp.result_type(f.dtype, g.dtype)
+
+    chunks = []
+    for l in range(lmax + 1):
+        fl = [c for (_, ir), c in zip(f.irreps, f.chunks) if ir.l == l]
+        gl = [c for (_, ir), c in zip(g.irreps, g.chunks) if ir.l == l]
+        if fl and gl and fl[0] is not None and gl[0] is not None:
+            # chunk [j, i] multiplies D_ij
+            chunks.append(
+                jnp.einsum("...j,...i->...ji", gl[0][..., 0, :], fl[0][..., 0, :])
+            )
+        else:
+            chunks.append(None)
+
+    coeffs = e3nn.from_chunks(so3_irreps(lmax), chunks, shape, dtype)
+    return to_so3grid(coeffs, res_beta, res_alpha, res_gamma, quadrature=quadrature)
+
+
+def _check_so3_irreps(irreps: e3nn.Irreps) -> int:
+    lmax = irreps.lmax
+    if [(mul, ir.l) for mul, ir in irreps] != [(2 * l + 1, l) for l in range(lmax + 1)]:
+        raise ValueError(
+            f"Expected the irreps of so3_irreps({lmax}), up to the parities. Got {irreps}."
+        )
+    return lmax
+
+
+def _so3_index(lmax: int) -> np.ndarray:
+    """Position in the ``so3_irreps(lmax)`` array of each entry of the padded ``[l, p, q]`` layout, ``dim`` for the padding."""
+    P = 2 * lmax + 1
+    dim = so3_irreps(lmax).dim
+    index = np.full((lmax + 1, P, P), dim, np.int32)
+    offset = 0
+    for l in range(lmax + 1):
+        n = 2 * l + 1
+        block = offset + np.arange(n * n).reshape(n, n).T  # [i, j] -> j * n + i
+        index[l, lmax - l : lmax + l + 1, lmax - l : lmax + l + 1] = block
+        offset += n * n
+    return index
+
+
+def _to_padded(x: jax.Array, lmax: int) -> jax.Array:
+    """``[..., dim]`` to ``[..., l, p, q]`` with :math:`F^l_{pq}` centered and zero padded."""
+    zero = jnp.zeros(x.shape[:-1] + (1,), x.dtype)
+    return jnp.concatenate([x, zero], axis=-1)[..., _so3_index(lmax)]
+
+
+def _from_padded(x: jax.Array, lmax: int) -> jax.Array:
+    """Inverse of `_to_padded`."""
+    index = _so3_index(lmax).reshape(-1)
+    mask = index < so3_irreps(lmax).dim
+    order = np.argsort(index[mask], kind="stable")
+    position = np.flatnonzero(mask)[order]
+    return jnp.reshape(x, x.shape[:-3] + (-1,))[..., position]
+
+
+def _flips(x: jax.Array) -> jax.Array:
+    """Stack ``x``, ``x[..., ::-1]``, ``x[..., ::-1, :]`` and ``x[..., ::-1, ::-1]`` as ``[..., s, t, l, p, q]``.
+
+    A flip exchanges :math:`m` and :math:`-m`.
+    """
+    x = jnp.stack([x, jnp.flip(x, -1)], axis=-4)  # [..., t, l, p, q]
+    return jnp.stack([x, jnp.flip(x, -2)], axis=-5)  # [..., s, t, l, p, q]
+
+
+def _unflips(x: jax.Array) -> jax.Array:
+    """Transpose of `_flips`."""
+    x = x[..., 0, :, :, :, :] + jnp.flip(x[..., 1, :, :, :, :], -2)
+    return x[..., 0, :, :, :] + jnp.flip(x[..., 1, :, :, :], -1)
+
+
+def _so3grid_operator(
+    lmax: int, res_beta: int, quadrature: str, dtype
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    r"""Operators of `to_so3grid` and `from_so3grid`, computed once and cached with the ones of `to_s2grid`.
+
+    With :math:`R(\phi)_{mm} = \cos(m\phi)` and :math:`R(\phi)_{m,-m} = -\sin(m\phi)`,
+
+    .. math::
+        f = \sum_{lpq} d^l_{pq} \left( R(\alpha)^T F^l R(\gamma)^T \right)_{pq}
+
+    and :math:`(R(\alpha)^T F)_{pj} = \cos(p\alpha) F_{pj} + \sin(p\alpha) F_{-p,j}`.
+
+    Returns:
+        (tuple): tuple containing:
+            d (`numpy.ndarray`): :math:`d^l_{pq}(\beta)` of shape ``(res_beta, lmax + 1, 2 lmax + 1, 2 lmax + 1)``
+            qw (`numpy.ndarray`): quadrature weights of shape ``(res_beta,)``
+            K (`numpy.ndarray`): ``K[0, u, p]`` and ``K[1, u, p]`` are the coefficients of :math:`\cos(p\alpha)`
+                and :math:`\sin(p\alpha)` in the basis of `_rfft`, shape ``(2, 2 lmax + 1, 2 lmax + 1)``
+    """
+    dtype = np.dtype(dtype)
+    key = ("so3", lmax, res_beta, quadrature, dtype.name)
+
+    def compute():
+        y, qw = _quadrature_weights(res_beta, quadrature=quadrature)
+        beta = np.arccos(y)
+        m = np.arange(-lmax, lmax + 1)
+        eye = np.eye(2 * lmax + 1)
+
+        R = (
+            np.cos(m * beta[:, None])[:, :, None] * eye
+            - np.sin(m * beta[:, None])[:, :, None] * eye[::-1]
+        )  # [b, p, q]
+        J = _packed_J(lmax)  # [l, p, q]
+        d = np.einsum("lij,bjk,lkn->blin", J, R, J, optimize=True)
+
+        K = np.zeros((2, 2 * lmax + 1, 2 * lmax + 1))
+        K[0, lmax, lmax] = 1.0
+        for p in range(1, lmax + 1):
+            for s in [-1, 1]:
+                K[0, lmax + p, lmax + s * p] = 1 / np.sqrt(2)
+                K[1, lmax - p, lmax + s * p] = s / np.sqrt(2)
+        return d.astype(dtype), qw.astype(dtype), K.astype(dtype)
+
+    return _operator_cache.get(key, compute, e3nn.config("s2grid_cache_max_bytes"))
@@ -0,0 +1,192 @@
+import queue
+import threading
+from typing import Any, Dict, Iterable, Iterator, Mapping, Sequence
+
+import jax
+import numpy as np
+
+
+def _next_power_of_two(x: int) -> int:
+    return 1 << max(int(x) - 1, 0).bit_length()
+
+
+def _concatenate(trees: Sequence[Any], size: int) -> Any:
+    """Concatenate the leaves along the first axis and pad them with zeros to ``size``."""
+
+    def f(*leaves):
+        x = np.concatenate([np.asarray(leaf) for leaf in leaves], axis=0)
+        return np.pad(x, [(0, size - x.shape[0])] + [(0, 0)] * (x.ndim - 1))
+
+    return jax.tree_util.tree_map(f, *trees)
+
+
+class GraphBatcher:
+    r"""Pack graphs of different sizes into padded batches of a few static shapes.
+
+    Each batch contains ``batch_size`` graphs followed by a padding graph.
+    The number of nodes (including at least one padding node) and of edges is rounded up to a power of two,
+    so that a jitted model is only compiled for a logarithmic number of shapes.
+    The padding nodes belong to the padding graph and the padding edges connect the first padding node to itself,
+    such that ``e3nn.scatter_sum(edges, dst=receivers, output_size=num_nodes)`` never mixes padding and real data.
+    The masks can be given to `e3nn.flax.BatchNorm` or `e3nn.haiku.BatchNorm` to ignore the padding nodes.
+
+    The batches are assembled in a background thread and transferred to the device ahead of time (``prefetch``).
+
+    A graph is a mapping with the keys:
+
+    - ``"nodes"``: pytree of arrays (or `IrrepsArray`) of leading dimension ``num_nodes``
+    - ``"edges"`` (optional): pytree of arrays of leading dimension ``num_edges``
+    - ``"senders"``, ``"receivers"``: integer arrays of shape ``(num_edges,)``
+    - ``"globals"`` (optional): pytree of arrays of leading dimension ``1``
+
+    A batch is a dict with the same keys and:
+
+    - ``"n_node"``, ``"n_edge"``: number of nodes and edges per graph, shape ``(batch_size + 1,)``
+    - ``"node_graph"``: graph index of each node
+    - ``"node_mask"``, ``"edge_mask"``, ``"graph_mask"``: ``False`` for the padding
+
+    Args:
+        graphs (iterable): graphs to batch, can be a generator
+        batch_size (int): number of graphs per batch
+        min_num_nodes (int): minimum number of nodes of a batch, to merge the smallest buckets
+        min_num_edges (int): minimum number of edges of a batch
+        prefetch (int): number of batches prepared in advance, ``0`` to prepare them when requested
+        device_put (bool): whether to transfer the batches to the device
+
+    Examples:
+        >>> graphs = [
+        ...     dict(nodes=np.ones((n, 4)), senders=np.zeros(n, int), receivers=np.arange(n))
+        ...     for n in [3, 5, 2, 9]
+        ... ]
+        >>> for batch in GraphBatcher(graphs, batch_size=2, prefetch=0):
+        ...     print(batch["nodes"].shape, batch["n_node"])
+        (16, 4) [3 5 8]
+        (16, 4) [2 9 5]
+    """
+
+    def __init__(
+        self,
+        graphs: Iterable[Mapping[str, Any]],
+        batch_size: int,
+        *,
+        min_num_nodes: int = 1,
+        min_num_edges: int = 1,
+        prefetch: int = 2,
+        device_put: bool = True,
+    ):
+        self.graphs = graphs
+        self.batch_size = batch_size
+        self.min_num_nodes = min_num_nodes
+        self.min_num_edges = min_num_edges
+        self.prefetch = prefetch
+        self.device_put = device_put
+        self.shapes = set()
+
+    def pad(self, graphs: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+        r"""Batch and pad at most ``batch_size`` graphs, on the host."""
+        if not 0 < len(graphs) <= self.batch_size:
+            raise ValueError(
+                f"Expected between 1 and {self.batch_size} graphs, got {len(graphs)}."
+            )
+
+        n_node = np.zeros((self.batch_size + 1,), np.int32)
+        n_edge = np.zeros((self.batch_size + 1,), np.int32)
+        for i, graph in enumerate(graphs):
+            n_node[i] = jax.tree_util.tree_leaves(graph["nodes"])[0].shape[0]
+            n_edge[i] = np.shape(graph["senders"])[0]
+
+        num_nodes = _next_power_of_two(max(n_node.sum() + 1, self.min_num_nodes))
+        num_edges = _next_power_of_two(max(n_edge.sum(), self.min_num_edges))
+        n_node[-1] = num_nodes - n_node.sum()
+        n_edge[-1] = num_edges - n_edge.sum()
+        self.shapes.add((num_nodes, num_edges))
+
+        offsets = np.cumsum(n_node) - n_node
+        pad_node = offsets[-1]
+        senders = np.full((num_edges,), pad_node, np.int32)
+        receivers = np.full((num_edges,), pad_node, np.int32)
+        senders[: n_edge[:-1].sum()] = np.concatenate(
+            [np.asarray(g["senders"]) + offsets[i] for i, g in enumerate(graphs)]
+        )
+        receivers[: n_edge[:-1].sum()] = np.concatenate(
+            [np.asarray(g["receivers"]) + offsets[i] for i, g in enumerate(graphs)]
+        )
+
+        graph_mask = np.arange(self.batch_size + 1) < len(graphs)
+        node_graph = np.repeat(np.arange(self.batch_size + 1), n_node)
+
+        batch = dict(
+            nodes=_concatenate([g["nodes"] for g in graphs], num_nodes),
+            senders=senders,
+            receivers=receivers,
+            n_node=n_node,
+            n_edge=n_edge,
+            node_graph=node_graph,
+            node_mask=graph_mask[node_graph],
+            edge_mask=np.arange(num_edges) < n_edge[:-1].sum(),
+            graph_mask=graph_mask,
+        )
+        if "edges" in graphs[0]:
+            batch["edges"] = _concatenate([g["edges"] for g in graphs], num_edges)
+        if "globals" in graphs[0]:
+            batch["globals"] = _concatenate(
+                [g["globals"] for g in graphs], self.batch_size + 1
+            )
+        return batch
+
+    def _batches(self) -> Iterator[Dict[str, Any]]:
+        graphs = []
+        for graph in self.graphs:
+            graphs.append(graph)
+            if len(graphs) == self.batch_size:
+                yield self._finalize(self.pad(graphs))
+                graphs = []
+        if graphs:
+            yield self._finalize(self.pad(graphs))
+
+    def _finalize(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        if self.device_put:
+            return jax.device_put(batch)
+        return batch
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self.prefetch <= 0:
+            yield from self._batches()
+            return
+
+        buffer = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        end = object()
+
+        def put(item) -> bool:
+            # give up when the consumer stopped, the queue may be full forever
+            while not stop.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def producer():
+            try:
+                for batch in self._batches():
+                    if not put((batch, None)):
+                        return
+                put((end, None))
+            except Exception as e:  # forwarded to the consumer
+                put((end, e))
+
+        thread = threading.Thread(target=producer, daemon=True)
+        thread.start()
+        try:
+            while True:
+                batch, error = buffer.get()
+                if error is not None:
+                    raise error
+                if batch is end:
+                    return
+                yield batch
+        finally:
+            stop.set()
+            thread.join()
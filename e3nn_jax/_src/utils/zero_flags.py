@@ -0,0 +1,110 @@
+from math import prod
+from typing import Any, Callable, Dict
+
+import jax
+import numpy as np
+from jax.core import ClosedJaxpr, Jaxpr
+
+import e3nn_jax as e3nn
+
+
+def _jaxpr_cost(jaxpr: Jaxpr) -> Dict[str, int]:
+    flops = 0
+    num_bytes = 0
+    for eqn in jaxpr.eqns:
+        multiplier = eqn.params.get("length", 1)  # scan
+
+        sub_jaxprs = [
+            p.jaxpr if isinstance(p, ClosedJaxpr) else p
+            for p in jax.tree_util.tree_leaves(
+                eqn.params, is_leaf=lambda p: isinstance(p, (ClosedJaxpr, Jaxpr))
+            )
+            if isinstance(p, (ClosedJaxpr, Jaxpr))
+        ]
+        if sub_jaxprs:
+            for sub in sub_jaxprs:
+                cost = _jaxpr_cost(sub)
+                flops += multiplier * cost["flops"]
+                num_bytes += multiplier * cost["bytes"]
+            continue
+
+        for var in eqn.outvars:
+            aval = var.aval
+            if not hasattr(aval, "shape"):
+                continue
+            size = prod(aval.shape)
+            num_bytes += size * np.dtype(aval.dtype).itemsize
+
+            if eqn.primitive.name == "dot_general":
+                ((lhs_contract, _), _) = eqn.params["dimension_numbers"]
+                lhs_shape = eqn.invars[0].aval.shape
+                flops += 2 * size * prod(lhs_shape[i] for i in lhs_contract)
+            else:
+                flops += size
+    return dict(flops=flops, bytes=num_bytes)
+
+
+def zero_flags_savings(fun: Callable[..., Any], *args, **kwargs) -> Dict[str, Any]:
+    r"""Estimate the work saved by the zero chunks of the inputs of a function.
+
+    The function is traced twice: once with the inputs as given and once with all the
+    zero flags of the `IrrepsArray` inputs dropped (the zeros are then treated as regular data).
+    The cost of both traces is estimated from their jaxpr.
+
+    Args:
+        fun: function to analyse
+        *args: positional arguments of ``fun``, can contain `IrrepsArray`
+        **kwargs: keyword arguments of ``fun``, can contain `IrrepsArray`
+
+    Returns:
+        dict with the estimated ``flops`` and ``bytes`` (memory written by the operations)
+        of both traces (``dense_flops``, ``dense_bytes``) and the fraction of flops skipped.
+
+    Example:
+        >>> x = e3nn.from_chunks("8x0e + 8x1o", [jnp.ones((8, 1)), None], ())
+        >>> savings = zero_flags_savings(e3nn.tensor_square, x)
+        >>> savings["flops"] < savings["dense_flops"]
+        True
+    """
+    is_irreps_array = lambda x: isinstance(x, e3nn.IrrepsArray)
+    leaves, treedef = jax.tree_util.tree_flatten(
+        (args, kwargs), is_leaf=is_irreps_array
+    )
+
+    def trace(keep_zero_flags: bool) -> Dict[str, int]:
+        traced = [
+            i
+            for i, x in enumerate(leaves)
+            if isinstance(x, jax.Array) or is_irreps_array(x)
+        ]
+
+        def f(*arrays):
+            new_leaves = list(leaves)
+            for i, a in zip(traced, arrays):
+                x = leaves[i]
+                if is_irreps_array(x):
+                    zero_flags = x.zero_flags if keep_zero_flags else None
+                    a = e3nn.IrrepsArray(x.irreps, a, zero_flags=zero_flags)
+                new_leaves[i] = a
+            args, kwargs = jax.tree_util.tree_unflatten(treedef, new_leaves)
+            return fun(*args, **kwargs)
+
+        closed_jaxpr = jax.make_jaxpr(f)(
+            *[
+                leaves[i].array if is_irreps_array(leaves[i]) else leaves[i]
+                for i in traced
+            ]
+        )
+        return _jaxpr_cost(closed_jaxpr.jaxpr)
+
+    cost = trace(True)
+    dense = trace(False)
+    return dict(
+        flops=cost["flops"],
+        bytes=cost["bytes"],
+        dense_flops=dense["flops"],
+        dense_bytes=dense["bytes"],
+        skipped_flops_fraction=(
+            1.0 - cost["flops"] / dense["flops"] if dense["flops"] > 0 else 0.0
+        ),
+    )
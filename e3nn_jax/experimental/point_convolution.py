@@ -1,4 +1,4 @@
-from typing import Callable, Sequence, Tuple
+from typing import Callable, Optional, Sequence, Tuple, Union
 
 import flax
 import haiku as hk
@@ -24,7 +24,8 @@ _docstring_call = r"""Compute the message passing convolution
 Args:
     positions (e3nn.IrrepsArray): positions of the nodes
     node_feats (e3nn.IrrepsArray): features of the nodes
-    senders (jax.Array): indices of the sender nodes
+    senders (jax.Array or e3nn.Graph): indices of the sender nodes, or a graph sorted by receiver
+        in which case ``receivers`` is not given and the messages are summed with a sorted segment sum
     receivers (jax.Array): indices of the receiver nodes
 
 Returns:
@@ -67,6 +68,13 @@ def _call(
     assert positions.ndim == 2
     assert node_feats.ndim == 2
 
+    graph = None
+    if isinstance(senders, e3nn.Graph):
+        if receivers is not None:
+            raise ValueError("receivers must not be given with a graph")
+        graph = senders
+        senders, receivers = graph.senders, graph.receivers
+
     vectors = positions[receivers] - positions[senders]  # [n_edges, 1e or 1o]
     r = e3nn.norm(vectors).array[:, 0]
     edge_attrs = e3nn.concatenate(
@@ -101,8 +109,13 @@ def _call(
 
     messages = messages * mix  # [n_edges, irreps]
 
-    zeros = e3nn.zeros(messages.irreps, node_feats.shape[:1], messages.dtype)
-    node_feats = zeros.at[receivers].add(messages)  # [n_nodes, irreps]
+    if graph is not None:
+        node_feats = e3nn.scatter_sum(
+            messages, dst=graph, output_size=node_feats.shape[0]
+        )  # [n_nodes, irreps]
+    else:
+        zeros = e3nn.zeros(messages.irreps, node_feats.shape[:1], messages.dtype)
+        node_feats = zeros.at[receivers].add(messages)  # [n_nodes, irreps]
 
     node_feats = node_feats / jnp.sqrt(self.avg_num_neighbors)
 
@@ -137,8 +150,8 @@ class MessagePassingConvolutionHaiku(hk.Module):
         self,
         positions: e3nn.IrrepsArray,  # [n_edges, 1o or 1e]
         node_feats: e3nn.IrrepsArray,  # [n_nodes, irreps]
-        senders: jax.Array,  # [n_edges, ]
-        receivers: jax.Array,  # [n_edges, ]
+        senders: Union[jax.Array, e3nn.Graph],  # [n_edges, ]
+        receivers: Optional[jax.Array] = None,  # [n_edges, ]
     ) -> e3nn.IrrepsArray:  # [n_nodes, irreps]
         return _call(
             self,
@@ -169,8 +182,8 @@ class MessagePassingConvolutionFlax(flax.linen.Module):
         self,
         positions: e3nn.IrrepsArray,  # [n_edges, 1o or 1e]
         node_feats: e3nn.IrrepsArray,  # [n_nodes, irreps]
-        senders: jax.Array,  # [n_edges, ]
-        receivers: jax.Array,  # [n_edges, ]
+        senders: Union[jax.Array, e3nn.Graph],  # [n_edges, ]
+        receivers: Optional[jax.Array] = None,  # [n_edges, ]
     ) -> e3nn.IrrepsArray:  # [n_nodes, irreps]
         return _call(
             self,
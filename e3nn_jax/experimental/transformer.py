@@ -1,4 +1,4 @@
-from typing import Callable, List
+from typing import Callable, List, Optional, Union
 
 import haiku as hk
 import jax
@@ -7,10 +7,6 @@ import jax.numpy as jnp
 import e3nn_jax as e3nn
 
 
-def _index_max(i: jax.Array, x: jax.Array, out_dim: int) -> jax.Array:
-    return jnp.zeros((out_dim,) + x.shape[1:], x.dtype).at[i].max(x)
-
-
 class Transformer(hk.Module):
     def __init__(
         self,
@@ -28,8 +24,8 @@ class Transformer(hk.Module):
 
     def __call__(
         self,
-        edge_src: jax.Array,  # [E] dtype=int32
-        edge_dst: jax.Array,  # [E] dtype=int32
+        edge_src: Union[jax.Array, e3nn.Graph],  # [E] dtype=int32
+        edge_dst: Optional[jax.Array],  # [E] dtype=int32
         edge_weight_cutoff: jax.Array,  # [E] dtype=float
         edge_attr: e3nn.IrrepsArray,  # [E, D] dtype=float
         node_feat: e3nn.IrrepsArray,  # [N, D] dtype=float
@@ -37,7 +33,8 @@ class Transformer(hk.Module):
         r"""Equivariant Transformer.
 
         Args:
-            edge_src (array of int32): source index of the edges
+            edge_src (array of int32 or e3nn.Graph): source index of the edges, or a graph sorted by receiver
+                in which case ``edge_dst`` is ``None`` and the edge arrays follow the order of the graph
             edge_dst (array of int32): destination index of the edges
             edge_weight_cutoff (array of float): cutoff weight for the edges (typically given by ``soft_envelope``)
             edge_attr (e3nn.IrrepsArray): attributes of the edges (typically given by ``spherical_harmonics``)
@@ -47,6 +44,14 @@ class Transformer(hk.Module):
             e3nn.IrrepsArray: output features of the nodes
         """
 
+        if isinstance(edge_src, e3nn.Graph):
+            if edge_dst is not None:
+                raise ValueError("edge_dst must be None with a graph")
+            dst = edge_src
+            edge_src, edge_dst = dst.senders, dst.receivers
+        else:
+            dst = edge_dst
+
         def f(x, y, filter_ir_out=None, name=None):
             out1 = (
                 e3nn.concatenate([x, e3nn.tensor_product(x, y.filter(drop="0e"))])
@@ -65,15 +70,12 @@ class Transformer(hk.Module):
         edge_logit = e3nn.haiku.Linear(f"{self.num_heads}x0e", name="linear_logit")(
             e3nn.tensor_product(node_feat[edge_dst], edge_key, filter_ir_out="0e")
         ).array  # [E, H]
-        node_logit_max = _index_max(edge_dst, edge_logit, node_feat.shape[0])  # [N, H]
-        exp = edge_weight_cutoff[:, None] * jnp.exp(
-            edge_logit - node_logit_max[edge_dst]
+        alpha = e3nn.scatter_softmax(
+            edge_logit,
+            dst=dst,
+            output_size=node_feat.shape[0],
+            weights=edge_weight_cutoff,
         )  # [E, H]
-        z = e3nn.scatter_sum(
-            exp, dst=edge_dst, output_size=node_feat.shape[0]
-        )  # [N, H]
-        z = jnp.where(z == 0.0, 1.0, z)
-        alpha = exp / z[edge_dst]  # [E, H]
 
         edge_v = f(
             node_feat[edge_src], edge_attr, self.irreps_node_output, "mlp_val"
@@ -83,7 +85,7 @@ class Transformer(hk.Module):
         edge_v = edge_v.axis_to_mul()  # [E, D]
 
         node_out = e3nn.scatter_sum(
-            edge_v, dst=edge_dst, output_size=node_feat.shape[0]
+            edge_v, dst=dst, output_size=node_feat.shape[0]
         )  # [N, D]
         return e3nn.haiku.Linear(self.irreps_node_output, name="linear_out")(
             node_out
@@ -4,10 +4,14 @@ from e3nn_jax._src.utils.test import (
     assert_output_dtype_matches_input_dtype,
 )
 from e3nn_jax._src.utils.vmap import vmap
+from e3nn_jax._src.utils.graph_batcher import GraphBatcher
+from e3nn_jax._src.utils.zero_flags import zero_flags_savings
 
 __all__ = [
     "assert_equivariant",
     "equivariance_test",
     "assert_output_dtype_matches_input_dtype",
     "vmap",
+    "zero_flags_savings",
+    "GraphBatcher",
 ]
@@ -0,0 +1,67 @@
+import argparse
+import time
+
+import jax
+import jax.numpy as jnp
+import jaxlib
+
+import e3nn_jax as e3nn
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="radius_graph_benchmark")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6]
+    )
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--r-max", type=float, default=3.0)
+    parser.add_argument("--cell-capacity", type=int, default=16)
+    parser.add_argument("--max-size-dense", type=int, default=10**4)
+    parser.add_argument("-n", type=int, default=3)
+    args = parser.parse_args()
+
+    print("======= Versions: ======")
+    print("jax:", jax.__version__)
+    print("jaxlib:", jaxlib.__version__)
+    print("e3nn_jax:", e3nn.__version__)
+    print("=" * 40)
+
+    def f(pos, method, size):
+        return e3nn.radius_graph(
+            pos,
+            args.r_max,
+            size=size,
+            method=method,
+            cell_capacity=args.cell_capacity,
+            return_overflow=True,
+        )
+
+    f = jax.jit(f, static_argnums=(1, 2))
+
+    print(f"{'size':>10} {'edges':>10} {'cell_list':>12} {'host':>12} {'dense':>12}")
+    for num_points in args.sizes:
+        box = (num_points / args.density) ** (1 / 3)
+        pos = box * jax.random.uniform(jax.random.PRNGKey(0), (num_points, 3))
+        size = int(1.2 * num_points * args.density * 4 / 3 * 3.1416 * args.r_max**3)
+
+        times = {}
+        for method in ["cell_list", "host", "dense"]:
+            if method == "dense" and num_points > args.max_size_dense:
+                times[method] = f"{'skipped':>12}"
+                continue
+            src, _, overflow = jax.block_until_ready(f(pos, method, size))
+            assert not overflow
+            t = time.perf_counter()
+            for _ in range(args.n):
+                jax.block_until_ready(f(pos, method, size))
+            times[method] = f"{1e3 * (time.perf_counter() - t) / args.n:10.1f}ms"
+
+        num_edges = int(jnp.sum(src != -1))
+        print(
+            f"{num_points:>10} {num_edges:>10} {times['cell_list']} {times['host']}"
+            f" {times['dense']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import time
+
+import jax
+import jax.numpy as jnp
+import jaxlib
+import numpy as np
+
+import e3nn_jax as e3nn
+from e3nn_jax._src.s2grid import _s2grid_operator
+
+
+def _dense(sh_y: np.ndarray, block: np.ndarray) -> np.ndarray:
+    """Previous dense ``[m, b, i]`` operator, kept for comparison."""
+    num_m, res_beta, K = sh_y.shape
+    dense = np.zeros((num_m, res_beta, block.shape[0]), sh_y.dtype)
+    m, k = np.divmod(block, K)
+    dense[m, :, np.arange(block.shape[0])] = sh_y[m, :, k]
+    return dense
+
+
+def timeit(f, *args, n: int) -> float:
+    jax.block_until_ready(f(*args))  # compile
+    t = time.perf_counter()
+    for _ in range(n):
+        jax.block_until_ready(f(*args))
+    return (time.perf_counter() - t) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="s2grid_benchmark")
+    parser.add_argument("--lmax", type=int, nargs="+", default=[16, 32, 64])
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("-n", type=int, default=10)
+    args = parser.parse_args()
+
+    print("======= Versions: ======")
+    print("jax:", jax.__version__)
+    print("jaxlib:", jaxlib.__version__)
+    print("e3nn_jax:", e3nn.__version__)
+    print("=" * 40)
+
+    print(
+        f"{'lmax':>5} {'operator':>10} {'(dense)':>10} {'to_s2grid':>12} {'(dense)':>12}"
+        f" {'from_s2grid':>12} {'(dense)':>12} {'recursion':>12}"
+    )
+    for lmax in args.lmax:
+        res_beta, res_alpha = 2 * (lmax + 1), 2 * lmax + 3
+        irreps = e3nn.s2_irreps(lmax)
+        coeffs = e3nn.normal(irreps, jax.random.PRNGKey(lmax), (args.batch,))
+        sig = e3nn.to_s2grid(coeffs, res_beta, res_alpha, quadrature="soft")
+
+        sh_y, _, block, _ = _s2grid_operator(
+            "to_s2",
+            tuple(irreps.ls),
+            res_beta,
+            res_alpha,
+            "soft",
+            "integral",
+            None,
+            np.float32,
+        )
+        dense_to = jnp.asarray(_dense(sh_y, block))
+        sh_y, _, block, _ = _s2grid_operator(
+            "from_s2",
+            tuple(irreps.ls),
+            res_beta,
+            res_alpha,
+            "soft",
+            "integral",
+            lmax,
+            np.float32,
+        )
+        dense_from = jnp.asarray(_dense(sh_y, block))
+
+        f_to = jax.jit(
+            lambda x: e3nn.to_s2grid(
+                x, res_beta, res_alpha, quadrature="soft"
+            ).grid_values
+        )
+        f_to_dense = jax.jit(
+            lambda x, op: e3nn._src.s2grid._irfft(
+                jnp.einsum("mbi,...i->...bm", op, x.array), res_alpha
+            )
+            * res_alpha
+        )
+        f_from = jax.jit(lambda x: e3nn.from_s2grid(x, irreps).array)
+        f_recursion = jax.jit(
+            lambda x: e3nn.from_s2grid(
+                e3nn.to_s2grid(
+                    x,
+                    res_beta,
+                    res_alpha,
+                    quadrature="soft",
+                    use_legendre_recursion=True,
+                ),
+                irreps,
+                use_legendre_recursion=True,
+            ).array
+        )
+        f_from_dense = jax.jit(
+            lambda x, op: jnp.einsum(
+                "mbi,...bm->...i",
+                op,
+                e3nn._src.s2grid._rfft(x.grid_values, lmax) / res_alpha,
+            )
+        )
+        np.testing.assert_allclose(
+            f_to(coeffs), f_to_dense(coeffs, dense_to), atol=1e-4, rtol=1e-4
+        )
+        np.testing.assert_allclose(
+            f_from(sig), f_from_dense(sig, dense_from), atol=1e-4, rtol=1e-4
+        )
+
+        print(
+            f"{lmax:>5} {sh_y.nbytes / 2**20:8.2f}MB {dense_to.nbytes / 2**20:8.2f}MB"
+            f" {1e3 * timeit(f_to, coeffs, n=args.n):10.3f}ms"
+            f" {1e3 * timeit(f_to_dense, coeffs, dense_to, n=args.n):10.3f}ms"
+            f" {1e3 * timeit(f_from, sig, n=args.n):10.3f}ms"
+            f" {1e3 * timeit(f_from_dense, sig, dense_from, n=args.n):10.3f}ms"
+            f" {1e3 * timeit(f_recursion, coeffs, n=args.n):10.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
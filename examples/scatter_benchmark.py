@@ -0,0 +1,87 @@
+import argparse
+import time
+
+import jax
+import jax.numpy as jnp
+import jaxlib
+
+import e3nn_jax as e3nn
+
+
+def _distinct_but_small_scan(x: jax.Array) -> jax.Array:
+    """Previous O(N^2) implementation, kept for comparison."""
+    shape = x.shape
+    x = jnp.ravel(x)
+    unique = jnp.unique(x, size=x.shape[0])
+    x = jax.lax.scan(
+        lambda _, i: (None, jnp.where(i == unique, size=1)[0][0]), None, x
+    )[1]
+    return jnp.reshape(x, shape)
+
+
+def timeit(f, *args, n: int) -> float:
+    jax.block_until_ready(f(*args))  # compile
+    t = time.perf_counter()
+    for _ in range(n):
+        jax.block_until_ready(f(*args))
+    return (time.perf_counter() - t) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="scatter_benchmark")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6]
+    )
+    parser.add_argument("--num-segments", type=int, default=None)
+    parser.add_argument("--channels", type=int, default=16)
+    parser.add_argument("--max-size-scan", type=int, default=10**4)
+    parser.add_argument("-n", type=int, default=10)
+    args = parser.parse_args()
+
+    print("======= Versions: ======")
+    print("jax:", jax.__version__)
+    print("jaxlib:", jaxlib.__version__)
+    print("e3nn_jax:", e3nn.__version__)
+    print("=" * 40)
+
+    from e3nn_jax._src.scatter import _distinct_but_small
+
+    f_new = jax.jit(_distinct_but_small)
+    f_old = jax.jit(_distinct_but_small_scan)
+    f_map_back = jax.jit(lambda x, dst: e3nn.scatter_sum(x, dst=dst, map_back=True))
+    f_sum = jax.jit(
+        lambda x, dst, assume_sorted: e3nn.scatter_sum(
+            x, dst=dst, output_size=dst.shape[0], assume_sorted=assume_sorted
+        ),
+        static_argnums=2,
+    )
+
+    print(
+        f"{'size':>10} {'relabel':>12} {'relabel (scan)':>15} {'map_back':>12}"
+        f" {'sum':>12} {'sum (sorted)':>13}"
+    )
+    for size in args.sizes:
+        num_segments = args.num_segments or max(1, size // 10)
+        key1, key2 = jax.random.split(jax.random.PRNGKey(size))
+        dst = jax.random.randint(key1, (size,), 0, num_segments)
+        x = jax.random.normal(key2, (size, args.channels))
+
+        t_new = timeit(f_new, dst, n=args.n)
+        t_old = (
+            f"{1e3 * timeit(f_old, dst, n=args.n):12.3f}ms"
+            if size <= args.max_size_scan
+            else f"{'skipped':>14}"
+        )
+        t_map_back = timeit(f_map_back, x, dst, n=args.n)
+
+        dst = jnp.sort(dst)
+        t_sum = timeit(f_sum, x, dst, False, n=args.n)
+        t_sorted = timeit(f_sum, x, dst, True, n=args.n)
+        print(
+            f"{size:>10} {1e3 * t_new:10.3f}ms {t_old} {1e3 * t_map_back:10.3f}ms"
+            f" {1e3 * t_sum:10.3f}ms {1e3 * t_sorted:11.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
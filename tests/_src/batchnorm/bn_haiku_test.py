@@ -1,5 +1,6 @@
 import haiku as hk
 import jax.numpy as jnp
+import numpy as np
 import pytest
 
 import e3nn_jax as e3nn
@@ -104,3 +105,22 @@ def test_normalization(keys, instance):
     assert (
         jnp.max(jnp.abs(jnp.square(a).mean(3).mean([0, 1]) - 1)) < sqrt_float_tolerance
     )
+
+
+def test_mask(keys):
+    irreps = e3nn.Irreps("0e")
+    x = e3nn.normal(irreps, next(keys), (5,))
+    m = jnp.array([True, True, True, False, False])
+
+    @hk.without_apply_rng
+    @hk.transform_with_state
+    def b(x, mask):
+        return e3nn.haiku.BatchNorm(instance=False, momentum=1.0)(x, mask=mask)
+
+    params, state = b.init(next(keys), x, m)
+    y, state = b.apply(params, state, x, m)
+
+    np.testing.assert_allclose(jnp.mean(y.array[:3]), 0.0, atol=1e-5, rtol=0.0)
+    np.testing.assert_allclose(
+        state["batch_norm"]["running_mean"], jnp.mean(x.array[:3]), atol=1e-5
+    )
@@ -0,0 +1,84 @@
+import flax
+import haiku as hk
+import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
+
+import e3nn_jax as e3nn
+
+
+@pytest.mark.parametrize("irreps_in", ["4x0e + 2x1o", "2x1o + 3x0e + 1o"])
+def test_fold_haiku_linears(keys, irreps_in):
+    @hk.without_apply_rng
+    @hk.transform
+    def model(x):
+        x = e3nn.haiku.Linear("8x0e + 4x1o + 2x2e", biases=True)(x)
+        x = 3.0 * x
+        return e3nn.haiku.Linear("2x1o + 0e", biases=True)(x)
+
+    x = e3nn.normal(irreps_in, next(keys), (10,))
+    params = model.init(next(keys), x)
+
+    irreps_in = e3nn.Irreps(irreps_in)
+    lin1 = e3nn.FunctionalLinear(irreps_in.regroup(), "8x0e + 4x1o", biases=True)
+    lin2 = e3nn.FunctionalLinear("8x0e + 4x1o", "2x1o + 0e", biases=True)
+    lin, ws = e3nn.fold_linears(
+        (lin1, params["linear"]), 3.0, (lin2, params["linear_1"])
+    )
+
+    assert lin.irreps_in == irreps_in.regroup()
+    np.testing.assert_allclose(
+        lin(ws, x.regroup()).array,
+        model.apply(params, x).array,
+        atol=1e-4,
+        rtol=1e-4,
+    )
+
+
+def test_fold_flax_batch_norm(keys):
+    irreps = e3nn.Irreps("3x0e + 2x1o + 0e")
+
+    class Model(flax.linen.Module):
+        @flax.linen.compact
+        def __call__(self, x, use_running_average):
+            x = e3nn.flax.BatchNorm()(x, use_running_average=use_running_average)
+            return e3nn.flax.Linear("4x0e + 1o", biases=True)(x)
+
+    model = Model()
+    x = e3nn.normal(irreps, next(keys), (16,))
+    variables = model.init(next(keys), x, False)
+    _, updates = model.apply(variables, 2.0 * x, False, mutable=["batch_stats"])
+    variables = {"params": variables["params"], **updates}
+
+    bn_stats = variables["batch_stats"]["BatchNorm_0"]
+    bn_params = variables["params"]["BatchNorm_0"]
+    bn = e3nn.batch_norm_as_linear(
+        irreps,
+        bn_stats["mean"],
+        bn_stats["var"],
+        bn_params["weights"],
+        bn_params["biases"],
+    )
+    lin = e3nn.FunctionalLinear(irreps.regroup(), "4x0e + 1o", biases=True)
+    lin, ws = e3nn.fold_linears(bn, (lin, variables["params"]["Linear_0"]))
+
+    np.testing.assert_allclose(
+        lin(ws, x).array,
+        model.apply(variables, x, True, mutable=["batch_stats"])[0].array,
+        atol=1e-4,
+        rtol=1e-4,
+    )
+
+
+def test_fold_errors():
+    lin1 = e3nn.FunctionalLinear("2x0e", "2x1o")
+    lin2 = e3nn.FunctionalLinear("2x0e", "0e")
+    ws1 = [jnp.ones(ins.path_shape) for ins in lin1.instructions]
+    ws2 = [jnp.ones(ins.path_shape) for ins in lin2.instructions]
+
+    with pytest.raises(ValueError):
+        e3nn.fold_linears((lin1, ws1), (lin2, ws2))
+
+    with pytest.raises(ValueError):
+        e3nn.fold_linears(2.0)
@@ -0,0 +1,86 @@
+from functools import partial
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
+
+import e3nn_jax as e3nn
+
+
+@pytest.mark.parametrize(
+    "scatter",
+    [
+        e3nn.scatter_sum,
+        e3nn.scatter_mean,
+        partial(e3nn.scatter_max, initial=-10.0),
+        e3nn.scatter_logsumexp,
+        e3nn.scatter_std,
+    ],
+)
+def test_scatter_like_dst(keys, scatter):
+    senders = jax.random.randint(next(keys), (30,), 0, 10)
+    receivers = jax.random.randint(next(keys), (30,), 0, 10)
+    receivers = receivers.at[-4:].set(-1)  # padding
+    x = jax.random.normal(next(keys), (30, 3))
+
+    graph = e3nn.Graph.from_edges(senders, receivers, 10)
+    expected = scatter(x[:-4], dst=receivers[:-4], output_size=10)
+    np.testing.assert_allclose(
+        scatter(graph.sort_edges(x), dst=graph), expected, atol=1e-6
+    )
+
+
+def test_graph(keys):
+    senders = jax.random.randint(next(keys), (30,), 0, 10)
+    receivers = jax.random.randint(next(keys), (30,), -1, 10)
+
+    graph = jax.jit(e3nn.Graph.from_edges, static_argnums=2)(senders, receivers, 10)
+    assert graph.num_edges == 30
+    assert jnp.all(jnp.diff(graph.receivers) >= 0)
+    np.testing.assert_array_equal(
+        graph.degree, np.bincount(receivers[receivers >= 0], minlength=10)
+    )
+    np.testing.assert_array_equal(graph.offsets[1:], np.cumsum(graph.degree))
+    np.testing.assert_array_equal(graph.edge_mask, graph.receivers < 10)
+
+    mask = graph.unsort_edges(graph.edge_mask)
+    np.testing.assert_array_equal(mask, receivers >= 0)
+    np.testing.assert_array_equal(
+        graph.unsort_edges(graph.senders)[mask], senders[mask]
+    )
+    np.testing.assert_array_equal(
+        graph.unsort_edges(graph.sort_edges(senders)), senders
+    )
+
+    x = jax.random.normal(next(keys), (30,))
+    np.testing.assert_allclose(
+        jax.jit(lambda x, g: e3nn.scatter_softmax(g.sort_edges(x), dst=g))(x, graph)[
+            graph.edge_mask
+        ],
+        graph.sort_edges(
+            e3nn.scatter_softmax(
+                x, dst=jnp.where(receivers >= 0, receivers, 10), output_size=11
+            )
+        )[graph.edge_mask],
+        atol=1e-6,
+    )
+
+
+def test_radius_graph_return_graph(keys):
+    pos = jax.random.normal(next(keys), (40, 3))
+    cell = 2.0 * jnp.eye(3)
+    src, dst, shifts = e3nn.radius_graph(pos, 0.9, cell=cell)
+    graph, graph_shifts = e3nn.radius_graph(pos, 0.9, cell=cell, return_graph=True)
+
+    assert graph.num_nodes == 40
+    assert jnp.all(jnp.diff(graph.receivers) >= 0)
+    np.testing.assert_array_equal(graph.degree, np.bincount(dst, minlength=40))
+
+    def edges(s, d, sh):
+        vec = e3nn.edge_vectors(pos, s, d, shifts=sh, cell=cell)
+        return sorted(map(tuple, np.round(np.asarray(vec), 5).tolist()))
+
+    assert edges(graph.senders, graph.receivers, graph_shifts) == edges(
+        src, dst, shifts
+    )
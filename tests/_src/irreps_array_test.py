@@ -243,3 +243,12 @@ def test_dot():
     y = e3nn.from_chunks("2x0e + 1x1e", [None, None], (2,), dtype=jnp.complex64)
 
     assert e3nn.dot(x, y).shape == (2, 1)
+
+
+def test_zero_flags_propagation():
+    x = e3nn.from_chunks("0e + 1o", [jnp.ones((2, 3, 1, 1)), None], (2, 3))
+
+    assert x.axis_to_irreps().zero_flags == (False, True, False, True, False, True)
+    assert x.transform_by_angles(0.1, 0.2, 0.3).zero_flags == (False, True)
+    assert x[1:, 0].zero_flags == (False, True)
+    assert e3nn.concatenate([x, x], axis=0).zero_flags == (False, True)
@@ -6,6 +6,7 @@ import pytest
 
 import e3nn_jax as e3nn
 from e3nn_jax.legacy import FunctionalTensorProduct
+from e3nn_jax._src.linear import _indexed_matmul, linear_indexed, linear_mixed
 
 
 class SlowLinear:
@@ -61,6 +62,88 @@ def test_linear_like_tp(keys, irreps_in, irreps_out):
     assert jnp.allclose(m(ws, x).array, m_tp(ws_tp, x).array)
 
 
+@pytest.mark.parametrize(
+    "irreps_in", ["5x0e", "1e + 2e + 4x1e + 3x3o", "2x1o + 0x3e", "0x0e"]
+)
+@pytest.mark.parametrize(
+    "irreps_out", ["5x0e", "1e + 2e + 3x3o + 3x1e", "2x1o + 0x3e", "0x0e"]
+)
+def test_linear_indexed_like_gathered_weights(keys, irreps_in, irreps_out):
+    m = e3nn.FunctionalLinear(irreps_in, irreps_out, biases=True)
+
+    ws = [jax.random.normal(next(keys), (4,) + i.path_shape) for i in m.instructions]
+    get_parameter = lambda name, shape, std, dtype: ws.pop(0)
+    x = e3nn.normal(m.irreps_in, next(keys), (3, 5))
+    i = jax.random.randint(next(keys), (5,), 0, 4)
+
+    ws_gathered = [w[i] for w in ws]
+    y1 = linear_indexed(x, m, get_parameter, i, 4)
+    y2 = e3nn.utils.vmap(e3nn.utils.vmap(m), in_axes=(None, 0))(ws_gathered, x)
+    np.testing.assert_allclose(y1.array, y2.array, atol=1e-5, rtol=1e-5)
+
+
+def test_linear_indexed_many_weights(keys):
+    m = e3nn.FunctionalLinear("16x0e + 8x1o", "8x0e + 16x1o", biases=True)
+
+    k = 64
+    ws = [jax.random.normal(next(keys), (k,) + i.path_shape) for i in m.instructions]
+    x = e3nn.normal(m.irreps_in, next(keys), (100,))
+    i = jax.random.randint(next(keys), (100,), 0, k)
+
+    ws_gathered = [w[i] for w in ws]
+    y1 = linear_indexed(x, m, lambda name, shape, std, dtype: ws.pop(0), i, k)
+    y2 = e3nn.utils.vmap(m)(ws_gathered, x)
+    np.testing.assert_allclose(y1.array, y2.array, atol=1e-5, rtol=1e-5)
+
+    # no intermediate of size (n, k, mul_in, ir_dim)
+    x = jnp.ones((1000, 16, 3))
+    w = jnp.ones((k, 16, 16))
+    i = jnp.arange(1000) % k
+    jaxpr = jax.make_jaxpr(_indexed_matmul)(x, w, i)
+    assert all(
+        v.aval.size < 4 * x.size for eqn in jaxpr.eqns for v in eqn.outvars
+    ), jaxpr
+    jax.grad(lambda w: _indexed_matmul(x, w, i).sum())(w)
+
+
+@pytest.mark.parametrize(
+    "irreps_in", ["5x0e", "1e + 2e + 4x1e + 3x3o", "2x1o + 0x3e", "0x0e"]
+)
+@pytest.mark.parametrize(
+    "irreps_out", ["5x0e", "1e + 2e + 3x3o + 3x1e", "2x1o + 0x3e", "0x0e"]
+)
+def test_linear_broadcasting(keys, irreps_in, irreps_out):
+    m = e3nn.FunctionalLinear(irreps_in, irreps_out, biases=True)
+
+    ws = [jax.random.normal(next(keys), i.path_shape) for i in m.instructions]
+    x = e3nn.normal(m.irreps_in, next(keys), (3, 4))
+    x = x.rechunk(m.irreps_in)
+    x = e3nn.from_chunks(
+        m.irreps_in, [None] + x.chunks[1:], x.shape[:-1], x.dtype
+    )  # with a zero chunk
+
+    y1 = m(ws, x)
+    y2 = e3nn.utils.vmap(e3nn.utils.vmap(lambda x: m(ws, x)))(x)
+    assert y1.zero_flags == y2.zero_flags
+    np.testing.assert_allclose(y1.array, y2.array, atol=1e-5, rtol=1e-5)
+
+
+@pytest.mark.parametrize("irreps_in", ["32x0e + 16x1o + 2e", "2x1o + 0x3e", "0x0e"])
+@pytest.mark.parametrize("irreps_out", ["8x0e + 16x1o + 2x2e", "0x0e"])
+def test_linear_mixed_like_mixed_weights(keys, irreps_in, irreps_out):
+    m = e3nn.FunctionalLinear(irreps_in, irreps_out, biases=True)
+
+    ws = [jax.random.normal(next(keys), (4,) + i.path_shape) for i in m.instructions]
+    get_parameter = lambda name, shape, std, dtype: ws.pop(0)
+    x = e3nn.normal(m.irreps_in, next(keys), (5,))
+    weights = jax.random.normal(next(keys), (5, 4))
+
+    ws_mixed = [jnp.einsum("nd,d...->n...", weights, w) / 2.0 for w in ws]
+    y1 = linear_mixed(x, m, get_parameter, weights, 1.0)
+    y2 = e3nn.utils.vmap(m)(ws_mixed, x)
+    np.testing.assert_allclose(y1.array, y2.array, atol=1e-5, rtol=1e-5)
+
+
 @pytest.mark.parametrize(
     "irreps_in", ["5x0e", "1e + 2e + 4x1e + 3x3o", "2x1o + 0x3e", "0x0e"]
 )
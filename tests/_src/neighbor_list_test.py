@@ -0,0 +1,96 @@
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+import e3nn_jax as e3nn
+
+
+def _edges_within(src, dst, pos, r_max, shifts=None, cell=None):
+    mask = src != -1
+    src, dst = src[mask], dst[mask]
+    if shifts is not None:
+        shifts = shifts[mask]
+    vec = e3nn.edge_vectors(pos, src, dst, shifts=shifts, cell=cell)
+    keep = np.asarray(jnp.linalg.norm(vec, axis=-1) < r_max)
+    edges = np.stack([src, dst], axis=1)
+    if shifts is not None:
+        edges = np.concatenate([edges, shifts], axis=1)
+    return sorted(map(tuple, np.asarray(edges)[keep].tolist()))
+
+
+def test_neighbor_list_update(keys):
+    pos = 2.0 * jax.random.normal(next(keys), (50, 3))
+    nl = e3nn.NeighborList.build(pos, 1.0, skin=0.4)
+
+    update = jax.jit(lambda nl, pos: nl.update(pos))
+
+    # small move: the list is reused
+    pos1 = pos + 0.1 * jax.random.uniform(next(keys), pos.shape)
+    nl1 = update(nl, pos1)
+    np.testing.assert_array_equal(nl1.reference_positions, pos)
+    np.testing.assert_array_equal(nl1.src, nl.src)
+    assert _edges_within(nl1.src, nl1.dst, pos1, 1.0) == _edges_within(
+        *e3nn.radius_graph(pos1, 1.0), pos1, 1.0
+    )
+
+    # large move: the list is rebuilt
+    pos2 = pos + 0.3 * jax.random.normal(next(keys), pos.shape)
+    nl2 = update(nl, pos2)
+    np.testing.assert_array_equal(nl2.reference_positions, pos2)
+    assert not nl2.overflow
+    assert _edges_within(nl2.src, nl2.dst, pos2, 1.0) == _edges_within(
+        *e3nn.radius_graph(pos2, 1.0), pos2, 1.0
+    )
+
+
+def test_neighbor_list_overflow(keys):
+    pos = jax.random.normal(next(keys), (30, 3))
+    nl = e3nn.NeighborList.build(pos, 1.0, skin=0.2, capacity_multiplier=1.0)
+    assert not nl.overflow
+
+    nl = jax.jit(lambda nl, pos: nl.update(pos))(nl, 0.5 * pos)
+    assert nl.overflow
+
+
+def test_neighbor_list_periodic(keys):
+    cell = jnp.array([[2.0, 0.0, 0.0], [0.5, 2.0, 0.0], [0.0, 0.0, 2.5]])
+    pos = jax.random.uniform(next(keys), (20, 3)) @ cell
+    nl = e3nn.NeighborList.build(pos, 1.2, skin=0.3, cell=cell)
+
+    pos1 = pos + 0.05
+    nl1 = jax.jit(lambda nl, pos: nl.update(pos))(nl, pos1)
+    np.testing.assert_array_equal(nl1.reference_positions, pos)
+
+    src, dst, shifts = e3nn.radius_graph(pos1, 1.2, cell=cell)
+    assert _edges_within(
+        nl1.src, nl1.dst, pos1, 1.2, nl1.shifts, cell
+    ) == _edges_within(src, dst, pos1, 1.2, shifts, cell)
+
+
+def test_neighbor_list_jit_same_method(keys):
+    pos = 4.0 * jax.random.normal(next(keys), (1500, 3))
+    nl = e3nn.NeighborList.build(pos, 0.5, skin=0.2, method="auto")
+    options = dict(nl.options)
+    assert options["method"] == "cell_list"
+    assert isinstance(options["cell_capacity"], int)
+
+    # the rebuild in the jitted update uses the cell list as well (same order of the edges)
+    pos1 = pos + 0.2 * jax.random.normal(next(keys), pos.shape)
+    nl1 = jax.jit(lambda nl, pos: nl.update(pos))(nl, pos1)
+    src, dst = e3nn.radius_graph(pos1, 0.7, method="cell_list", size=options["size"])
+    assert not nl1.overflow
+    np.testing.assert_array_equal(nl1.src, src)
+    np.testing.assert_array_equal(nl1.dst, dst)
+
+
+def test_neighbor_list_jit_batch(keys):
+    pos = 2.0 * jax.random.normal(next(keys), (40, 3))
+    batch = jnp.arange(40) % 3
+    nl = e3nn.NeighborList.build(pos, 1.0, skin=0.2, batch=batch)
+    assert dict(nl.options)["max_graph_size"] == 14
+
+    pos1 = pos + 0.2 * jax.random.normal(next(keys), pos.shape)
+    nl1 = jax.jit(lambda nl, pos: nl.update(pos))(nl, pos1)
+    src, dst = e3nn.radius_graph(pos1, 1.2, batch=batch, size=nl.src.shape[0])
+    np.testing.assert_array_equal(nl1.src, src)
+    np.testing.assert_array_equal(nl1.dst, dst)
@@ -1,5 +1,11 @@
-import e3nn_jax as e3nn
+from functools import partial
+
+import jax
 import jax.numpy as jnp
+import numpy as np
+import pytest
+
+import e3nn_jax as e3nn
 
 
 def test_radius_graph():
@@ -22,3 +28,221 @@ def test_radius_graph():
     )
     assert src.shape == (12,)
     assert dst.shape == (12,)
+
+
+def _sort_per_source(src, dst):
+    return dst[np.lexsort((np.asarray(dst), np.asarray(src)))]
+
+
+@pytest.mark.parametrize("max_num_neighbors", [None, 64])
+@pytest.mark.parametrize("loop", [False, True])
+@pytest.mark.parametrize("n", [50, 3000])
+def test_cell_list_like_dense(keys, n, loop, max_num_neighbors):
+    pos = 3.0 * jax.random.normal(next(keys), (n, 3))
+    batch = jax.random.randint(next(keys), (n,), 0, 3)
+
+    src1, dst1 = e3nn.radius_graph(pos, 0.5, batch=batch, loop=loop, method="dense")
+    src2, dst2 = e3nn.radius_graph(pos, 0.5, batch=batch, loop=loop, method="cell_list")
+    np.testing.assert_array_equal(src1, src2)
+    np.testing.assert_array_equal(dst1, _sort_per_source(src2, dst2))
+
+
+def test_default_method_is_dense(keys):
+    pos = 3.0 * jax.random.normal(next(keys), (1100, 3))
+
+    src1, dst1 = e3nn.radius_graph(pos, 0.5)
+    src2, dst2 = e3nn.radius_graph(pos, 0.5, method="dense")
+    np.testing.assert_array_equal(src1, src2)
+    np.testing.assert_array_equal(dst1, dst2)
+
+    src3, dst3 = e3nn.radius_graph(pos, 0.5, method="auto")
+    np.testing.assert_array_equal(src1, src3)
+    np.testing.assert_array_equal(dst1, _sort_per_source(src3, dst3))
+
+
+def test_cell_list_jit_overflow(keys):
+    pos = jax.random.normal(next(keys), (100, 3))
+
+    @partial(jax.jit, static_argnums=(1, 2, 3))
+    def f(pos, cell_capacity, size, max_num_neighbors=None):
+        return e3nn.radius_graph(
+            pos,
+            0.5,
+            size=size,
+            method="cell_list",
+            cell_capacity=cell_capacity,
+            max_num_neighbors=max_num_neighbors,
+            return_overflow=True,
+        )
+
+    src, dst = e3nn.radius_graph(pos, 0.5)
+    num_edges = src.shape[0]
+
+    src2, dst2, overflow = f(pos, 100, num_edges + 10)
+    assert not overflow
+    np.testing.assert_array_equal(src2[:num_edges], src)
+    np.testing.assert_array_equal(
+        _sort_per_source(src2[:num_edges], dst2[:num_edges]), dst
+    )
+    assert jnp.all(src2[num_edges:] == -1)
+
+    assert f(pos, 100, num_edges - 1)[2]
+    assert f(pos, 1, num_edges + 10)[2]
+    assert f(pos, 100, num_edges + 10, 1)[2]
+
+
+def _periodic_brute_force(pos, r_max, cell, pbc, num_images):
+    pos, cell = np.asarray(pos, np.float64), np.asarray(cell, np.float64)
+    edges = []
+    for shift in np.ndindex(*[2 * m + 1 for m in num_images]):
+        shift = np.array(shift) - np.array(num_images)
+        if np.any(shift[~np.array(pbc)] != 0):
+            continue
+        vec = pos[None, :] - pos[:, None] + shift @ cell
+        d = np.linalg.norm(vec, axis=-1)
+        for i, j in zip(*np.nonzero((d < r_max) & (d > 0))):
+            edges.append((i, j, *shift))
+    return sorted(edges)
+
+
+@pytest.mark.parametrize("method", ["dense", "cell_list", "host"])
+@pytest.mark.parametrize("pbc", [(True, True, True), (True, False, True)])
+@pytest.mark.parametrize("r_max", [0.6, 1.7])
+def test_periodic(keys, method, pbc, r_max):
+    cell = np.array([[2.0, 0.0, 0.0], [0.7, 1.8, 0.0], [-0.4, 0.3, 2.2]])
+    pos = 3.0 * jax.random.normal(next(keys), (20, 3))
+
+    src, dst, shifts = e3nn.radius_graph(
+        pos, r_max, cell=cell, pbc=pbc, method=method, cell_capacity=None
+    )
+    vec = e3nn.edge_vectors(pos, src, dst, shifts=shifts, cell=cell)
+    assert jnp.all(jnp.linalg.norm(vec, axis=-1) < r_max)
+    if method != "cell_list":
+        np.testing.assert_array_equal(np.lexsort((dst, src)), np.arange(src.shape[0]))
+
+    # brute force on the wrapped positions with enough images
+    frac = np.asarray(pos) @ np.linalg.inv(cell)
+    wrap = np.floor(frac) * np.array(pbc)
+    pos_w = np.asarray(pos) - wrap @ cell
+    expected = _periodic_brute_force(pos_w, r_max, cell, pbc, [4, 4, 4])
+    expected = np.array(
+        [(i, j, *(np.array(s) - wrap[j] + wrap[i])) for i, j, *s in expected]
+    )
+    actual = np.concatenate([src[:, None], dst[:, None], shifts], axis=1)
+    np.testing.assert_array_equal(
+        expected[np.lexsort(expected.T[::-1])], actual[np.lexsort(actual.T[::-1])]
+    )
+
+
+def test_periodic_jit(keys):
+    cell = jnp.array([[1.0, 0.0, 0.0], [0.5, 1.0, 0.0], [0.0, 0.0, 1.5]])
+    pos = jax.random.uniform(next(keys), (10, 3))
+    batch = jnp.array([0] * 5 + [1] * 5)
+    cells = jnp.stack([cell, 1.2 * cell])
+
+    src, dst, shifts = e3nn.radius_graph(pos, 1.2, batch=batch, cell=cells)
+    assert jnp.all(batch[src] == batch[dst])
+
+    @jax.jit
+    def f(pos, cells):
+        return e3nn.radius_graph(
+            pos,
+            1.2,
+            batch=batch,
+            cell=cells,
+            num_images=2,
+            size=src.shape[0] + 5,
+            return_overflow=True,
+        )
+
+    src2, dst2, shifts2, overflow = f(pos, cells)
+    assert not overflow
+    num_edges = src.shape[0]
+    np.testing.assert_array_equal(src2[:num_edges], src)
+    np.testing.assert_array_equal(dst2[:num_edges], dst)
+    np.testing.assert_array_equal(shifts2[:num_edges], shifts)
+    assert jnp.all(shifts2[num_edges:] == 0)
+
+    vec = e3nn.edge_vectors(pos, src, dst, shifts=shifts, cell=cells, batch=batch)
+    assert jnp.all(jnp.linalg.norm(vec, axis=-1) < 1.2)
+
+
+def test_batched_per_graph(keys):
+    batch = jnp.repeat(jnp.arange(4), jnp.array([5, 12, 1, 8]), total_repeat_length=26)
+    batch = jax.random.permutation(next(keys), batch)
+    pos = jax.random.normal(next(keys), (26, 3))
+
+    src, dst = e3nn.radius_graph(pos, 1.0, batch=batch)
+    assert jnp.all(batch[src] == batch[dst])
+
+    @partial(jax.jit, static_argnums=(2,))
+    def f(pos, batch, max_graph_size):
+        return e3nn.radius_graph(
+            pos,
+            1.0,
+            batch=batch,
+            size=100,
+            max_graph_size=max_graph_size,
+            num_graphs=5,
+            return_num_edges=True,
+            return_overflow=True,
+        )
+
+    src2, dst2, num_edges, overflow = f(pos, batch, 12)
+    assert not overflow
+    np.testing.assert_array_equal(src2[: src.shape[0]], src)
+    np.testing.assert_array_equal(dst2[: src.shape[0]], dst)
+    np.testing.assert_array_equal(num_edges, np.bincount(batch[src], minlength=5))
+    assert num_edges[4] == 0
+
+    assert f(pos, batch, 11)[3]
+
+    with pytest.raises(ValueError):
+        f(pos, batch, None)
+
+
+@pytest.mark.parametrize("periodic", [False, True])
+@pytest.mark.parametrize("loop", [False, True])
+def test_host_like_dense(keys, loop, periodic):
+    pos = 3.0 * jax.random.normal(next(keys), (2000, 3))
+    batch = jax.random.randint(next(keys), (2000,), 0, 3)
+    kwargs = dict(batch=batch, loop=loop)
+    if periodic:
+        kwargs.update(cell=4.0 * jnp.eye(3), pbc=(True, True, False))
+
+    expected = e3nn.radius_graph(pos, 0.5, method="dense", **kwargs)
+    actual = e3nn.radius_graph(pos, 0.5, method="host", **kwargs)
+    for x, y in zip(expected, actual):
+        np.testing.assert_array_equal(x, y)
+
+    size = expected[0].shape[0]
+    f = jax.jit(
+        lambda pos, size: e3nn.radius_graph(
+            pos, 0.5, method="host", size=size, return_overflow=True, **kwargs
+        ),
+        static_argnums=1,
+    )
+    jitted = f(pos, size + 10)
+    assert not jitted[-1]
+    for x, y in zip(expected, jitted):
+        np.testing.assert_array_equal(x, y[:size])
+    assert jnp.all(jitted[0][size:] == -1)
+    assert f(pos, size - 1)[-1]
+
+
+def test_host_large_extent():
+    jax.config.update("jax_enable_x64", True)
+
+    # the bounding box has 2 x 2^32 x 2^32 cells, the keys of the cells (0, 0, 0) and (1, 0, 0)
+    # computed over the box would be equal modulo 2^64
+    big = 2.0**32 - 1
+    pos = jnp.array(
+        [[0.9, 0.0, 0.0], [1.2, 0.0, 0.0], [0.0, big, big], [0.5, big, big - 0.5]]
+    )
+    batch = jnp.array([0, 0, 0, 1])
+
+    for kwargs in [{}, {"batch": batch}]:
+        expected = e3nn.radius_graph(pos, 1.0, method="dense", **kwargs)
+        actual = e3nn.radius_graph(pos, 1.0, method="host", **kwargs)
+        np.testing.assert_array_equal(actual[0], expected[0])
+        np.testing.assert_array_equal(actual[1], expected[1])
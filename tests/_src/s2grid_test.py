@@ -193,6 +193,170 @@ def test_inverse(keys, normalization, quadrature, fft, irreps):
     )
 
 
+@pytest.mark.parametrize("fft", [False, True])
+def test_unsorted_irreps(keys, fft):
+    jax.config.update("jax_enable_x64", True)
+
+    coeffs = e3nn.normal("0e + 1o + 3o", keys[0], dtype=jnp.float64)
+    unsorted = e3nn.concatenate([coeffs.filter(keep="3o"), coeffs.filter(keep="0e")])
+    unsorted = e3nn.concatenate([unsorted, coeffs.filter(keep="1o")])
+
+    sig = e3nn.to_s2grid(coeffs, 20, 21, quadrature="soft", fft=fft)
+    np.testing.assert_allclose(
+        e3nn.to_s2grid(unsorted, 20, 21, quadrature="soft", fft=fft).grid_values,
+        sig.grid_values,
+        atol=1e-10,
+    )
+    np.testing.assert_allclose(
+        e3nn.from_s2grid(sig, unsorted.irreps, fft=fft).array,
+        unsorted.array,
+        atol=1e-10,
+    )
+
+
+@pytest.mark.parametrize("normalization", ["component", "norm", "integral"])
+@pytest.mark.parametrize("quadrature", ["soft", "gausslegendre"])
+@pytest.mark.parametrize("fft", [False, True])
+def test_legendre_recursion(keys, normalization, quadrature, fft):
+    jax.config.update("jax_enable_x64", True)
+
+    irreps = e3nn.s2_irreps(12)
+    coeffs = e3nn.normal(irreps, keys[0], (2, 3), dtype=jnp.float64)
+    kw = dict(quadrature=quadrature, normalization=normalization, fft=fft)
+
+    sig = e3nn.to_s2grid(coeffs, 30, 31, **kw)
+    np.testing.assert_allclose(
+        e3nn.to_s2grid(coeffs, 30, 31, use_legendre_recursion=True, **kw).grid_values,
+        sig.grid_values,
+        atol=1e-10,
+    )
+
+    kw = dict(normalization=normalization, fft=fft)
+    np.testing.assert_allclose(
+        e3nn.from_s2grid(sig, "0e + 3o + 1o", use_legendre_recursion=True, **kw).array,
+        e3nn.from_s2grid(sig, "0e + 3o + 1o", **kw).array,
+        atol=1e-10,
+    )
+
+
+@pytest.mark.parametrize("quadrature", ["soft", "gausslegendre"])
+@pytest.mark.parametrize("use_legendre_recursion", [False, True])
+def test_s2_activation(keys, quadrature, use_legendre_recursion):
+    jax.config.update("jax_enable_x64", True)
+
+    irreps = e3nn.s2_irreps(4, p_val=-1)
+    kw = dict(quadrature=quadrature, use_legendre_recursion=use_legendre_recursion)
+
+    def f(x):
+        return e3nn.s2_activation(e3nn.IrrepsArray(irreps, x), jnp.tanh, 12, 13, **kw)
+
+    def g(x):
+        sig = e3nn.to_s2grid(e3nn.IrrepsArray(irreps, x), 12, 13, **kw)
+        sig = sig.replace_values(jnp.tanh(sig.grid_values))
+        return e3nn.from_s2grid(
+            sig, irreps, use_legendre_recursion=use_legendre_recursion
+        )
+
+    x = e3nn.normal(irreps, keys[0], (3,), dtype=jnp.float64).array
+    assert f(x).irreps == irreps
+    np.testing.assert_allclose(f(x).array, g(x).array, atol=1e-10)
+
+    w = jax.random.normal(keys[1], (3, irreps.dim), jnp.float64)
+    np.testing.assert_allclose(
+        jax.jit(jax.grad(lambda x: jnp.sum(w * f(x).array)))(x),
+        jax.grad(lambda x: jnp.sum(w * g(x).array))(x),
+        atol=1e-10,
+    )
+
+
+@pytest.mark.parametrize("batch_chunk_size", [None, 2])
+def test_s2_activation_closure(keys, batch_chunk_size):
+    jax.config.update("jax_enable_x64", True)
+
+    irreps = e3nn.s2_irreps(3)
+    x = e3nn.normal(irreps, keys[0], (3,), dtype=jnp.float64)
+    kw = dict(quadrature="gausslegendre")
+
+    # the activation closes over a learned parameter
+    def f(a, b, x):
+        act = lambda y: jnp.tanh(a * y) + b
+        return e3nn.s2_activation(
+            x, act, 8, 9, batch_chunk_size=batch_chunk_size, **kw
+        ).array
+
+    def g(a, b, x):
+        sig = e3nn.to_s2grid(x, 8, 9, **kw)
+        sig = sig.replace_values(jnp.tanh(a * sig.grid_values) + b)
+        return e3nn.from_s2grid(sig, irreps).array
+
+    w = jax.random.normal(keys[1], (3, irreps.dim), jnp.float64)
+    grads = [
+        jax.jit(jax.grad(lambda *args: jnp.sum(w * h(*args)), argnums=(0, 1, 2)))(
+            1.3, 0.2, x
+        )
+        for h in [f, g]
+    ]
+    for a, b in zip(*grads):
+        np.testing.assert_allclose(
+            getattr(a, "array", a), getattr(b, "array", b), atol=1e-10
+        )
+
+
+@pytest.mark.parametrize("fft", [False, True])
+def test_batch_chunk_size(keys, fft):
+    jax.config.update("jax_enable_x64", True)
+
+    irreps = e3nn.s2_irreps(3, p_val=-1)
+    x = e3nn.normal(irreps, keys[0], (2, 5), dtype=jnp.float64)
+    kw = dict(quadrature="soft", fft=fft)
+
+    def f(x, **chunk):
+        sig = e3nn.to_s2grid(x, 8, 9, **kw, **chunk)
+        y = e3nn.from_s2grid(sig.apply(jnp.tanh), irreps, fft=fft, **chunk)
+        z = e3nn.s2_activation(x, jnp.tanh, 8, 9, **kw, **chunk)
+        return sig.grid_values, y.array, z.array
+
+    for a, b in zip(f(x), jax.jit(lambda x: f(x, batch_chunk_size=3))(x)):
+        assert a.shape == b.shape
+        np.testing.assert_allclose(a, b, atol=1e-12)
+
+    def loss(x, **chunk):
+        x = e3nn.IrrepsArray(irreps, x)
+        return sum(jnp.sum(jnp.sin(y)) for y in f(x, **chunk))
+
+    np.testing.assert_allclose(
+        jax.grad(loss)(x.array),
+        jax.grad(lambda x: loss(x, batch_chunk_size=4))(x.array),
+        atol=1e-12,
+    )
+
+
+def test_operator_cache(keys):
+    e3nn.s2grid_cache_clear()
+    coeffs = e3nn.normal("0e + 1o + 2e", keys[0])
+
+    sig1 = e3nn.to_s2grid(coeffs, 10, 11, quadrature="soft")
+    sig2 = jax.jit(lambda x: e3nn.to_s2grid(x, 10, 11, quadrature="soft"))(coeffs)
+    np.testing.assert_allclose(sig1.grid_values, sig2.grid_values, atol=1e-6)
+
+    info = e3nn.s2grid_cache_info()
+    assert (info["hits"], info["misses"], info["entries"]) == (1, 1, 1)
+    assert info["hit_rate"] == 0.5
+    assert 0 < info["bytes"] <= info["max_bytes"]
+
+    # the least recently used operators are evicted
+    max_bytes = e3nn.config("s2grid_cache_max_bytes")
+    e3nn.config("s2grid_cache_max_bytes", info["bytes"])
+    try:
+        e3nn.from_s2grid(sig1, "0e + 1o + 2e")
+        info = e3nn.s2grid_cache_info()
+        assert info["entries"] == 1
+        assert info["bytes"] <= info["max_bytes"]
+    finally:
+        e3nn.config("s2grid_cache_max_bytes", max_bytes)
+        e3nn.s2grid_cache_clear()
+
+
 def test_fft_dtype():
     jax.config.update("jax_enable_x64", True)
 
@@ -220,6 +384,53 @@ def test_to_s2point(keys, irreps, normalization, quadrature):
     jax.config.update("jax_enable_x64", False)
 
 
+@pytest.mark.parametrize("chunk_size", [None, 7])
+@pytest.mark.parametrize("precompute", [True, False])
+def test_s2_point_evaluator(keys, chunk_size, precompute):
+    jax.config.update("jax_enable_x64", True)
+
+    irreps = e3nn.s2_irreps(3)
+    points = e3nn.IrrepsArray(
+        "1o", jax.random.normal(keys[0], (5, 6, 3), dtype=jnp.float64)
+    )
+    coeffs = e3nn.normal(irreps, keys[1], (2,), dtype=jnp.float64)
+    evaluator = e3nn.S2PointEvaluator(
+        points,
+        irreps,
+        normalization="component",
+        chunk_size=chunk_size,
+        precompute=precompute,
+    )
+
+    values = jax.jit(lambda e, x: e(x))(evaluator, coeffs)
+    assert values.shape == (2, 5, 6, 1)
+    np.testing.assert_allclose(
+        values.array,
+        e3nn.to_s2point(coeffs, points, normalization="component").array,
+        atol=1e-12,
+    )
+
+    # transpose is the adjoint
+    v = jax.random.normal(keys[2], (2, 5, 6), dtype=jnp.float64)
+    np.testing.assert_allclose(
+        jnp.sum(evaluator(coeffs).array[..., 0] * v),
+        jnp.sum(coeffs.array * evaluator.transpose(v).array),
+        rtol=1e-12,
+    )
+
+    # least squares
+    np.testing.assert_allclose(evaluator.fit(values).array, coeffs.array, atol=1e-8)
+    noisy = values.array[..., 0] + 0.1 * jax.random.normal(keys[3], (2, 5, 6))
+    fit = evaluator.fit(noisy)
+    residual = evaluator(fit).array[..., 0] - noisy
+    np.testing.assert_allclose(evaluator.transpose(residual).array, 0.0, atol=1e-8)
+    assert jnp.linalg.norm(
+        evaluator.fit(noisy, regularization=10.0).array
+    ) < jnp.linalg.norm(fit.array)
+
+    jax.config.update("jax_enable_x64", False)
+
+
 @pytest.mark.parametrize("alpha", [0.1, 0.2])
 @pytest.mark.parametrize("beta", [0.1, 0.2])
 @pytest.mark.parametrize("gamma", [0.1, 0.2])
@@ -295,6 +506,53 @@ def test_transform_by_quaternion(keys, irreps, alpha, beta, gamma):
     )
 
 
+@pytest.mark.parametrize("irreps", ["0e + 1o + 3o", e3nn.s2_irreps(6, p_val=-1)])
+@pytest.mark.parametrize("k", [0, 1])
+@pytest.mark.parametrize("inverse", [False, True])
+def test_s2_rotate(keys, irreps, k, inverse):
+    jax.config.update("jax_enable_x64", True)
+
+    coeffs = e3nn.normal(irreps, keys[0], (5,), dtype=jnp.float64)
+    alpha, beta, gamma = e3nn.rand_angles(keys[1], (5,), dtype=jnp.float64)
+
+    expected = jax.vmap(
+        lambda x, a, b, c: x.transform_by_angles(a, b, c, k=k, inverse=inverse)
+    )(coeffs, alpha, beta, gamma)
+    rotated = e3nn.s2_rotate(coeffs, alpha, beta, gamma, k=k, inverse=inverse)
+    np.testing.assert_allclose(rotated.array, expected.array, atol=1e-10)
+
+
+def test_s2_rotate_large_lmax(keys):
+    jax.config.update("jax_enable_x64", True)
+
+    # rotating the signal is evaluating it at the rotated points
+    coeffs = e3nn.normal(e3nn.s2_irreps(20), keys[0], dtype=jnp.float64)
+    alpha, beta, gamma = e3nn.rand_angles(keys[1], dtype=jnp.float64)
+    R = e3nn.angles_to_matrix(alpha, beta, gamma)
+    x = jax.random.normal(keys[2], (7, 3), jnp.float64)
+
+    rotated = e3nn.s2_rotate(coeffs, alpha, beta, gamma)
+    np.testing.assert_allclose(
+        e3nn.to_s2point(rotated, e3nn.IrrepsArray("1o", x @ R.T)).array,
+        e3nn.to_s2point(coeffs, e3nn.IrrepsArray("1o", x)).array,
+        atol=1e-9,
+    )
+
+
+def test_transform_by_matrix_batch(keys):
+    irreps = e3nn.s2_irreps(3)
+    coeffs = e3nn.normal(irreps, keys[0], (4,))
+    sig = e3nn.to_s2grid(coeffs, 20, 19, quadrature="soft")
+    R = e3nn.rand_matrix(keys[1], (4,))
+
+    rotated_coeffs = e3nn.from_s2grid(sig.transform_by_matrix(R, lmax=3), irreps)
+    expected = jax.vmap(lambda x, R: x.transform_by_matrix(R))(coeffs, R)
+
+    np.testing.assert_allclose(
+        rotated_coeffs.array, expected.array, atol=1e-5, rtol=1e-5
+    )
+
+
 def test_s2_dirac():
     jax.config.update("jax_enable_x64", True)
 
@@ -350,8 +608,8 @@ def test_sample(keys):
         quadrature="gausslegendre",
     ).apply(jnp.exp)
     p: e3nn.SphericalSignal = p / p.integrate()
-    keys = jax.random.split(keys[1], 100_000)
-    beta_index, alpha_index = jax.vmap(lambda k: p.sample(k))(keys)
+    beta_index, alpha_index = jax.jit(lambda k: p.sample(k, 100_000))(keys[1])
+    assert beta_index.shape == alpha_index.shape == (100_000,)
 
     f = jnp.zeros_like(p.grid_values)
     f = f.at[beta_index, alpha_index].add(1.0)
@@ -362,6 +620,27 @@ def test_sample(keys):
     err = (p - f).apply(jnp.square).integrate().array[0]
     assert err < 2e-3
 
+    beta_index, alpha_index = p.sample(keys[2])
+    assert beta_index.shape == alpha_index.shape == ()
+
+
+@pytest.mark.parametrize("quadrature", ["soft", "gausslegendre"])
+def test_sample_jitter(keys, quadrature):
+    coeffs = e3nn.IrrepsArray(
+        "0e + 1o", jnp.array([[1.0, 2.0, 0.0, 0.0], [1.0, 0.0, 0.0, -2.0]])
+    )
+    p = e3nn.to_s2grid(coeffs, 20, 21, quadrature=quadrature).apply(jnp.exp)
+    x = p.sample(keys[0], 50_000, jitter=True)
+    assert x.shape == (2, 50_000, 3)
+    np.testing.assert_allclose(jnp.linalg.norm(x, axis=-1), 1.0, atol=1e-5)
+
+    # first moment of the distribution
+    w = p.grid_values * p.quadrature_weights[:, None]
+    mean = (
+        jnp.einsum("zba,bai->zi", w, p.grid_vectors) / jnp.sum(w, axis=(1, 2))[:, None]
+    )
+    np.testing.assert_allclose(jnp.mean(x, axis=1), mean, atol=0.02)
+
 
 @pytest.mark.parametrize("seed", range(2))
 @pytest.mark.parametrize("lmax", range(11))
@@ -536,10 +815,6 @@ def test_grid_tensor_product(seed, lmax, normalization, p_val, p_arg, dtype):
 
 @pytest.mark.parametrize("lmax", [2, 4, 10])
 def test_find_peaks(lmax):
-    pytest.skip(
-        "Still has the bug `ValueError: buffer source array is read-only`"
-    )  # TODO
-
     pos = jnp.asarray(
         [
             [1.0, 0.0, 0.0],
@@ -552,8 +827,8 @@ def test_find_peaks(lmax):
             -1.0,
         ]
     )
-    coeffs = e3nn.s2_sum_of_diracs(
-        positions=pos, weights=val, lmax=lmax, p_val=1, p_arg=-1
+    coeffs = e3nn.sum(
+        val[:, None] * e3nn.s2_dirac(pos, lmax=lmax, p_val=1, p_arg=-1), axis=0
     )
     sig = e3nn.to_s2grid(coeffs, 50, 49, quadrature="gausslegendre")
 
@@ -564,3 +839,31 @@ def test_find_peaks(lmax):
     x, f = sig.apply(lambda val: -val).find_peaks(lmax)
     negative_peak = x[f.argmax()]
     np.testing.assert_allclose(negative_peak, pos[1], atol=4e-1 / lmax)
+
+
+@pytest.mark.parametrize("quadrature", ["soft", "gausslegendre"])
+def test_top_peaks(keys, quadrature):
+    # one peak per signal, including at the poles (+y and -y)
+    pos = jnp.array([[0.6, 0.0, 0.8], [0.0, 1.0, 0.0], [0.0, -1.0, 0.0]])
+    coeffs = e3nn.s2_dirac(pos, lmax=8, p_val=1, p_arg=-1)
+    sig = e3nn.to_s2grid(coeffs, 30, 29, quadrature=quadrature)
+
+    x, f, mask = jax.jit(lambda s: s.top_peaks(4))(sig)
+    assert x.shape == (3, 4, 3) and f.shape == (3, 4) and mask.shape == (3, 4)
+    assert jnp.all(mask[:, 0])
+    assert jnp.all(f[:, 0] == jnp.max(sig.grid_values, axis=(-2, -1)))
+    np.testing.assert_allclose(x[:, 0], pos, atol=0.1)
+
+    x, f, mask = sig.top_peaks(4, refine=True)
+    np.testing.assert_allclose(x[0, 0], pos[0], atol=0.02)
+    np.testing.assert_allclose(
+        f[:, 0],
+        jnp.diagonal(
+            e3nn.to_s2point(coeffs, e3nn.IrrepsArray("1o", pos)).array[..., 0]
+        ),
+        rtol=0.05,
+    )
+
+    # padding
+    x, f, mask = e3nn.SphericalSignal(jnp.zeros((10, 11)), quadrature).top_peaks(3)
+    assert mask.tolist() == [True, False, False]
@@ -121,3 +121,106 @@ def test_scatter_max():
         ),
         jnp.array([-1.0, 0.5, 0.7]),
     )
+
+
+def test_scatter_zero_flags():
+    x = e3nn.from_chunks("2x0e + 1o", [jnp.ones((4, 2, 1)), None], (4,))
+    i = jnp.array([0, 2, 2, 0])
+
+    y = e3nn.scatter_sum(x, dst=i, output_size=3)
+    assert y.zero_flags == (False, True)
+    np.testing.assert_allclose(y.array, e3nn.scatter_sum(x.array, dst=i, output_size=3))
+
+    assert e3nn.scatter_sum(x, dst=i, map_back=True).zero_flags == (False, True)
+    assert e3nn.scatter_mean(x, dst=i, output_size=3).zero_flags == (False, True)
+    assert e3nn.scatter_mean(x, nel=jnp.array([1, 3]), map_back=True).zero_flags == (
+        False,
+        True,
+    )
+
+
+def test_distinct_but_small(keys):
+    from e3nn_jax._src.scatter import _distinct_but_small
+
+    x = jax.random.randint(next(keys), (7, 13), -50, 50)
+    _, expected = np.unique(np.asarray(x), return_inverse=True)
+    np.testing.assert_array_equal(_distinct_but_small(x), expected.reshape(x.shape))
+    assert _distinct_but_small(jnp.zeros((0,), jnp.int32)).shape == (0,)
+
+
+def test_scatter_assume_sorted(keys):
+    dst = jnp.sort(jax.random.randint(next(keys), (50,), 0, 7))
+    x = e3nn.normal("2x0e + 1o", next(keys), (50,))
+    x = e3nn.from_chunks(x.irreps, [x.chunks[0], None], (50,), x.dtype)
+
+    for f in [e3nn.scatter_sum, e3nn.scatter_mean]:
+        y1 = f(x, dst=dst, output_size=9, assume_sorted=True)
+        y2 = f(x, dst=dst, output_size=9)
+        assert y1.zero_flags == (False, True)
+        np.testing.assert_allclose(y1.array, y2.array, atol=1e-6)
+
+        y1 = f(x, dst=dst, map_back=True, assume_sorted=True)
+        y2 = f(x, dst=dst, map_back=True)
+        np.testing.assert_allclose(y1.array, y2.array, atol=1e-6)
+
+    x = x.filter("0e")
+    np.testing.assert_allclose(
+        e3nn.scatter_max(
+            x, dst=dst, output_size=9, initial=0.0, assume_sorted=True
+        ).array,
+        e3nn.scatter_max(x, dst=dst, output_size=9, initial=0.0).array,
+    )
+
+
+def test_scatter_min():
+    i = jnp.array([0, 2, 2, 0])
+    x = jnp.array([1.0, 2.0, 3.0, -10.0])
+    np.testing.assert_allclose(
+        e3nn.scatter_min(x, dst=i, output_size=3, initial=0.0),
+        jnp.array([-10.0, 0.0, 0.0]),
+    )
+    np.testing.assert_allclose(
+        e3nn.scatter_min(x, dst=i, map_back=True, initial=100.0),
+        jnp.array([-10.0, 2.0, 2.0, -10.0]),
+    )
+
+
+def test_scatter_softmax(keys):
+    dst = jax.random.randint(next(keys), (30,), 0, 5)
+    x = 100.0 * jax.random.normal(next(keys), (30, 2))
+    w = jax.random.uniform(next(keys), (30,))
+
+    y = e3nn.scatter_softmax(x, dst=dst, output_size=5, weights=w)
+    for a in range(5):
+        m = dst == a
+        e = w[m, None] * jnp.exp(x[m] - x[m].max(0))
+        np.testing.assert_allclose(y[m], e / e.sum(0), atol=1e-6)
+
+    np.testing.assert_allclose(
+        e3nn.scatter_logsumexp(x, dst=dst, map_back=True),
+        e3nn.scatter_logsumexp(x, dst=dst, output_size=5)[dst],
+    )
+    np.testing.assert_allclose(
+        e3nn.scatter_logsumexp(x / 100.0, dst=dst, output_size=5),
+        jnp.log(e3nn.scatter_sum(jnp.exp(x / 100.0), dst=dst, output_size=5)),
+        rtol=1e-5,
+    )
+
+    # the gradient of a softmax sums to zero in each segment
+    g = jax.grad(lambda x: jnp.sum(e3nn.scatter_softmax(x, dst=dst)[:, 0] * w))(x)
+    np.testing.assert_allclose(
+        e3nn.scatter_sum(g, dst=dst, output_size=5), 0.0, atol=1e-5
+    )
+
+
+def test_scatter_std(keys):
+    x = jax.random.normal(next(keys), (8, 3))
+    nel = jnp.array([3, 4, 1])
+    y = e3nn.scatter_std(x, nel=nel)
+    np.testing.assert_allclose(y[0], x[:3].std(0), atol=1e-6)
+    np.testing.assert_allclose(y[1], x[3:7].std(0), atol=1e-6)
+    np.testing.assert_allclose(y[2], 0.0)
+
+    g = jax.grad(lambda x: e3nn.scatter_std(x, nel=nel).sum())(x)
+    assert jnp.all(jnp.isfinite(g))
+    np.testing.assert_allclose(g[7], 0.0)
@@ -0,0 +1,101 @@
+import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
+
+import e3nn_jax as e3nn
+
+
+def _brute_force(coeffs: e3nn.IrrepsArray, signal: e3nn.SO3Signal) -> jax.Array:
+    beta, alpha, gamma = np.meshgrid(
+        signal.grid_beta, signal.grid_alpha, signal.grid_gamma, indexing="ij"
+    )
+    f = 0
+    for (_, ir), chunk in zip(coeffs.irreps, coeffs.chunks):
+        D = ir.D_from_angles(alpha, beta, gamma)  # [b, a, g, i, j]
+        f = f + jnp.einsum("bagij,...ji->...bag", D, chunk)
+    return f
+
+
+@pytest.mark.parametrize("quadrature", ["soft", "gausslegendre"])
+def test_to_so3grid(keys, quadrature):
+    jax.config.update("jax_enable_x64", True)
+
+    lmax = 4
+    res_beta = {"soft": 2 * (lmax + 1), "gausslegendre": lmax + 1}[quadrature]
+    x = e3nn.normal(e3nn.so3_irreps(lmax), keys[0], (2,), dtype=jnp.float64)
+
+    signal = e3nn.to_so3grid(x, res_beta, 9, 11, quadrature=quadrature)
+    assert signal.shape == (2, res_beta, 9, 11)
+    np.testing.assert_allclose(signal.grid_values, _brute_force(x, signal), atol=1e-10)
+    np.testing.assert_allclose(
+        e3nn.from_so3grid(signal, lmax).array, x.array, atol=1e-10
+    )
+    np.testing.assert_allclose(
+        signal.apply(jnp.ones_like).integrate(), 8 * np.pi**2, rtol=1e-10
+    )
+
+
+def test_rotation(keys):
+    jax.config.update("jax_enable_x64", True)
+
+    x = e3nn.normal(e3nn.so3_irreps(3), keys[0], dtype=jnp.float64)
+    Q = e3nn.rand_matrix(keys[1], dtype=jnp.float64)
+    signal = e3nn.to_so3grid(x, 6, 7, 7, quadrature="gausslegendre")
+
+    # f(Q^-1 R)
+    R = e3nn.angles_to_matrix(
+        *np.meshgrid(
+            signal.grid_alpha, signal.grid_beta, signal.grid_gamma, indexing="ij"
+        )
+    )
+    rotated = x.transform_by_matrix(Q)
+    for (_, ir), a, b in zip(x.irreps, x.chunks, rotated.chunks):
+        np.testing.assert_allclose(
+            jnp.einsum("abgij,ji->abg", ir.D_from_matrix(R), b),
+            jnp.einsum("abgij,ji->abg", ir.D_from_matrix(Q.T @ R), a),
+            atol=1e-10,
+        )
+
+
+def test_s2_correlation(keys):
+    jax.config.update("jax_enable_x64", True)
+
+    f = e3nn.normal(e3nn.s2_irreps(3), keys[0], (2,), dtype=jnp.float64)
+    g = e3nn.normal("0e + 1o + 3o", keys[1], dtype=jnp.float64)
+    c = e3nn.s2_correlation(f, g, 8, 9, 9, quadrature="gausslegendre")
+    assert c.shape == (2, 8, 9, 9)
+
+    # compare with the integral for a few rotations of the grid
+    for b, a, k in [(0, 0, 0), (2, 3, 4), (7, 8, 1)]:
+        alpha, beta, gamma = c.grid_alpha[a], c.grid_beta[b], c.grid_gamma[k]
+        rg = g.transform_by_angles(alpha, beta, gamma)
+        integral = (
+            e3nn.to_s2grid(f, 10, 11, quadrature="gausslegendre")
+            * e3nn.to_s2grid(rg, 10, 11, quadrature="gausslegendre")
+        ).integrate()
+        np.testing.assert_allclose(
+            c.grid_values[:, b, a, k], integral.array[:, 0] / (4 * np.pi), atol=1e-10
+        )
+
+
+def test_rotation_search(keys):
+    f = e3nn.normal(e3nn.s2_irreps(6), keys[0])
+    angles = e3nn.rand_angles(keys[1])
+    g = f.transform_by_angles(*angles, inverse=True)
+
+    c = jax.jit(
+        lambda f, g: e3nn.s2_correlation(f, g, 40, 41, 41, quadrature="gausslegendre")
+    )(f, g)
+    np.testing.assert_allclose(
+        e3nn.angles_to_matrix(*c.argmax()), e3nn.angles_to_matrix(*angles), atol=0.25
+    )
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        e3nn.to_so3grid(e3nn.zeros("0e + 1e"), 4, 5, 5, quadrature="soft")
+    with pytest.raises(ValueError):
+        e3nn.to_so3grid(e3nn.zeros(e3nn.so3_irreps(1)), 4, 6, 5, quadrature="soft")
+    with pytest.raises(ValueError):
+        e3nn.SO3Signal(jnp.zeros((4, 5)), "soft")
@@ -0,0 +1,106 @@
+import threading
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
+
+import e3nn_jax as e3nn
+
+
+def _graphs(num_graphs, seed=0):
+    rng = np.random.default_rng(seed)
+    graphs = []
+    for _ in range(num_graphs):
+        n = rng.integers(1, 20)
+        e = rng.integers(0, 3 * n)
+        graphs.append(
+            dict(
+                nodes=dict(
+                    x=e3nn.IrrepsArray("0e + 1o", rng.normal(size=(n, 4))),
+                    z=rng.integers(0, 5, size=(n,)),
+                ),
+                edges=rng.normal(size=(e, 2)),
+                senders=rng.integers(0, n, size=(e,)),
+                receivers=rng.integers(0, n, size=(e,)),
+                globals=rng.normal(size=(1, 3)),
+            )
+        )
+    return graphs
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_graph_batcher(prefetch):
+    graphs = _graphs(50)
+    batcher = e3nn.utils.GraphBatcher(graphs, batch_size=4, prefetch=prefetch)
+    batches = list(batcher)
+    assert len(batches) == 13
+    assert len(batcher.shapes) <= 6
+
+    i = 0
+    for batch in batches:
+        num_nodes = batch["node_mask"].shape[0]
+        num_edges = batch["edge_mask"].shape[0]
+        assert num_nodes & (num_nodes - 1) == 0
+        assert num_edges & (num_edges - 1) == 0
+        assert batch["nodes"]["x"].irreps == "0e + 1o"
+        assert batch["n_node"].sum() == num_nodes
+        assert batch["n_edge"].sum() == num_edges
+        assert jnp.all(batch["node_mask"][batch["receivers"]] == batch["edge_mask"])
+
+        # the padding edges only reach the padding nodes
+        out = e3nn.scatter_sum(
+            batch["edges"], dst=batch["receivers"], output_size=num_nodes
+        )
+        assert jnp.all(jnp.where(batch["node_mask"][:, None], 0.0, out) == 0.0)
+
+        offset = 0
+        for j in range(4):
+            if not batch["graph_mask"][j]:
+                assert batch["n_node"][j] == 0
+                continue
+            g = graphs[i]
+            n = g["nodes"]["z"].shape[0]
+            np.testing.assert_allclose(
+                batch["nodes"]["x"].array[offset : offset + n], g["nodes"]["x"].array
+            )
+            np.testing.assert_array_equal(batch["node_graph"][offset : offset + n], j)
+            np.testing.assert_allclose(batch["globals"][j], g["globals"][0])
+            offset += n
+            i += 1
+    assert i == len(graphs)
+
+
+def test_graph_batcher_jit_shapes():
+    batcher = e3nn.utils.GraphBatcher(
+        iter(_graphs(40, seed=1)), batch_size=8, min_num_nodes=64, min_num_edges=128
+    )
+
+    num_traces = 0
+
+    @jax.jit
+    def f(batch):
+        nonlocal num_traces
+        num_traces += 1
+        return e3nn.scatter_sum(
+            batch["edges"] * batch["edge_mask"][:, None],
+            dst=batch["node_graph"][batch["receivers"]],
+            output_size=batch["n_node"].shape[0],
+        )
+
+    for batch in batcher:
+        f(batch)
+    assert num_traces == len(batcher.shapes) <= 3
+
+
+def test_graph_batcher_stop_early():
+    batcher = e3nn.utils.GraphBatcher(_graphs(4), batch_size=2, prefetch=1)
+
+    it = iter(batcher)
+    next(it)
+    it.close()
+    assert not any(t.name.endswith("(producer)") for t in threading.enumerate())
+
+    for _ in batcher:
+        break
+    assert not any(t.name.endswith("(producer)") for t in threading.enumerate())
@@ -0,0 +1,17 @@
+import jax
+import jax.numpy as jnp
+
+import e3nn_jax as e3nn
+
+
+def test_zero_flags_savings():
+    x = e3nn.from_chunks("8x0e + 8x1o", [jnp.ones((10, 8, 1)), None], (10,))
+
+    savings = e3nn.utils.zero_flags_savings(e3nn.tensor_square, x)
+    assert 0.0 < savings["skipped_flops_fraction"] < 1.0
+    assert savings["flops"] < savings["dense_flops"]
+    assert savings["bytes"] < savings["dense_bytes"]
+
+    x = e3nn.normal("8x0e + 8x1o", jax.random.PRNGKey(0), (10,))
+    savings = e3nn.utils.zero_flags_savings(e3nn.tensor_square, x)
+    assert savings["flops"] == savings["dense_flops"]
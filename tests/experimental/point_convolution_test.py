@@ -1,6 +1,7 @@
 import haiku as hk
 import jax
 import jax.numpy as jnp
+import numpy as np
 
 import e3nn_jax as e3nn
 from e3nn_jax.experimental.point_convolution import (
@@ -58,3 +59,26 @@ def test_point_convolution(keys):
         feat,
     )
     assert_output_dtype_matches_input_dtype(model_apply, w, pos, feat, src, dst)
+
+
+def test_point_convolution_graph(keys):
+    @hk.without_apply_rng
+    @hk.transform
+    def model(positions, features, senders, receivers=None):
+        return MessagePassingConvolutionHaiku(
+            "8x0e + 8x0o + 5e",
+            lambda r: radial_basis(r, 2.0, 8),
+            avg_num_neighbors=2.0,
+        )(positions, features, senders, receivers)
+
+    pos = e3nn.normal("1o", next(keys), (10,))
+    feat = e3nn.normal("16x0e + 1o", next(keys), (10,))
+    src, dst = e3nn.radius_graph(pos, 2.0)
+    graph = e3nn.Graph.from_edges(src, dst, 10)
+
+    w = model.init(next(keys), pos, feat, src, dst)
+    np.testing.assert_allclose(
+        model.apply(w, pos, feat, graph).array,
+        model.apply(w, pos, feat, src, dst).array,
+        atol=1e-5,
+    )
@@ -2,6 +2,7 @@ import e3nn_jax as e3nn
 import haiku as hk
 import jax
 import jax.numpy as jnp
+import numpy as np
 from e3nn_jax.experimental.transformer import Transformer
 from e3nn_jax.utils import assert_equivariant
 
@@ -56,3 +57,31 @@ def test_transformer(keys):
         node_feat,
         atol=1e-4,
     )
+
+
+def test_transformer_graph(keys):
+    @hk.without_apply_rng
+    @hk.transform
+    def model(pos, src, dst, node_feat, edge_graph=None):
+        vec = pos[dst] - pos[src]
+        edge_weight_cutoff = e3nn.sus(3.0 * (2.0 - e3nn.norm(vec).array[..., 0]))
+        edge_attr = e3nn.spherical_harmonics("0e + 1e + 2e", vec, True)
+        return Transformer("0e + 2x1e", list_neurons=[16], act=jax.nn.relu)(
+            src if edge_graph is None else edge_graph,
+            dst if edge_graph is None else None,
+            edge_weight_cutoff,
+            edge_attr,
+            node_feat,
+        )
+
+    pos = e3nn.normal("1e", next(keys), (8,))
+    src, dst = e3nn.radius_graph(pos, 2.0)
+    node_feat = e3nn.normal("2x0e + 2x1e", next(keys), (8,))
+    graph = e3nn.Graph.from_edges(src, dst, 8)
+
+    w = model.init(next(keys), pos, src, dst, node_feat)
+    np.testing.assert_allclose(
+        model.apply(w, pos, graph.senders, graph.receivers, node_feat, graph).array,
+        model.apply(w, pos, src, dst, node_feat).array,
+        atol=1e-5,
+    )